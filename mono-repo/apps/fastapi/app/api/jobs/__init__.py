@@ -0,0 +1 @@
+"""Background job status API module"""
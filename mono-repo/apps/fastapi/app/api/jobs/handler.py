@@ -0,0 +1,38 @@
+from fastapi import HTTPException
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from app.api.jobs.models import JobInfo, JobSubmitted
+from app.core.jobs import JobManager, JobQueueFull
+
+
+class JobHandler:
+    """Handler class for background jobs"""
+
+    @staticmethod
+    def submit(kind: str, runId: str, work: Callable[[str], Awaitable[Dict[str, Any]]]) -> JobSubmitted:
+        """Queue work(job_id) as a background job; 503 when the job queue is full"""
+        try:
+            job = JobManager.submit(kind, runId, work)
+        except JobQueueFull as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        return JobSubmitted(
+            success=True,
+            message=f"{kind} job queued",
+            runId=runId,
+            jobId=job.id,
+            status=job.status,
+            status_url=f"/api/v1/jobs/{job.id}"
+        )
+
+    @staticmethod
+    async def get_job(job_id: str) -> JobInfo:
+        """Status of one job"""
+        try:
+            return JobInfo(**JobManager.get(job_id).describe())
+        except KeyError as e:
+            raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+    @staticmethod
+    async def list_jobs(runId: Optional[str] = None, limit: int = 50) -> List[JobInfo]:
+        """Most recent jobs first, optionally only those of one pipeline run"""
+        jobs = [job for job in reversed(JobManager.jobs.values()) if runId is None or job.run_id == runId]
+        return [JobInfo(**job.describe()) for job in jobs[:limit]]
@@ -0,0 +1,54 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any
+
+class JobProgress(BaseModel):
+    """Where a background job is: its current stage and, while simulating, day k of N"""
+    
+    stage: str = Field(description="queued, starting, loading, simulating, planning, saving, succeeded or failed")
+    day: Optional[int] = Field(default=None, description="Last simulated day")
+    days: Optional[int] = Field(default=None, description="Days to simulate")
+
+class JobInfo(BaseModel):
+    """Status of a background job"""
+    
+    jobId: str
+    kind: str
+    runId: str
+    status: str = Field(description="queued, running, succeeded or failed")
+    progress: JobProgress
+    artifacts: Dict[str, str] = Field(description="Saved artifact paths by stage")
+    result: Optional[Dict[str, Any]] = Field(default=None, description="The stage's response once it succeeded")
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    elapsed_seconds: Optional[float] = None
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "jobId": "9f1c2e7b4a3d4f0e8b6a5c4d3e2f1a0b",
+                "kind": "simulation",
+                "runId": "123",
+                "status": "running",
+                "progress": {"stage": "simulating", "day": 120, "days": 365},
+                "artifacts": {},
+                "result": None,
+                "error": None,
+                "created_at": "2025-01-01T02:00:00",
+                "started_at": "2025-01-01T02:00:01",
+                "finished_at": None,
+                "elapsed_seconds": 14.2
+            }
+        }
+
+class JobSubmitted(BaseModel):
+    """Answer to a POST that queued a background job"""
+    
+    success: bool
+    message: str
+    runId: str
+    jobId: str
+    status: str
+    status_url: str
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Query
+from typing import List, Optional
+
+from app.api.jobs.models import JobInfo
+from app.api.jobs.handler import JobHandler
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+@router.get(
+    "/",
+    response_model=List[JobInfo],
+    summary="List Background Jobs",
+    description="Most recent background jobs first (finished jobs are kept up to JOB_HISTORY_LIMIT)"
+)
+async def list_jobs(
+    runId: Optional[str] = Query(None, description="Only jobs of this pipeline run"),
+    limit: int = Query(50, ge=1, le=1000, description="Maximum number of jobs returned")
+) -> List[JobInfo]:
+    """List background jobs"""
+    return await JobHandler.list_jobs(runId, limit)
+
+@router.get(
+    "/{job_id}",
+    response_model=JobInfo,
+    summary="Background Job Status",
+    description="""
+    Poll a job queued by `/simulation/start-from-file` or `/rl/start-from-file`.
+    
+    **Output:**
+    - status: queued, running, succeeded or failed
+    - progress: current stage and, while simulating, day k of N
+    - artifacts: saved result paths once the job succeeded
+    - result / error: the stage's response or failure message
+    """
+)
+async def get_job(job_id: str) -> JobInfo:
+    """Get background job status"""
+    return await JobHandler.get_job(job_id)
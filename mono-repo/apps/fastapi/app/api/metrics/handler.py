@@ -0,0 +1,8 @@
+from fastapi.responses import PlainTextResponse
+from app.core.metrics import REGISTRY
+
+# Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+async def get_metrics() -> PlainTextResponse:
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
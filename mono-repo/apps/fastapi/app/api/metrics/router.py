@@ -0,0 +1,22 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from .handler import get_metrics
+
+router = APIRouter(tags=["Metrics"])
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    summary="Prometheus Metrics",
+    description="""
+    In-process metrics in Prometheus text format, for scraping.
+    
+    **Histograms:** request latency per router, simulation time per day, MOO ranking time,
+    RL inference time per planner, artifact read/write time and bytes, webhook attempt latency
+    
+    **Counters and gauges:** webhook failures and outbox events, executor queue depth and
+    in-flight tasks, background jobs per status, stage cache hits / misses / evictions
+    """
+)
+async def metrics():
+    return await get_metrics()
@@ -4,11 +4,12 @@ import io
 from typing import List
 from fastapi import HTTPException, UploadFile
 from fastapi.responses import StreamingResponse
-import httpx  # 👈 added for webhook call
 
 from app.api.moo.models import MooConfig, MooResponse, TrainRankingResult, MooRankingOnly
-from app.api.moo.service import MooService
+from app.api.moo.service import MooService, rank_fleet
+from app.core.executors import ExecutorManager
 from app.core.storage import StorageManager
+from app.core.webhooks import WebhookDispatcher
 from app.core.config import settings
 
 
@@ -28,21 +29,28 @@ class MooHandler:
         Saves results to shared storage and sends webhook notification.
         """
         try:
-            # Step 1: Load CSV from storage
-            df = await StorageManager.read_csv_from_path(file_path)
-            
-            # Step 2: Run MOO ranking
-            moo_service = MooService(config)
-            ranked_df = moo_service.rank_trains(df)
-            
-            print("=== MOO Train Ranking Results (Pipeline) ===")
-            for _, row in ranked_df.iterrows():
-                print(f"Train {row['TrainID']} | Score: {row['Score']} | Rank: {row['Rank']}")
-            
-            # Step 3: Save results to storage
-            result_file_path = await StorageManager.save_moo_result(runId, ranked_df)
+            # Step 1: Reuse the cached ranking of a byte-identical input with the same config
+            cache_key = await StorageManager.stage_cache_key(file_path, "moo", {"config": config.dict()})
+            cached = await StorageManager.load_cached_result(cache_key, "MOO_RESULT", runId)
+            if cached is not None:
+                result_file_path, summary = cached
+            else:
+                # Step 2: Load CSV from storage
+                df = await StorageManager.read_csv_from_path(file_path)
+                
+                # Step 3: Run MOO ranking on the executor process pool
+                ranked_df, _ = await ExecutorManager.run_cpu(rank_fleet, config, df)
+                
+                print("=== MOO Train Ranking Results (Pipeline) ===")
+                for _, row in ranked_df.iterrows():
+                    print(f"Train {row['TrainID']} | Score: {row['Score']} | Rank: {row['Rank']}")
+                
+                # Step 4: Save results to storage
+                result_file_path = await StorageManager.save_moo_result(runId, ranked_df)
+                summary = {"total_trains": len(df)}
+                await StorageManager.store_cached_result(cache_key, result_file_path, summary)
             
-            # Step 4: Send webhook notification
+            # Step 5: Send webhook notification
             await MooHandler._send_webhook(runId, result_file_path)
             
             return {
@@ -50,7 +58,8 @@ class MooHandler:
                 "message": "MOO ranking completed successfully",
                 "runId": runId,
                 "result_file_path": result_file_path,
-                "total_trains": len(df),
+                "total_trains": summary["total_trains"],
+                "cached": cached is not None,
                 "config_used": config.dict()
             }
             
@@ -72,7 +81,7 @@ class MooHandler:
                 raise HTTPException(status_code=400, detail="Only CSV files are supported")
 
             contents = await file.read()
-            df = pd.read_csv(io.StringIO(contents.decode('utf-8')))
+            df = await ExecutorManager.run_io(pd.read_csv, io.StringIO(contents.decode('utf-8')))
 
             if df.empty:
                 raise HTTPException(status_code=400, detail="CSV file is empty")
@@ -115,20 +124,14 @@ class MooHandler:
 
     @staticmethod
     async def _send_webhook(run_id: str, file_path: str, error_message: str = None):
-        """Send webhook notification to backend"""
-        async with httpx.AsyncClient() as client:
-            try:
-                payload = {
-                    "runId": run_id, 
-                    "status": "success" if file_path else "failed",
-                    "outputFilePath": file_path,
-                    "error": error_message
-                }
-                resp = await client.post(MooHandler.WEBHOOK_URL, json=payload, timeout=5)
-                resp.raise_for_status()
-                print(f"[MOO] Webhook sent successfully → {payload}")
-            except Exception as e:
-                print(f"[MOO] Failed to send webhook: {e}")
+        """Queue the MOO-complete webhook for the backend (delivered in the background)"""
+        payload = {
+            "runId": run_id, 
+            "status": "success" if file_path else "failed",
+            "outputFilePath": file_path,
+            "error": error_message
+        }
+        await WebhookDispatcher.enqueue(MooHandler.WEBHOOK_URL, payload, "MOO")
 
     @staticmethod
     async def rank_train_fleet(
@@ -141,7 +144,7 @@ class MooHandler:
         try:
             df = await MooHandler.process_csv_file(file)
             moo_service = MooService(config)
-            ranked_df = moo_service.rank_trains(df)
+            ranked_df, contributions = await ExecutorManager.run_cpu(rank_fleet, config, df)
 
             print("=== MOO Train Ranking Results ===")
             for _, row in ranked_df.iterrows():
@@ -149,16 +152,17 @@ class MooHandler:
 
             # Save ranked file locally (for pipeline)
             output_path = f"/tmp/moo_result_{run_id or 'manual'}.csv"
-            ranked_df.to_csv(output_path, index=False)
+            await ExecutorManager.run_io(ranked_df.to_csv, output_path, index=False)
 
             # 🔔 Fire webhook after MOO completion
             if run_id:
                 await MooHandler._send_webhook(run_id, output_path, None)
 
             if return_csv:
-                return MooHandler.create_csv_response(ranked_df)
+                return await ExecutorManager.run_io(MooHandler.create_csv_response, ranked_df)
             else:
-                ranking_results = moo_service.convert_to_ranking_results(ranked_df)
+                moo_service.contributions = contributions
+                ranking_results = await ExecutorManager.run_io(moo_service.convert_to_ranking_results, ranked_df)
                 response = MooResponse(
                     success=True,
                     message="Train ranking completed successfully using Multi-Objective Optimization",
@@ -182,11 +186,10 @@ class MooHandler:
         """Get simplified ranking with only train ID, score, and rank"""
         try:
             df = await MooHandler.process_csv_file(file)
-            moo_service = MooService(config)
-            ranked_df = moo_service.rank_trains(df)
+            ranked_df, _ = await ExecutorManager.run_cpu(rank_fleet, config, df)
 
             output_path = f"/tmp/moo_result_{run_id or 'manual'}_simple.csv"
-            ranked_df.to_csv(output_path, index=False)
+            await ExecutorManager.run_io(ranked_df.to_csv, output_path, index=False)
 
             # 🔔 Fire webhook
             if run_id:
@@ -37,6 +37,10 @@ class TrainRankingResult(BaseModel):
     cleaning_required: bool
     shunting_moves_required: int
     operational_status: str
+    score_breakdown: Optional[Dict[str, float]] = Field(
+        default=None,
+        description="Points contributed by each objective (sums to the unrounded score)"
+    )
     
     class Config:
         json_schema_extra = {
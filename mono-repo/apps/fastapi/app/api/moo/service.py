@@ -1,7 +1,18 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 from app.api.moo.models import MooConfig, TrainRankingResult
+from app.core.metrics import MOO_RANKING_SECONDS
+
+# Columns of the contribution matrix, in the order calculate_score adds the terms
+SCORE_COMPONENTS = [
+    "rolling_stock_fitness", "signalling_fitness", "telecom_fitness",
+    "job_card_status", "open_job_cards",
+    "branding_active", "branding_exposure",
+    "total_mileage", "mileage_since_service", "mileage_balance",
+    "brakepad_wear", "hvac_wear",
+    "cleaning", "shunting", "operational_status"
+]
 
 class MooService:
     """Service class for Multi-Objective Optimization (MOO) train ranking logic"""
@@ -9,6 +20,8 @@ class MooService:
     def __init__(self, config: MooConfig):
         self.config = config
         self.mileage_limit_before_service = config.mileage_limit_before_service
+        # Per-objective contributions of the last rank_trains call, in ranked order
+        self.contributions: Optional[pd.DataFrame] = None
     
     def calculate_score(self, row: pd.Series) -> float:
         """
@@ -104,6 +117,123 @@ class MooService:
         
         return round(score, 2)
     
+    def score_fleet(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized calculate_score for the whole fleet.
+        Returns the Score column and an N x K matrix of per-objective contributions
+        (columns follow SCORE_COMPONENTS; rows failing a fitness gate are all zero).
+        """
+        n = len(df)
+        limit = self.mileage_limit_before_service
+        contributions = np.zeros((n, len(SCORE_COMPONENTS)), dtype=np.float64)
+        column = {name: k for k, name in enumerate(SCORE_COMPONENTS)}
+
+        # ✅ Fitness gates
+        rolling_stock = self._bool_column(df, "RollingStockFitnessStatus", True)
+        signalling = self._bool_column(df, "SignallingFitnessStatus", True)
+        telecom = self._bool_column(df, "TelecomFitnessStatus", True)
+        contributions[:, column["rolling_stock_fitness"]] = 15
+        contributions[:, column["signalling_fitness"]] = 10
+        contributions[:, column["telecom_fitness"]] = 10
+
+        # ✅ Job cards
+        contributions[:, column["job_card_status"]] = np.where(self._text_column(df, "JobCardStatus") == "close", 5, 0)
+        open_job_cards = self._numeric_column(df, "OpenJobCards", 0, integer=True)
+        contributions[:, column["open_job_cards"]] = np.where(
+            open_job_cards >= 0, np.fmax(0, 5 - open_job_cards * 2), 0
+        )
+
+        # ✅ Branding priority
+        branding_active = self._bool_column(df, "BrandingActive", False)
+        exposure_target = self._numeric_column(df, "ExposureHoursTarget", 0)
+        exposure_accrued = self._numeric_column(df, "ExposureHoursAccrued", 0)
+        has_target = branding_active & (exposure_target > 0)
+        completion_ratio = np.divide(exposure_accrued, exposure_target, out=np.zeros(n), where=has_target)
+        contributions[:, column["branding_active"]] = np.where(branding_active, 3, 0)
+        contributions[:, column["branding_exposure"]] = np.where(has_target, np.fmax(0, 7 * (1 - completion_ratio)), 0)
+
+        # ✅ Mileage bands, mileage since service and balance variance
+        total_mileage = self._numeric_column(df, "TotalMileageKM", 0)
+        contributions[:, column["total_mileage"]] = np.select(
+            [total_mileage < 50000, (total_mileage >= 50000) & (total_mileage < 150000)], [5, 2.5], 0
+        )
+        mileage_since_service = self._numeric_column(df, "MileageSinceLastServiceKM", 0)
+        with np.errstate(invalid="ignore"):
+            mileage_points = np.fmax(0, np.trunc(5 - (mileage_since_service / limit) / 10000))
+        contributions[:, column["mileage_since_service"]] = np.where(mileage_since_service >= 0, mileage_points, 0)
+        mileage_balance_variance = self._numeric_column(df, "MileageBalanceVariance", 0)
+        contributions[:, column["mileage_balance"]] = np.fmax(0, 5 - np.abs(mileage_balance_variance) / 1000)
+
+        # ✅ Wear and tear
+        brakepad_wear = self._numeric_column(df, "BrakepadWear%", 0)
+        hvac_wear = self._numeric_column(df, "HVACWear%", 0)
+        self._require_finite(brakepad_wear, "BrakepadWear%")
+        self._require_finite(hvac_wear, "HVACWear%")
+        contributions[:, column["brakepad_wear"]] = np.fmax(0, 10 - np.trunc(brakepad_wear / 10))
+        contributions[:, column["hvac_wear"]] = np.fmax(0, 5 - np.trunc(hvac_wear / 10))
+
+        # ✅ Cleaning, shunting and operational status
+        contributions[:, column["cleaning"]] = np.where(self._bool_column(df, "CleaningRequired", False), 0, 10)
+        shunting_moves = self._numeric_column(df, "ShuntingMovesRequired", 0, integer=True)
+        contributions[:, column["shunting"]] = np.fmax(0, 3 - shunting_moves * 3)
+        contributions[:, column["operational_status"]] = np.where(
+            self._text_column(df, "OperationalStatus") == "in service", 2, 0
+        )
+
+        # A failed fitness gate zeroes the whole score
+        fit = rolling_stock & signalling & telecom
+        contributions[~fit] = 0
+
+        # Add the terms one at a time in calculate_score's order so the float sums match exactly
+        total = np.zeros(n, dtype=np.float64)
+        for k in range(len(SCORE_COMPONENTS)):
+            total += contributions[:, k]
+        scores = np.array([round(score, 2) for score in total.tolist()], dtype=np.float64)
+
+        return self._as_row_apply_result(scores, fit), contributions
+
+    def _bool_column(self, df: pd.DataFrame, col: str, default: bool) -> np.ndarray:
+        """_convert_to_bool over a column (default when the column is missing)"""
+        if col not in df.columns:
+            return np.full(len(df), default, dtype=bool)
+        values = df[col]
+        if values.dtype == bool:
+            return values.to_numpy()
+        if pd.api.types.is_numeric_dtype(values):
+            return values.to_numpy(dtype=np.float64) != 0
+        codes, uniques = pd.factorize(values.to_numpy(dtype=object), use_na_sentinel=False)
+        return np.array([self._convert_to_bool(value) for value in uniques], dtype=bool)[codes]
+
+    @staticmethod
+    def _text_column(df: pd.DataFrame, col: str) -> np.ndarray:
+        """str(value).strip().lower() over a column ("" when the column is missing)"""
+        if col not in df.columns:
+            return np.full(len(df), "", dtype=object)
+        codes, uniques = pd.factorize(df[col].to_numpy(dtype=object), use_na_sentinel=False)
+        return np.array([str(value).strip().lower() for value in uniques], dtype=object)[codes]
+
+    @staticmethod
+    def _numeric_column(df: pd.DataFrame, col: str, default: float, integer: bool = False) -> np.ndarray:
+        """float() (or int() when integer=True) over a column (default when the column is missing)"""
+        if col not in df.columns:
+            return np.full(len(df), default, dtype=np.float64)
+        values = pd.to_numeric(df[col]).to_numpy(dtype=np.float64)
+        if integer:
+            MooService._require_finite(values, col)
+            return np.trunc(values)
+        return values
+
+    @staticmethod
+    def _require_finite(values: np.ndarray, col: str) -> None:
+        """Reject missing values where calculate_score converts with int()"""
+        if not np.isfinite(values).all():
+            raise ValueError(f"cannot convert missing or infinite {col} to integer")
+
+    @staticmethod
+    def _as_row_apply_result(values: np.ndarray, computed: np.ndarray) -> np.ndarray:
+        """Match the dtype df.apply(axis=1) produced: integer when no row took the computed (float) branch"""
+        return values if computed.any() else values.astype(np.int64)
+
     def _convert_to_bool(self, value: Any) -> bool:
         """Convert various boolean representations to actual boolean"""
         if isinstance(value, bool):
@@ -119,28 +249,24 @@ class MooService:
         df_copy = df.copy()
         
         # Job Card Priority (lower = better)
-        df_copy["JobCardPriority"] = df_copy.apply(
-            lambda r: (r["OpenJobCards"] if str(r["JobCardStatus"]).strip().lower() == "open" else 0), 
-            axis=1
+        job_card_open = self._text_column(df_copy, "JobCardStatus") == "open"
+        df_copy["JobCardPriority"] = self._as_row_apply_result(
+            np.where(job_card_open, df_copy["OpenJobCards"].to_numpy(), 0), job_card_open
         )
 
         # Branding Completion Ratio (lower = better)
-        df_copy["BrandingCompletionRatio"] = df_copy.apply(
-            lambda r: (
-                r["ExposureHoursAccrued"] / r["ExposureHoursTarget"] 
-                if self._convert_to_bool(r["BrandingActive"]) and r["ExposureHoursTarget"] > 0 
-                else 1
-            ),
-            axis=1
+        exposure_target = pd.to_numeric(df_copy["ExposureHoursTarget"]).to_numpy(dtype=np.float64)
+        exposure_accrued = pd.to_numeric(df_copy["ExposureHoursAccrued"]).to_numpy(dtype=np.float64)
+        has_target = self._bool_column(df_copy, "BrandingActive", False) & (exposure_target > 0)
+        df_copy["BrandingCompletionRatio"] = self._as_row_apply_result(
+            np.divide(exposure_accrued, exposure_target, out=np.ones(len(df_copy)), where=has_target), has_target
         )
 
         # Mileage Balance Absolute (lower variance = better)
         df_copy["MileageBalanceAbs"] = df_copy["MileageBalanceVariance"].abs()
 
         # Cleaning Priority (0 better than 1)
-        df_copy["CleaningPriority"] = df_copy["CleaningRequired"].apply(
-            lambda x: 1 if self._convert_to_bool(x) else 0
-        )
+        df_copy["CleaningPriority"] = self._bool_column(df_copy, "CleaningRequired", False).astype(np.int64)
 
         # Shunting Priority (fewer = better)
         df_copy["ShuntingPriority"] = df_copy["ShuntingMovesRequired"]
@@ -155,23 +281,28 @@ class MooService:
         df_work = df.copy()
         
         # Calculate scores for all trains
-        df_work["Score"] = df_work.apply(self.calculate_score, axis=1)
+        scores, contributions = self.score_fleet(df_work)
+        df_work["Score"] = scores
         
         # Calculate tie-breaking metrics
         df_work = self.calculate_tie_break_metrics(df_work)
         
-        # Final Ranking with Tie-Break (exactly as in MOO.py)
-        df_work = df_work.sort_values(
-            by=[
-                "Score",                    # Primary score (higher = better)
-                "JobCardPriority",          # 1. Job cards (lower = better)
-                "BrandingCompletionRatio",  # 2. Branding ratio (lower = better)
-                "MileageBalanceAbs",        # 3. Mileage balancing (lower variance = better)
-                "CleaningPriority",         # 4. Cleaning required (0 better than 1)
-                "ShuntingPriority"          # 5. Shunting moves (fewer = better)
-            ],
+        # Final Ranking with Tie-Break (exactly as in MOO.py), sorting only the key columns
+        # by row position so the contribution matrix can follow the same order
+        sort_keys = [
+            "Score",                    # Primary score (higher = better)
+            "JobCardPriority",          # 1. Job cards (lower = better)
+            "BrandingCompletionRatio",  # 2. Branding ratio (lower = better)
+            "MileageBalanceAbs",        # 3. Mileage balancing (lower variance = better)
+            "CleaningPriority",         # 4. Cleaning required (0 better than 1)
+            "ShuntingPriority"          # 5. Shunting moves (fewer = better)
+        ]
+        order = df_work[sort_keys].reset_index(drop=True).sort_values(
+            by=sort_keys,
             ascending=[False, True, True, True, True, True]
-        )
+        ).index.to_numpy()
+        df_work = df_work.iloc[order]
+        self.contributions = pd.DataFrame(contributions[order], index=df_work.index, columns=SCORE_COMPONENTS)
 
         # Assign unique ranks
         df_work["Rank"] = range(1, len(df_work) + 1)
@@ -181,8 +312,12 @@ class MooService:
     def convert_to_ranking_results(self, ranked_df: pd.DataFrame) -> List[TrainRankingResult]:
         """Convert DataFrame to list of TrainRankingResult objects"""
         results = []
+        # Breakdowns come from the matrix of the rank_trains call that produced ranked_df
+        contributions = self.contributions
+        if contributions is not None and not contributions.index.equals(ranked_df.index):
+            contributions = None
         
-        for _, row in ranked_df.iterrows():
+        for position, (_, row) in enumerate(ranked_df.iterrows()):
             result = TrainRankingResult(
                 train_id=str(row["TrainID"]),
                 score=float(row["Score"]),
@@ -200,8 +335,22 @@ class MooService:
                 hvac_wear_percent=float(row.get("HVACWear%", 0)),
                 cleaning_required=self._convert_to_bool(row.get("CleaningRequired", False)),
                 shunting_moves_required=int(row.get("ShuntingMovesRequired", 0)),
-                operational_status=str(row.get("OperationalStatus", ""))
+                operational_status=str(row.get("OperationalStatus", "")),
+                score_breakdown=(
+                    {name: round(float(points), 2) for name, points in contributions.iloc[position].items()}
+                    if contributions is not None else None
+                )
             )
             results.append(result)
         
-        return results
\ No newline at end of file
+        return results
+
+def rank_fleet(config: MooConfig, df: pd.DataFrame) -> Tuple[pd.DataFrame, Optional[pd.DataFrame]]:
+    """
+    MooService.rank_trains (module-level so executor worker processes can run it).
+    Returns the ranked frame and its per-objective contributions, which live on the worker's service.
+    """
+    with MOO_RANKING_SECONDS.time():
+        service = MooService(config)
+        ranked_df = service.rank_trains(df)
+        return ranked_df, service.contributions
@@ -0,0 +1 @@
+"""Fused simulation -> MOO -> RL pipeline API module"""
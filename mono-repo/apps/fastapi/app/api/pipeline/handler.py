@@ -0,0 +1,79 @@
+from fastapi import HTTPException
+from app.api.pipeline.models import PipelineRequest, PipelineResponse, PipelineStage
+from app.api.pipeline.service import PipelineService
+from app.api.rl.handler import RLHandler
+from app.api.rl.registry import policy_registry
+from app.core.executors import ExecutorManager
+from app.core.storage import StorageManager
+
+
+class PipelineHandler:
+    """Handler class for fused pipeline runs"""
+
+    # Where each stage's result is saved when the caller asks to persist it
+    SAVERS = {
+        PipelineStage.simulation: StorageManager.save_simulation_result,
+        PipelineStage.moo: StorageManager.save_moo_result,
+        PipelineStage.rl: StorageManager.save_rl_result,
+    }
+
+    @staticmethod
+    async def run_from_file_path(request: PipelineRequest) -> PipelineResponse:
+        """
+        Run simulation, MOO and RL on one fleet CSV in one executor process. Only the requested
+        stage results are written to shared storage, and a single RL-complete webhook ends the run.
+        """
+        runId = request.runId
+        try:
+            df = await StorageManager.read_csv_from_path(request.file_path)
+
+            if request.model and not request.optimize:
+                try:
+                    policy_registry.resolve(request.model)
+                except KeyError as e:
+                    raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+            # Runs with a named policy go to the model process, whose registry keeps it loaded
+            if request.model and not request.optimize:
+                results, timings = await ExecutorManager.run_model(PipelineService.run, df, request)
+            else:
+                results, timings = await ExecutorManager.run_cpu(PipelineService.run, df, request)
+            print(f"[Pipeline] Run {runId}: " + ", ".join(f"{stage} {seconds:.3f}s" for stage, seconds in timings.items()))
+
+            artifacts = {}
+            for stage in PipelineStage:
+                if stage in request.persist:
+                    artifacts[stage.value] = await PipelineHandler.SAVERS[stage](runId, results[stage.value])
+
+            plan = results[PipelineStage.rl.value]
+            distribution = {str(k): int(v) for k, v in plan["OperationalStatus"].value_counts().items()}
+            await StorageManager.save_pipeline_log(runId, "pipeline_complete", {
+                "message": "Fused pipeline completed successfully",
+                "input_file_path": request.file_path,
+                "artifacts": artifacts,
+                "stage_seconds": timings,
+                "total_trains": len(plan),
+                "operational_status_distribution": distribution
+            })
+            await RLHandler._send_webhook(runId, artifacts.get(PipelineStage.rl.value), "success")
+
+            return PipelineResponse(
+                success=True,
+                message="Pipeline completed successfully",
+                runId=runId,
+                total_trains=len(plan),
+                artifacts=artifacts,
+                stage_seconds=timings,
+                operational_status_distribution=distribution
+            )
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            error_msg = f"Pipeline failed: {str(e)}"
+            print(f"[Pipeline Error] {error_msg}")
+            try:
+                await RLHandler._send_webhook(runId, None, "error", error_msg)
+            except:
+                pass  # Don't fail if webhook fails
+            raise HTTPException(status_code=500, detail=error_msg)
@@ -0,0 +1,59 @@
+from enum import Enum
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict
+from app.api.simulation.models import CleaningDepot
+
+class PipelineStage(str, Enum):
+    """Stages of a pipeline run, in execution order"""
+    simulation = "simulation"
+    moo = "moo"
+    rl = "rl"
+
+class PipelineRequest(BaseModel):
+    """Configuration for a fused pipeline run"""
+    
+    file_path: str = Field(description="Fleet CSV in shared storage")
+    runId: str = Field(description="Pipeline run identifier for tracking")
+    seed: Optional[int] = Field(default=None, ge=0, description="Seed for the simulation RNG")
+    cleaning_depots: Optional[List[CleaningDepot]] = Field(default=None, description="Cleaning capacity per depot")
+    mileage_limit_before_service: int = Field(default=10000, ge=1, description="MOO mileage limit before service")
+    model: Optional[str] = Field(default=None, description="RL registry model name; heuristic when omitted")
+    optimize: Optional[bool] = Field(default=False, description="Plan the night exactly (MILP) instead of PPO/heuristic")
+    persist: List[PipelineStage] = Field(
+        default_factory=lambda: [PipelineStage.rl],
+        description="Stage results to save to shared storage (default: the final RL plan only)"
+    )
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "file_path": "/shared/storage/input/user_upload_123.csv",
+                "runId": "123",
+                "seed": 42,
+                "persist": ["moo", "rl"]
+            }
+        }
+
+class PipelineResponse(BaseModel):
+    """Result of a fused pipeline run"""
+    
+    success: bool
+    message: str
+    runId: str
+    total_trains: int
+    artifacts: Dict[str, str]
+    stage_seconds: Dict[str, float]
+    operational_status_distribution: Dict[str, int]
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "success": True,
+                "message": "Pipeline completed successfully",
+                "runId": "123",
+                "total_trains": 25,
+                "artifacts": {"rl": "/shared/storage/output/rl/rl_final_123.csv"},
+                "stage_seconds": {"simulation": 0.012, "moo": 0.004, "rl": 0.021},
+                "operational_status_distribution": {"in_service": 13, "standby": 7, "under_maintenance": 5}
+            }
+        }
@@ -0,0 +1,36 @@
+from fastapi import APIRouter
+
+from app.api.pipeline.models import PipelineRequest, PipelineResponse
+from app.api.pipeline.handler import PipelineHandler
+
+router = APIRouter(prefix="/pipeline", tags=["Pipeline"])
+
+@router.post(
+    "/run",
+    response_model=PipelineResponse,
+    summary="Run Simulation, MOO and RL in One Call (Fused Pipeline)",
+    description="""
+    🚀 **Fused Pipeline Run**
+    
+    Runs the nightly pipeline in one process: the fleet is simulated one day ahead,
+    ranked by MOO and planned by the RL planner, with DataFrames passed between the
+    stages in memory instead of CSV files and one webhook per stage.
+    Results match chaining `/simulation/start-from-file`, `/moo/start-from-file` and
+    `/rl/start-from-file`.
+    
+    **Input:**
+    - file_path: Fleet CSV in shared storage
+    - runId: Pipeline run identifier for tracking
+    - seed, cleaning_depots: Simulation options
+    - mileage_limit_before_service: MOO option
+    - model, optimize: RL planner options (see /rl/models)
+    - persist: Stage results to save (`simulation`, `moo`, `rl`; default `rl` only)
+    
+    **Output:**
+    - Paths of the saved artifacts, per-stage wall time and the plan's status distribution
+    - One RL-complete webhook to the backend
+    """
+)
+async def run_pipeline(request: PipelineRequest) -> PipelineResponse:
+    """Run the fused simulation -> MOO -> RL pipeline"""
+    return await PipelineHandler.run_from_file_path(request)
@@ -0,0 +1,76 @@
+"""
+Fused nightly pipeline: simulate the fleet one day ahead, rank it with MOO and plan the
+night with the RL planner, handing DataFrames from stage to stage in memory.
+Each stage sees the same table it would have read back from the previous stage's CSV
+artifact, so results match the staged /start-from-file chain.
+"""
+
+import time
+import pandas as pd
+from typing import Dict, Tuple
+from app.api.pipeline.models import PipelineRequest, PipelineStage
+from app.api.simulation.models import SimulationConfig
+from app.api.simulation.service import TrainSimulationService
+from app.api.moo.models import MooConfig
+from app.api.moo.service import MooService
+from app.api.rl import RL
+from app.api.rl.registry import policy_registry
+from app.api.rl.service import RLService
+from app.core.metrics import MOO_RANKING_SECONDS, RL_INFERENCE_SECONDS
+
+
+class PipelineService:
+    """Service class for the in-memory simulation -> MOO -> RL pipeline"""
+
+    @staticmethod
+    def read_back_types(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Simulator output as pd.read_csv would return it from the saved artifact:
+        'TRUE'/'FALSE' cells become booleans and 'NULL' placeholders become missing.
+        """
+        out = df.copy(deep=False)
+        if 'CleaningRequired' in out.columns and out['CleaningRequired'].dtype == object:
+            flags = out['CleaningRequired']
+            out['CleaningRequired'] = flags.map({'TRUE': True, 'FALSE': False}).where(flags.isin(['TRUE', 'FALSE']), flags)
+        for col in ['BayOccupancyIDC', 'BrandCampaignID']:
+            if col in out.columns:
+                out[col] = out[col].mask(out[col] == 'NULL')
+        return out
+
+    @staticmethod
+    def run(df: pd.DataFrame, config: PipelineRequest) -> Tuple[Dict[str, pd.DataFrame], Dict[str, float]]:
+        """
+        Run the three stages on a fleet table; returns each stage's result and its wall time in seconds.
+        Runs in an executor process; runs with a named policy run on the model process, whose registry holds it.
+        """
+        results: Dict[str, pd.DataFrame] = {}
+        timings: Dict[str, float] = {}
+
+        start = time.perf_counter()
+        sim_config = SimulationConfig(days_to_simulate=1, seed=config.seed)
+        if config.cleaning_depots:
+            sim_config.cleaning_depots = config.cleaning_depots
+        simulator = TrainSimulationService(sim_config)
+        simulator.verbose = False
+        _, results[PipelineStage.simulation.value] = next(simulator.simulate_days_iter(df, 1))
+        timings[PipelineStage.simulation.value] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        moo_service = MooService(MooConfig(mileage_limit_before_service=config.mileage_limit_before_service))
+        results[PipelineStage.moo.value] = moo_service.rank_trains(
+            PipelineService.read_back_types(results[PipelineStage.simulation.value])
+        )
+        timings[PipelineStage.moo.value] = time.perf_counter() - start
+        MOO_RANKING_SECONDS.observe(timings[PipelineStage.moo.value])
+
+        start = time.perf_counter()
+        model = policy_registry.get(config.model) if config.model and not config.optimize else None
+        results[PipelineStage.rl.value] = RL.plan_next_day(
+            results[PipelineStage.moo.value], model=model, optimize=bool(config.optimize)
+        )
+        timings[PipelineStage.rl.value] = time.perf_counter() - start
+        RL_INFERENCE_SECONDS.observe(
+            timings[PipelineStage.rl.value], planner=RLService.planner_label(model, bool(config.optimize))
+        )
+
+        return results, timings
@@ -2,26 +2,43 @@
 COMMANDS FOR RUNNING ( IN ORDER ):
 1) python RL.py --mode infer --csv final1output.csv --out next_day_plan_heuristic.csv
 2) python RL.py --mode train --csv final1output.csv --timesteps 100000 --model kmrl_ppo_model
+   (parallel: add --n-envs 8 --vec-env subproc, optionally with several --csv snapshots)
 3) python RL.py --mode infer --csv final1output.csv --model kmrl_ppo_model --out next_day_plan_rl.csv
+   (exact plan without a model: python RL.py --mode infer --csv final1output.csv --optimize --out next_day_plan_opt.csv)
 """
 
 import os
+import sys
 import argparse
 import copy
 import json
 import math
 import random
 import datetime
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, List, Tuple, Union
 
 import numpy as np
 import pandas as pd
+from scipy import sparse
+from scipy.optimize import Bounds, LinearConstraint, milp
 from sklearn.preprocessing import MinMaxScaler
 
+try:
+    from app.core.dates import RL_DATE_FORMATS, date_ordinal, to_day_ordinals, days_until_ordinals, ordinal_to_date
+except ImportError:
+    # Run as a script (python RL.py ...): make the app package importable
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..")))
+    from app.core.dates import RL_DATE_FORMATS, date_ordinal, to_day_ordinals, days_until_ordinals, ordinal_to_date
+from app.api.simulation.fleet_state import (
+    FleetState, FITNESS_CERTIFICATES, CLEANING_IN_PROGRESS, JOB_CARD_OPEN, JOB_CARD_CLOSE
+)
+from app.api.simulation.models import SimulationConfig
+from app.api.simulation.service import TrainSimulationService
+
 # try importing stable-baselines3 only if available
 try:
     from stable_baselines3 import PPO
-    from stable_baselines3.common.vec_env import DummyVecEnv
+    from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv
     from stable_baselines3.common.callbacks import EvalCallback, CheckpointCallback
     import gymnasium as gym
     from gymnasium import spaces
@@ -71,25 +88,54 @@ DEFAULT_CONFIG = {
     }
 }
 
+# Multi-day policy shipped with the AIML experiments (kmrl_multiday_ppo.zip)
+DEFAULT_MULTIDAY_MODEL = os.path.abspath(os.path.join(
+    os.path.dirname(__file__), "..", "..", "..", "..", "AIML", "kmrl_multiday_ppo.zip"
+))
+
+# Per-train features of the multi-day environment and the constant each one is divided by
+# (the fleet changes every night, so a scaler fitted on the first night would drift)
+MULTIDAY_FEATURES = [
+    ("RollingStockFitnessExpiry_days", 365.0), ("SignallingFitnessExpiry_days", 365.0),
+    ("TelecomFitnessExpiry_days", 365.0), ("FitnessValid", 1.0),
+    ("OpenJobCards", 10.0), ("JobCardStatus_enc", 1.0), ("ClosedJobCards", 100.0),
+    ("BrandingActive_flag", 1.0), ("ExposureHoursAccrued", 400.0), ("ExposureHoursTarget", 400.0),
+    ("ExposureDailyQuota", 16.0), ("TotalMileageKM", 100000.0), ("MileageSinceLastServiceKM", 10000.0),
+    ("MileageBalanceVariance", 10000.0), ("BrakepadWear%", 100.0), ("HVACWear%", 100.0),
+    ("CleaningRequired_flag", 1.0), ("CleaningInProgress", 1.0), ("ShuntingMovesRequired", 3.0),
+    ("StablingSequenceOrder", 3.0), ("MaintenanceDaysRemaining", 3.0), ("SimulatedStatus", 2.0),
+]
+
+# Per-train features of the one-night environment; its observation adds 3 fleet-level values
+ONE_NIGHT_FEATURES = [
+    "Score", "Rank",
+    "RollingStockFitnessExpiry_days", "SignallingFitnessExpiry_days",
+    "OpenJobCards", "JobCardStatus_enc", "JobCardPriority",
+    "ExposureHoursAccrued", "ExposureHoursTarget",
+    "TotalMileageKM", "MileageSinceLastServiceKM", "BrakepadWear%", "HVACWear%"
+]
+ONE_NIGHT_OBSERVATION_SHAPE = (len(ONE_NIGHT_FEATURES) + 3,)
+
 # ---------------------- Helpers -----------------------
 
 def parse_date(d):
-    if pd.isna(d) or d is None or str(d).strip() == "":
-        return None
-    for fmt in ("%Y-%m-%d", "%d-%m-%Y", "%d/%m/%Y"):
-        try:
-            return datetime.datetime.strptime(str(d).strip(), fmt).date()
-        except Exception:
-            pass
-    try:
-        return pd.to_datetime(d).date()
-    except Exception:
-        return None
-
-def days_until(date_obj, ref_date):
-    if date_obj is None:
-        return 0
-    return (date_obj - ref_date).days
+    return ordinal_to_date(date_ordinal(d, RL_DATE_FORMATS, lenient=True))
+
+def days_until_col(values, ref_date):
+    """Days from ref_date to every date in a column (0 where the date is missing), parsed in one pass"""
+    ordinals = to_day_ordinals(values, RL_DATE_FORMATS, lenient=True)
+    return days_until_ordinals(ordinals, ref_date.toordinal())
+
+def load_fleet_frame(source: Union[str, pd.DataFrame]) -> pd.DataFrame:
+    """Fleet table as RL.py reads it (raw CSV text, "" for missing cells) from a CSV path or a DataFrame"""
+    if isinstance(source, pd.DataFrame):
+        # Typed artifacts carry categorical / nullable columns, which only take "" as objects
+        typed = [c for c in source.columns if isinstance(source[c].dtype, pd.api.extensions.ExtensionDtype)]
+        df = source.astype({c: object for c in typed}).fillna("")
+    else:
+        df = pd.read_csv(source, dtype=str).fillna("")
+    df.columns = [c.strip() for c in df.columns]
+    return df
 
 # ---------------- Environment -------------------------
 if SB3_AVAILABLE:
@@ -99,29 +145,22 @@ if SB3_AVAILABLE:
         """
         metadata = {"render_modes": []}
         
-        def __init__(self, csv_path: str, config: Dict[str, Any] = None, seed: int = 42, normalize: bool = True):
+        def __init__(self, csv_path: Union[str, pd.DataFrame], config: Dict[str, Any] = None, seed: int = 42, normalize: bool = True):
             super().__init__()
-            self.csv_path = csv_path
+            self.csv_path = csv_path if isinstance(csv_path, str) else None
             self.config = copy.deepcopy(DEFAULT_CONFIG)
             if config is not None:
                 self.config.update(config)
             self.seed_val = seed
             self.rng = np.random.RandomState(seed)
             
-            # Load CSV and preprocess
-            self.df_raw = pd.read_csv(csv_path, dtype=str).fillna("")
-            self.df_raw.columns = [c.strip() for c in self.df_raw.columns]
+            # Load CSV (or an in-memory fleet table) and preprocess
+            self.df_raw = load_fleet_frame(csv_path)
             self.today = parse_date(self.df_raw.at[0, "CURRENT_DATE"]) if len(self.df_raw) > 0 and "CURRENT_DATE" in self.df_raw.columns else datetime.date.today()
             self._preprocess()
 
             # Feature list
-            self.feature_names = [
-                "Score", "Rank",
-                "RollingStockFitnessExpiry_days", "SignallingFitnessExpiry_days",
-                "OpenJobCards", "JobCardStatus_enc", "JobCardPriority",
-                "ExposureHoursAccrued", "ExposureHoursTarget",
-                "TotalMileageKM", "MileageSinceLastServiceKM", "BrakepadWear%", "HVACWear%"
-            ]
+            self.feature_names = list(ONE_NIGHT_FEATURES)
             
             for f in self.feature_names:
                 if f not in self.work_df.columns:
@@ -134,8 +173,10 @@ if SB3_AVAILABLE:
 
             # action & observation space
             self.action_space = spaces.Discrete(3)  # 0=in_service, 1=standby, 2=under_maintenance
-            obs_len = len(self.feature_names) + 3  # features + 3 extra
-            self.observation_space = spaces.Box(low=-10, high=10, shape=(obs_len,), dtype=np.float32)
+            self.observation_space = spaces.Box(low=-10, high=10, shape=ONE_NIGHT_OBSERVATION_SHAPE, dtype=np.float32)
+
+            # Static per-train data, so steps never touch pandas
+            self._build_arrays()
 
         def _preprocess(self):
             df = self.df_raw.copy()
@@ -161,8 +202,7 @@ if SB3_AVAILABLE:
                              ("SignallingFitnessExpiryDate", "SignallingFitnessExpiry_days"),
                              ("TelecomFitnessExpiryDate", "TelecomFitnessExpiry_days")]:
                 if col in df.columns:
-                    parsed = df[col].apply(parse_date)
-                    df[out] = parsed.apply(lambda d: days_until(d, self.today) if d is not None else 0)
+                    df[out] = days_until_col(df[col], self.today)
                 else:
                     df[out] = 0
 
@@ -173,12 +213,41 @@ if SB3_AVAILABLE:
             self.scaler = MinMaxScaler((-1, 1))  # Scale to [-1, 1] for better training
             self.scaler.fit(mat)
 
+        def _build_arrays(self):
+            """Pre-scaled float32 feature matrix and typed per-train columns read by step()"""
+            df = self.work_df
+            self.n_trains = len(df)
+            self.df = df  # read-only during episodes; _build_output_df copies it
+            self.features = self.feature_matrix()
+
+            self.fitness_expired = (
+                (df["RollingStockFitnessExpiry_days"].astype(float).values <= 0) |
+                (df["SignallingFitnessExpiry_days"].astype(float).values <= 0) |
+                (df["TelecomFitnessExpiry_days"].astype(float).values <= 0)
+            )
+            self.open_jobs = np.trunc(df["OpenJobCards"].astype(float).values).astype(int)
+            self.shunts = df["ShuntingMovesRequired"].astype(float).values
+            # Python lists: per-step scalar reads are cheaper and keep rewards plain floats
+            self.train_ids = df["TrainID"].tolist() if "TrainID" in df.columns else [""] * self.n_trains
+            self.fitness_expired_list = self.fitness_expired.tolist()
+            self.open_jobs_list = self.open_jobs.tolist()
+            self.shunts_list = self.shunts.tolist()
+            self.brake_wear_list = df["BrakepadWear%"].astype(float).tolist()
+            self.hvac_wear_list = df["HVACWear%"].astype(float).tolist()
+            self.mileage_since_list = df["MileageSinceLastServiceKM"].astype(float).tolist()
+            self.branding_list = df["BrandingActive_flag"].astype(int).tolist()
+            self.cleaning_required_list = df["CleaningRequired_flag"].astype(int).tolist()
+            self.cleaning_in_progress_list = (
+                (df["CleaningSlotStatus"] == "in_progress").tolist()
+                if "CleaningSlotStatus" in df.columns else [False] * self.n_trains
+            )
+
         def reset(self, seed=None, options=None):
             """Reset environment - returns (observation, info) tuple"""
             if seed is not None:
                 self.rng = np.random.RandomState(seed)
             
-            self._build_workcopy()
+            # Only the small mutable episode state is rebuilt; train data stays in the arrays
             self.step_idx = 0
             self.assigned = np.full(self.n_trains, -1, dtype=int)
             self.remaining_service = int(self.config["service_quota"])
@@ -190,25 +259,46 @@ if SB3_AVAILABLE:
             info = {}
             return obs, info
 
-        def _build_workcopy(self):
-            self.df = self.work_df.copy().reset_index(drop=True)
-            self.n_trains = len(self.df)
-
         def _get_obs(self):
+            obs = np.zeros(self.observation_space.shape, dtype=np.float32)
             if self.step_idx >= self.n_trains:
-                return np.zeros(self.observation_space.shape, dtype=np.float32)
+                return obs
                 
-            idx = self.step_idx
-            feat = self.df.loc[idx, self.feature_names].astype(float).values
-            if self.normalize:
-                feat = self.scaler.transform(feat.reshape(1, -1)).reshape(-1,)
+            n_features = self.features.shape[1]
+            obs[:n_features] = self.features[self.step_idx]
             
             # Additional context features
-            rem = np.array([self.remaining_service / max(1, int(self.config["service_quota"]))], dtype=np.float32)
-            sh = np.array([min(self.total_shunting_cost / 100.0, 1.0)], dtype=np.float32)  # Normalize shunting
-            frac = np.array([self.step_idx / max(1, self.n_trains)], dtype=np.float32)
-            
-            return np.concatenate([feat.astype(np.float32), rem, sh, frac])
+            obs[n_features] = self.remaining_service / max(1, int(self.config["service_quota"]))
+            obs[n_features + 1] = min(self.total_shunting_cost / 100.0, 1.0)  # Normalize shunting
+            obs[n_features + 2] = self.step_idx / max(1, self.n_trains)
+            return obs
+
+        def feature_matrix(self) -> np.ndarray:
+            """Scaled feature part of every train's observation at once (n_trains x features)"""
+            feat = self.work_df[self.feature_names].astype(float).values
+            if self.normalize:
+                feat = self.scaler.transform(feat)
+            return feat.astype(np.float32)
+
+        def context_matrix(self, actions: np.ndarray) -> np.ndarray:
+            """
+            Running context (remaining quota, shunting cost, position fraction) each train would
+            see if the policy proposed `actions`, with step()'s fitness and quota overrides applied.
+            """
+            n = len(actions)
+            quota = int(self.config["service_quota"])
+
+            # In-service proposals survive overrides until the quota is used up
+            candidate = (actions == 0) & ~self.fitness_expired
+            served = candidate & (np.cumsum(candidate) <= quota)
+            served_before = np.concatenate([[0], np.cumsum(served)[:-1]]).astype(int)
+            shunting_before = np.concatenate([[0.0], np.cumsum(np.where(served, self.shunts, 0.0))[:-1]])
+
+            context = np.empty((n, 3), dtype=np.float32)
+            context[:, 0] = (quota - served_before) / max(1, quota)
+            context[:, 1] = np.minimum(shunting_before / 100.0, 1.0)
+            context[:, 2] = np.arange(n) / max(1, n)
+            return context
 
         def step(self, action):
             """Execute action and return (obs, reward, terminated, truncated, info)"""
@@ -220,50 +310,45 @@ if SB3_AVAILABLE:
                 return obs, 0.0, True, False, {}
             
             idx = self.step_idx
-            row = self.df.loc[idx]
-            info = {"train_idx": idx, "TrainID": row.get("TrainID", "")}
+            cfg = self.config
+            rw = cfg["rw"]
+            info = {"train_idx": idx, "TrainID": self.train_ids[idx]}
             reward = 0.0
             breakdown = {}
 
             chosen = int(action)
             
             # Check fitness constraints
-            fitness_expired = any([
-                float(row.get("RollingStockFitnessExpiry_days", 0)) <= 0,
-                float(row.get("SignallingFitnessExpiry_days", 0)) <= 0,
-                float(row.get("TelecomFitnessExpiry_days", 0)) <= 0
-            ])
+            fitness_expired = self.fitness_expired_list[idx]
             
             # Override if trying to put expired fitness train in service
             if chosen == 0 and fitness_expired:
                 chosen = 1  # Force to standby
-                reward += self.config["rw"]["fit_violation"]
-                breakdown["fit_violation"] = self.config["rw"]["fit_violation"]
+                reward += rw["fit_violation"]
+                breakdown["fit_violation"] = rw["fit_violation"]
                 info["override"] = "fitness_expired"
 
             # Check quota constraint
             if chosen == 0 and self.remaining_service <= 0:
                 chosen = 1  # Force to standby
-                reward += self.config["rw"]["quota_miss"] * 0.5
-                breakdown["quota_overflow_penalty"] = self.config["rw"]["quota_miss"] * 0.5
+                reward += rw["quota_miss"] * 0.5
+                breakdown["quota_overflow_penalty"] = rw["quota_miss"] * 0.5
                 info["override"] = info.get("override", "") + ";quota_exhausted"
 
             # === REWARD SHAPING ===
             
             # Fitness safety bonus
             if chosen == 0 and not fitness_expired:
-                reward += self.config["rw"]["fit_safe"]
-                breakdown["fit_safe"] = self.config["rw"]["fit_safe"]
+                reward += rw["fit_safe"]
+                breakdown["fit_safe"] = rw["fit_safe"]
 
             # Jobcards handling
-            open_jobs = int(row.get("OpenJobCards", 0))
-            brake_wear = float(row.get("BrakepadWear%", 0))
-            hvac_wear = float(row.get("HVACWear%", 0))
+            open_jobs = self.open_jobs_list[idx]
             
             if chosen == 0:  # In service
                 # Penalty for running with open jobs
                 if open_jobs > 0:
-                    penalty = self.config["rw"]["inservice_jobcard_penalty_per_job"] * open_jobs
+                    penalty = rw["inservice_jobcard_penalty_per_job"] * open_jobs
                     reward += penalty
                     breakdown["inservice_jobcard_penalty"] = penalty
                 else:
@@ -274,11 +359,11 @@ if SB3_AVAILABLE:
             elif chosen == 2:  # Under maintenance
                 # Reward maintenance when actually needed
                 needs_maintenance = (open_jobs >= 2 or 
-                                    brake_wear >= self.config["brake_threshold"] or 
-                                    hvac_wear >= self.config["hvac_threshold"])
+                                    self.brake_wear_list[idx] >= cfg["brake_threshold"] or 
+                                    self.hvac_wear_list[idx] >= cfg["hvac_threshold"])
                 if needs_maintenance:
-                    reward += self.config["rw"]["maintenance_when_needed"]
-                    breakdown["maint_when_needed"] = self.config["rw"]["maintenance_when_needed"]
+                    reward += rw["maintenance_when_needed"]
+                    breakdown["maint_when_needed"] = rw["maintenance_when_needed"]
                 else:
                     # Small penalty for unnecessary maintenance
                     reward -= 5.0
@@ -287,13 +372,12 @@ if SB3_AVAILABLE:
             elif chosen == 1:  # Standby
                 # Small penalty for standby to encourage using trains
                 if not fitness_expired and open_jobs < 2:
-                    reward += self.config["rw"]["standby_penalty"]
-                    breakdown["standby_penalty"] = self.config["rw"]["standby_penalty"]
+                    reward += rw["standby_penalty"]
+                    breakdown["standby_penalty"] = rw["standby_penalty"]
 
             # Mileage considerations
-            m_since = float(row.get("MileageSinceLastServiceKM", 0.0))
             if chosen == 0:
-                if m_since >= float(self.config["mileage_service_threshold"]):
+                if self.mileage_since_list[idx] >= float(cfg["mileage_service_threshold"]):
                     reward -= 15.0
                     breakdown["mileage_over_threshold"] = -15.0
                 else:
@@ -301,7 +385,7 @@ if SB3_AVAILABLE:
                     breakdown["mileage_ok"] = 2.0
 
             # Branding
-            if int(row.get("BrandingActive_flag", 0)) == 1:
+            if self.branding_list[idx] == 1:
                 if chosen == 0:
                     reward += 8.0
                     breakdown["brand_selected"] = 8.0
@@ -309,20 +393,17 @@ if SB3_AVAILABLE:
                     reward -= 3.0
                     breakdown["brand_missed"] = -3.0
 
-        
-            cleaning_slot = row.get("CleaningSlotStatus", 0)
-            cleaning_required = int(row.get("CleaningRequired_flag", 0))
-            if cleaning_slot == 'in_progress' and chosen == 0:
+            if self.cleaning_in_progress_list[idx] and chosen == 0:
                 reward -= 10.0
                 breakdown["clean_inprogress_penalty"] = -10.0
-            elif cleaning_required == 1 and chosen != 2:
+            elif self.cleaning_required_list[idx] == 1 and chosen != 2:
                 reward -= 2.0
                 breakdown["cleaning_needed_penalty"] = -2.0
 
             # Shunting penalty
-            shunts = float(row.get("ShuntingMovesRequired", 0.0))
+            shunts = self.shunts_list[idx]
             if chosen == 0 and shunts > 0:
-                penalty = self.config["rw"]["shunt_penalty_per_move"] * shunts
+                penalty = rw["shunt_penalty_per_move"] * shunts
                 reward += penalty
                 breakdown["shunt_penalty"] = penalty
 
@@ -341,19 +422,20 @@ if SB3_AVAILABLE:
             if terminated:
                 # End of episode rewards
                 service_selected = int((self.assigned == 0).sum())
+                quota = int(cfg["service_quota"])
                 
                 # Quota achievement
-                if service_selected < int(self.config["service_quota"]):
-                    miss = int(self.config["service_quota"]) - service_selected
-                    penalty = self.config["rw"]["quota_miss"] * miss
+                if service_selected < quota:
+                    miss = quota - service_selected
+                    penalty = rw["quota_miss"] * miss
                     reward += penalty
                     breakdown["quota_miss_penalty"] = penalty
-                elif service_selected == int(self.config["service_quota"]):
-                    reward += self.config["rw"]["quota_hit"]
-                    breakdown["quota_hit"] = self.config["rw"]["quota_hit"]
+                elif service_selected == quota:
+                    reward += rw["quota_hit"]
+                    breakdown["quota_hit"] = rw["quota_hit"]
                 else:
                     # Over quota
-                    over = service_selected - int(self.config["service_quota"])
+                    over = service_selected - quota
                     penalty = -10.0 * over
                     reward += penalty
                     breakdown["quota_over_penalty"] = penalty
@@ -381,26 +463,18 @@ if SB3_AVAILABLE:
 
         def _simulate_next_day(self):
             """Simulate next day operations"""
-            cfg = self.config
-            rw = cfg["rw"]
             rewards = {}
             
             # Count action distribution for balance reward
-            n_service = (self.assigned == 0).sum()
             n_standby = (self.assigned == 1).sum()
-            n_maint = (self.assigned == 2).sum()
             
             # Encourage balanced distribution
             if n_standby > self.n_trains * 0.5:
                 rewards["too_many_standby"] = -20.0
             
-            # Simulate maintenance effects
-            for i in range(self.n_trains):
-                if self.assigned[i] == 2:  # maintenance
-                    # Reduce jobcards
-                    oc = int(self.df.at[i, "OpenJobCards"])
-                    if oc > 0:
-                        rewards[f"maint_jobcard_{i}"] = 5.0
+            # Simulate maintenance effects: reward maintenance that reduces jobcards
+            for i in np.flatnonzero((self.assigned == 2) & (self.open_jobs > 0)):
+                rewards[f"maint_jobcard_{i}"] = 5.0
             
             return {"rewards": rewards}
 
@@ -410,19 +484,343 @@ if SB3_AVAILABLE:
         def render(self, mode="human"):
             print(f"Step {self.step_idx}/{self.n_trains}. Remaining service: {self.remaining_service}")
 
+    class TrainSchedulingEnvMultiDay(KMrlOneNightEnv):
+        """
+        Gym environment: one episode = episode_days nights of sequential OperationalStatus assignments.
+        Each night follows the one-night rules and rewards; between nights the fleet is rolled
+        forward on the simulator's columnar engine (fitness, job cards, wear, cleaning, stabling),
+        with mileage and branding exposure accrued only by the trains the plan put in service.
+        """
+        model = None  # policy shared by all instances, set by load_model()
+
+        def __init__(self, csv_path: Union[str, pd.DataFrame], service_quota: int = 13, episode_days: int = 7,
+                     daily_mileage_if_in_service: float = 436.96, daily_exposure_hours: float = 16.0,
+                     jobcard_reduction_if_maintenance: int = 2, jobcard_new_per_day_lambda: float = 0.1,
+                     today: str = None, seed: int = 42, config: Dict[str, Any] = None):
+            self.episode_days = max(1, int(episode_days))
+            self.daily_mileage = float(daily_mileage_if_in_service)
+            self.daily_exposure_hours = float(daily_exposure_hours)
+            self.jobcard_reduction = int(jobcard_reduction_if_maintenance)
+            self.jobcard_lambda = float(jobcard_new_per_day_lambda)
+            self.day_index = 0
+            self.assigned_actions_history: List[np.ndarray] = []
+
+            # The simulator loads the fleet once; every episode starts from a copy of this state
+            fleet_df = csv_path if isinstance(csv_path, pd.DataFrame) else pd.read_csv(csv_path)
+            if not FleetState.supports(fleet_df):
+                raise ValueError("Fleet data does not follow the simulator schema needed for multi-day episodes")
+            self.sim = TrainSimulationService(SimulationConfig(seed=seed))
+            self.sim.verbose = False
+            self.initial_fleet = self.sim.load_fleet_state(fleet_df)
+            self.initial_allocator = copy.deepcopy(self.sim.cleaning_allocator)
+            self.initial_campaigns = (set(self.sim.used_campaign_ids), self.sim.campaign_counter)
+            self.fleet = self.initial_fleet.copy()
+
+            config = dict(config or {})
+            config["service_quota"] = int(service_quota)
+            super().__init__(fleet_df, config=config, seed=seed, normalize=False)
+            self.csv_path = csv_path if isinstance(csv_path, str) else None
+            if today:
+                self.today = parse_date(today) or self.today
+            self.sim.simulation_start_date = self.today
+            self.today_sim = self.today
+
+            self.feature_names = [name for name, _ in MULTIDAY_FEATURES]
+            # Bounds match the kmrl_multiday_ppo policies (features + 4 context values)
+            self.observation_space = spaces.Box(low=-1e9, high=1e9, shape=(len(MULTIDAY_FEATURES) + 4,), dtype=np.float32)
+            self._build_arrays()
+
+        @classmethod
+        def load_model(cls, model_path: str = DEFAULT_MULTIDAY_MODEL):
+            """Load the multi-day PPO policy shared by all instances"""
+            cls.model = PPO.load(model_path, device="cpu")
+            print(f"[RL] Loaded multi-day model from {model_path}")
+            return cls.model
+
+        def _build_arrays(self):
+            """Per-night feature matrix and per-train lists read by step(), from the current fleet state"""
+            fleet = self.fleet
+            self.n_trains = len(fleet)
+            self.train_ids = fleet['TrainID'].tolist()
+            reference = (self.today + datetime.timedelta(days=self.day_index)).toordinal()
+
+            raw = {}
+            valid = np.ones(self.n_trains, dtype=bool)
+            # The first MULTIDAY_FEATURES are the expiry countdowns, in FITNESS_CERTIFICATES order
+            for (status_col, expiry_col, _, _, _), (name, _) in zip(FITNESS_CERTIFICATES, MULTIDAY_FEATURES):
+                ordinals = fleet[expiry_col + '_ord']
+                raw[name] = days_until_ordinals(ordinals, reference)
+                valid &= fleet[status_col] & ~(ordinals < reference)
+            raw["FitnessValid"] = valid
+            for name in ["OpenJobCards", "ClosedJobCards", "ExposureHoursAccrued", "ExposureHoursTarget",
+                         "ExposureDailyQuota", "TotalMileageKM", "MileageSinceLastServiceKM", "MileageBalanceVariance",
+                         "BrakepadWear%", "HVACWear%", "ShuntingMovesRequired", "StablingSequenceOrder"]:
+                raw[name] = fleet[name]
+            raw["JobCardStatus_enc"] = fleet['JobCardStatus'] == JOB_CARD_OPEN
+            raw["BrandingActive_flag"] = fleet['BrandingActive']
+            raw["CleaningRequired_flag"] = fleet['CleaningRequired']
+            raw["CleaningInProgress"] = fleet['CleaningSlotStatus'] == CLEANING_IN_PROGRESS
+            raw["MaintenanceDaysRemaining"] = fleet['maintenance_days']
+            raw["SimulatedStatus"] = fleet['OperationalStatus']
+
+            features = np.column_stack([np.asarray(raw[name], dtype=np.float64) / scale for name, scale in MULTIDAY_FEATURES])
+            self.features = np.nan_to_num(features).astype(np.float32)
+
+            self.fitness_expired = ~valid
+            self.open_jobs = fleet['OpenJobCards'].copy()
+            self.shunts = np.nan_to_num(fleet['ShuntingMovesRequired'])
+            self.fitness_expired_list = self.fitness_expired.tolist()
+            self.open_jobs_list = self.open_jobs.tolist()
+            self.shunts_list = self.shunts.tolist()
+            self.brake_wear_list = fleet['BrakepadWear%'].tolist()
+            self.hvac_wear_list = fleet['HVACWear%'].tolist()
+            self.mileage_since_list = fleet['MileageSinceLastServiceKM'].tolist()
+            self.branding_list = fleet['BrandingActive'].astype(int).tolist()
+            self.cleaning_required_list = fleet['CleaningRequired'].astype(int).tolist()
+            self.cleaning_in_progress_list = raw["CleaningInProgress"].tolist()
+
+        def reset(self, seed=None, options=None):
+            """Restore the loaded fleet and start the first night - returns (observation, info) tuple"""
+            if seed is not None:
+                self.sim.rng = np.random.default_rng(seed)
+            self.fleet = self.initial_fleet.copy()
+            self.sim.fleet_state = self.fleet
+            self.sim.cleaning_allocator = copy.deepcopy(self.initial_allocator)
+            self.sim.used_campaign_ids = set(self.initial_campaigns[0])
+            self.sim.campaign_counter = self.initial_campaigns[1]
+            self.sim.current_day = 0
+            self.day_index = 0
+            self.assigned_actions_history = []
+            self._build_arrays()
+            return super().reset(seed=seed, options=options)
+
+        def _get_obs(self):
+            obs = super()._get_obs()
+            if self.step_idx < self.n_trains:
+                obs[-1] = self.day_index / self.episode_days
+            return obs
+
+        def step(self, action):
+            """Execute action and return (obs, reward, terminated, truncated, info); the episode ends after the last night"""
+            obs, reward, night_done, truncated, info = super().step(action)
+            if not night_done or self.day_index >= self.episode_days:
+                return obs, reward, night_done, truncated, info
+
+            # Start the next night on the rolled-forward fleet
+            self._build_arrays()
+            self.step_idx = 0
+            self.assigned = np.full(self.n_trains, -1, dtype=int)
+            self.remaining_service = int(self.config["service_quota"])
+            info["day_index"] = self.day_index
+            return self._get_obs(), reward, False, truncated, info
+
+        def _simulate_next_day(self):
+            """Roll the fleet one day forward under tonight's plan and score the day"""
+            rewards = super()._simulate_next_day()["rewards"]
+            rw = self.config["rw"]
+            fleet = self.fleet
+            actions = self.assigned.copy()
+            self.assigned_actions_history.append(actions)
+            running = actions == 0
+
+            # Branding hours are credited up to the operating day for the trains that ran
+            active = fleet['BrandingActive'] & (fleet['BrandCampaignID'] != 'NULL')
+            hours = np.minimum(fleet['ExposureDailyQuota'], self.daily_exposure_hours)[running & active]
+            if hours.size:
+                rewards["brand_progress"] = rw["brand_progress_per_hour"] * float(hours.sum())
+
+            self.sim.current_day = self.day_index
+            self.sim.simulate_single_day_columnar(fleet, running=running, daily_mileage=self.daily_mileage)
+
+            finished = int((active & ~fleet['BrandingActive']).sum())
+            if finished:
+                rewards["brand_completion"] = rw["brand_completion_bonus"] * finished
+
+            # Maintenance closes extra job cards (the simulator already closed one); running trains pick up new ones
+            open_jobs = fleet['OpenJobCards']
+            closed = np.where(actions == 2, np.minimum(open_jobs, max(0, self.jobcard_reduction - 1)), 0)
+            new_jobs = self.rng.poisson(self.jobcard_lambda, size=self.n_trains) * running if self.jobcard_lambda > 0 else 0
+            open_jobs = open_jobs - closed + new_jobs
+            fleet['OpenJobCards'] = open_jobs
+            fleet['ClosedJobCards'] = fleet['ClosedJobCards'] + closed
+            fleet['JobCardStatus'] = np.where(open_jobs > 0, JOB_CARD_OPEN, JOB_CARD_CLOSE).astype(fleet['JobCardStatus'].dtype)
+            unresolved = int((open_jobs > 0).sum())
+            if unresolved:
+                rewards["jobcards_unresolved"] = rw["jobcard_unresolved_daily_penalty"] * unresolved
+
+            self.day_index += 1
+            self.today_sim = self.today + datetime.timedelta(days=self.day_index)
+            return {"rewards": rewards}
+
+        def _build_output_df(self):
+            return self.fleet.to_dataframe()
+
 else:
     KMrlOneNightEnv = None
+    TrainSchedulingEnvMultiDay = None
 
 # ------------------ Training & Inference Utilities ------------------
 
-def train_ppo(csv_path: str, model_out: str = "kmrl_ppo.zip", timesteps: int = 100000, seed: int = 42):
-    """Train PPO model with proper configuration"""
+def predict_fleet(model, env, tie_tolerance: float = 1e-6) -> np.ndarray:
+    """
+    Deterministic actions for a whole episode of env, batched: identical to calling
+    model.predict(obs, deterministic=True) train by train while stepping the env.
+    Each train's observation depends on earlier decisions only through the running context,
+    so the batch is re-evaluated until the decisions reach their fixed point; every pass
+    fixes at least one more leading train and only rows whose observation changed are recomputed.
+    Near-ties are re-decided with single-observation predict so float noise cannot flip them.
+    """
+    import torch
+
+    n = len(env.work_df)
+    if n == 0:
+        return np.zeros(0, dtype=int)
+    features = env.features
+    actions = np.zeros(n, dtype=int)
+    observations = np.concatenate([features, env.context_matrix(actions)], axis=1)
+    stale = np.ones(n, dtype=bool)
+
+    for _ in range(n + 1):
+        rows = np.flatnonzero(stale)
+        with torch.no_grad():
+            obs_tensor, _ = model.policy.obs_to_tensor(observations[rows])
+            probs = model.policy.get_distribution(obs_tensor).distribution.probs.cpu().numpy()
+        chosen = probs.argmax(axis=1)
+        top_two = np.sort(probs, axis=1)[:, -2:]
+        for i in np.flatnonzero(top_two[:, 1] - top_two[:, 0] <= tie_tolerance):
+            chosen[i], _ = model.predict(observations[rows[i]], deterministic=True)
+        actions[rows] = chosen
+
+        updated = np.concatenate([features, env.context_matrix(actions)], axis=1)
+        stale = (updated != observations).any(axis=1)
+        observations = updated
+        if not stale.any():
+            break
+    return actions
+
+# ------------------ Exact nightly induction (MILP) ------------------
+
+FITNESS_DAYS_COLUMNS = ["RollingStockFitnessExpiry_days", "SignallingFitnessExpiry_days", "TelecomFitnessExpiry_days"]
+
+def action_rewards(df: pd.DataFrame, cfg: Dict[str, Any] = DEFAULT_CONFIG) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Reward of putting each train in_service / standby / under_maintenance (n_trains x 3) under
+    KMrlOneNightEnv.step()'s shaping, including the end-of-night bonus for maintaining a train
+    with open job cards. Also returns the fitness-expired and worn-out (brake/HVAC) masks.
+    df is a preprocessed fleet table (numeric columns, *_flag and *_days columns).
+    """
+    rw = cfg["rw"]
+    n = len(df)
+
+    def col(name):
+        if name not in df.columns:
+            return np.zeros(n)
+        return pd.to_numeric(df[name], errors="coerce").fillna(0.0).to_numpy(dtype=float)
+
+    open_jobs = np.trunc(col("OpenJobCards"))
+    brake, hvac = col("BrakepadWear%"), col("HVACWear%")
+    shunts = col("ShuntingMovesRequired")
+    branding = col("BrandingActive_flag") == 1
+    cleaning_required = col("CleaningRequired_flag") == 1
+    in_progress = (df["CleaningSlotStatus"] == "in_progress").to_numpy() if "CleaningSlotStatus" in df.columns else np.zeros(n, dtype=bool)
+    expired = np.zeros(n, dtype=bool)
+    for c in FITNESS_DAYS_COLUMNS:
+        expired |= col(c) <= 0
+    worn = (brake >= cfg["brake_threshold"]) | (hvac >= cfg["hvac_threshold"])
+    brand_missed = np.where(branding, -3.0, 0.0)
+
+    rewards = np.empty((n, 3))
+    rewards[:, 0] = (
+        rw["fit_safe"]
+        + np.where(open_jobs > 0, rw["inservice_jobcard_penalty_per_job"] * open_jobs, 3.0)
+        + np.where(col("MileageSinceLastServiceKM") >= float(cfg["mileage_service_threshold"]), -15.0, 2.0)
+        + np.where(branding, 8.0, 0.0)
+        + np.where(in_progress, -10.0, np.where(cleaning_required, -2.0, 0.0))
+        + np.where(shunts > 0, rw["shunt_penalty_per_move"] * shunts, 0.0)
+    )
+    rewards[:, 1] = (
+        np.where(~expired & (open_jobs < 2), rw["standby_penalty"], 0.0)
+        + brand_missed
+        + np.where(cleaning_required, -2.0, 0.0)
+    )
+    rewards[:, 2] = (
+        np.where((open_jobs >= 2) | worn, rw["maintenance_when_needed"], -5.0)
+        + brand_missed
+        + np.where(open_jobs > 0, 5.0, 0.0)
+    )
+    return rewards, expired, worn
+
+def solve_induction_milp(df: pd.DataFrame, cfg: Dict[str, Any] = DEFAULT_CONFIG) -> Tuple[np.ndarray, float]:
+    """
+    Provably optimal night plan as an integer program (scipy.optimize.milp, HiGHS).
+    One binary per train and action plus one for the too-many-standby penalty; fitness-expired and
+    worn-out trains never run, and exactly min(service_quota, runnable trains) trains are put in service.
+    Returns (actions, objective) where objective is the env's episode reward for the plan.
+    """
+    n = len(df)
+    if n == 0:
+        return np.zeros(0, dtype=int), 0.0
+    rw = cfg["rw"]
+    quota = int(cfg["service_quota"])
+    rewards, expired, worn = action_rewards(df, cfg)
+    runnable = ~expired & ~worn
+    target = min(quota, int(runnable.sum()))
+
+    # Variables: x[3*i + a] for train i and action a, then the standby-penalty binary z
+    n_vars = 3 * n + 1
+    z = 3 * n
+    cost = np.append(-rewards.ravel(), 20.0)  # milp minimizes; z costs the env's too_many_standby penalty
+    upper = np.ones(n_vars)
+    upper[0:z:3][~runnable] = 0
+
+    trains = np.arange(n)
+    one_action = sparse.csr_matrix(
+        (np.ones(3 * n), (np.repeat(trains, 3), np.arange(3 * n))), shape=(n, n_vars)
+    )
+    quota_row = sparse.csr_matrix((np.ones(n), (np.zeros(n, dtype=int), 3 * trains)), shape=(1, n_vars))
+    standby_row = sparse.csr_matrix(
+        (np.append(np.ones(n), -float(n)), (np.zeros(n + 1, dtype=int), np.append(3 * trains + 1, z))),
+        shape=(1, n_vars)
+    )
+    constraints = [
+        LinearConstraint(one_action, 1, 1),
+        LinearConstraint(quota_row, target, target),
+        LinearConstraint(standby_row, -np.inf, n // 2),  # more than half on standby only with z = 1
+    ]
+
+    result = milp(cost, constraints=constraints, integrality=np.ones(n_vars), bounds=Bounds(0, upper))
+    if not result.success:
+        raise RuntimeError(f"Induction MILP failed: {result.message}")
+
+    actions = result.x[:z].reshape(n, 3).argmax(axis=1)
+    quota_term = rw["quota_hit"] if target == quota else rw["quota_miss"] * (quota - target)
+    return actions, float(-result.fun + quota_term)
+
+def make_env(csv_path: str, seed: int):
+    """Seeded environment factory for the vectorized training envs"""
+    def _init():
+        return KMrlOneNightEnv(csv_path, seed=seed)
+    return _init
+
+def train_ppo(csv_path: Union[str, List[str]], model_out: str = "kmrl_ppo.zip", timesteps: int = 100000, seed: int = 42,
+              n_envs: int = 1, vec_env: str = "dummy"):
+    """
+    Train PPO model with proper configuration.
+    n_envs seeded environments are spread round-robin over the given fleet CSVs and stepped
+    in-process (vec_env="dummy") or in worker processes (vec_env="subproc").
+    """
     if not SB3_AVAILABLE:
         raise RuntimeError("stable-baselines3 not installed")
+    csv_paths = [csv_path] if isinstance(csv_path, str) else list(csv_path)
+    n_envs = max(1, int(n_envs))
     
-    print("Creating environment...")
+    print(f"Creating {n_envs} environment(s) over {len(csv_paths)} fleet CSV(s)...")
     # Create vectorized environment
-    env = DummyVecEnv([lambda: KMrlOneNightEnv(csv_path, seed=seed)])
+    env_fns = [make_env(csv_paths[i % len(csv_paths)], seed + i) for i in range(n_envs)]
+    if vec_env == "subproc" and n_envs > 1:
+        env = SubprocVecEnv(env_fns)
+    else:
+        env = DummyVecEnv(env_fns)
     
     print("Initializing PPO model...")
     # PPO with tuned hyperparameters for this environment
@@ -430,8 +828,8 @@ def train_ppo(csv_path: str, model_out: str = "kmrl_ppo.zip", timesteps: int = 1
         "MlpPolicy",
         env,
         learning_rate=3e-4,
-        n_steps=512,  # Reduced for faster updates
-        batch_size=64,
+        n_steps=512,  # Reduced for faster updates; per env, so each rollout holds 512 * n_envs samples
+        batch_size=64 * n_envs,  # Same number of minibatches per epoch as a single env
         n_epochs=10,
         gamma=0.95,  # Slightly lower discount for immediate rewards
         gae_lambda=0.9,
@@ -449,21 +847,21 @@ def train_ppo(csv_path: str, model_out: str = "kmrl_ppo.zip", timesteps: int = 1
     print(f"Training for {timesteps} timesteps...")
     
     # Training with periodic evaluation
-    eval_env = DummyVecEnv([lambda: KMrlOneNightEnv(csv_path, seed=seed+1)])
+    eval_env = DummyVecEnv([make_env(csv_paths[0], seed + n_envs)])
     
     # Callbacks for better training monitoring
     eval_callback = EvalCallback(
         eval_env,
         best_model_save_path="./kmrl_models/",
         log_path="./kmrl_logs/",
-        eval_freq=5000,
+        eval_freq=max(5000 // n_envs, 1),  # callback frequencies count vectorized steps
         deterministic=True,
         render=False,
         n_eval_episodes=5
     )
     
     checkpoint_callback = CheckpointCallback(
-        save_freq=10000,
+        save_freq=max(10000 // n_envs, 1),
         save_path="./kmrl_checkpoints/",
         name_prefix="kmrl_model"
     )
@@ -477,29 +875,66 @@ def train_ppo(csv_path: str, model_out: str = "kmrl_ppo.zip", timesteps: int = 1
     
     # Save final model
     model.save(model_out)
+    env.close()
     print(f"Model saved to {model_out}")
     
     # Test the model
     print("\nTesting trained model...")
-    test_env = KMrlOneNightEnv(csv_path, seed=seed+100)
-    obs, _ = test_env.reset()
+    test_env = KMrlOneNightEnv(csv_paths[0], seed=seed+100)
     
     action_counts = {0: 0, 1: 0, 2: 0}
-    for _ in range(test_env.n_trains):
-        action, _ = model.predict(obs, deterministic=True)
-        obs, reward, terminated, truncated, info = test_env.step(action)
+    for action in predict_fleet(model, test_env):
         action_counts[int(action)] += 1
-        if terminated:
-            break
     
     print(f"Action distribution: in_service={action_counts[0]}, standby={action_counts[1]}, maintenance={action_counts[2]}")
     
     return model_out
 
-def infer_policy(csv_path: str, model_path: str = None, out_csv: str = "next_day_plan_rl.csv", heuristic_fallback: bool = True):
-    """Run inference with trained model or heuristic"""
-    df = pd.read_csv(csv_path, dtype=str).fillna("")
-    df.columns = [c.strip() for c in df.columns]
+def top_k_positions(values: np.ndarray, k: int) -> np.ndarray:
+    """
+    Positions of the k largest values in O(n), ties at the cut broken by lower position
+    (the same trains a stable descending sort would put first), in position order.
+    """
+    n = len(values)
+    if k <= 0:
+        return np.zeros(0, dtype=int)
+    if k >= n:
+        return np.arange(n)
+    kth = values[np.argpartition(values, n - k)[n - k]]
+    above = np.flatnonzero(values > kth)
+    ties = np.flatnonzero(values == kth)[:k - len(above)]
+    return np.sort(np.concatenate([above, ties]))
+
+def heuristic_assignments(df: pd.DataFrame, service_quota: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rule-based fallback plan (OperationalStatus and reason per train) from boolean masks:
+    expired fitness -> standby, worn brakes / HVAC or 3+ open job cards -> maintenance, and the
+    service_quota highest RL_priority trains among the rest go in service.
+    """
+    eligible = df["eligible"].to_numpy() != 0
+    brake = eligible & (df["BrakepadWear%"].to_numpy() >= DEFAULT_CONFIG["brake_threshold"])
+    hvac = eligible & ~brake & (df["HVACWear%"].to_numpy() >= DEFAULT_CONFIG["hvac_threshold"])
+    jobs = eligible & ~brake & ~hvac & (df["OpenJobCards"].to_numpy() >= 3)
+    candidates = np.flatnonzero(eligible & ~brake & ~hvac & ~jobs)
+    selected = np.zeros(len(df), dtype=bool)
+    selected[candidates[top_k_positions(df["RL_priority"].to_numpy(dtype=float)[candidates], service_quota)]] = True
+
+    statuses = np.select([~eligible, brake | hvac | jobs, selected], ["standby", "under_maintenance", "in_service"], "standby")
+    reasons = np.select(
+        [~eligible, brake, hvac, jobs, selected],
+        ["fitness_expired", "brake_maintenance", "hvac_maintenance", "high_jobcards", "selected"],
+        "quota_exhausted"
+    )
+    return statuses.astype(object), reasons.astype(object)
+
+def plan_next_day(fleet: pd.DataFrame, model=None, optimize: bool = False) -> pd.DataFrame:
+    """
+    Assign next-day OperationalStatus in-process (DataFrame in, DataFrame out).
+    optimize=True solves the night exactly (MILP); otherwise uses the loaded PPO model when given,
+    else the heuristic. fleet is not modified.
+    """
+    df = load_fleet_frame(fleet)
+    raw = df.copy()  # the env preprocesses the untouched table
     # Numeric conversion
     numeric_cols = [
         "OpenJobCards", "ClosedJobCards", "ExposureHoursAccrued", "ExposureHoursTarget",
@@ -522,30 +957,33 @@ def infer_policy(csv_path: str, model_path: str = None, out_csv: str = "next_day
     def _days_until_col(col):
         if col not in df.columns:
             return np.zeros(len(df), dtype=int)
-        parsed = df[col].apply(parse_date)
         base = parse_date(df.at[0, "CURRENT_DATE"]) if "CURRENT_DATE" in df.columns else datetime.date.today()
-        return parsed.apply(lambda d: days_until(d, base) if d is not None else 0)
+        return days_until_col(df[col], base)
 
     df["RollingStockFitnessExpiry_days"] = _days_until_col("RollingStockFitnessExpiryDate")
     df["SignallingFitnessExpiry_days"] = _days_until_col("SignallingFitnessExpiryDate")
     df["TelecomFitnessExpiry_days"] = _days_until_col("TelecomFitnessExpiryDate")
 
+    status_map = {0: "in_service", 1: "standby", 2: "under_maintenance"}
+
+    if optimize:
+        actions, objective = solve_induction_milp(df)
+        print(f"[RL] Optimal induction plan found (objective {objective:.2f})")
+        _, expired, worn = action_rewards(df)
+        maintained = actions == 2
+        df["NextDayOperationalStatus"] = [status_map[a] for a in actions.tolist()]
+        df["ReasonForStatus"] = np.select(
+            [expired & (actions == 1), maintained & (df["BrakepadWear%"] >= DEFAULT_CONFIG["brake_threshold"]).to_numpy(),
+             maintained & worn, actions == 0],
+            ["fitness_expired", "brake_maintenance", "hvac_maintenance", "optimal_selected"],
+            "optimal"
+        )
+
     # Use RL model if available
-    if model_path and SB3_AVAILABLE and os.path.exists(model_path):
-        print(f"Using trained model from {model_path}")
-        model = PPO.load(model_path)
-        env = KMrlOneNightEnv(csv_path)
-        obs, _ = env.reset()
+    elif model is not None:
+        env = KMrlOneNightEnv(raw)
+        actions = [int(action) for action in predict_fleet(model, env)]
         
-        actions = []
-        for i in range(env.n_trains):
-            action, _ = model.predict(obs, deterministic=True)
-            actions.append(int(action))
-            obs, reward, terminated, truncated, info = env.step(action)
-            if terminated:
-                break
-        
-        status_map = {0: "in_service", 1: "standby", 2: "under_maintenance"}
         df["NextDayOperationalStatus"] = [status_map[a] for a in actions]
         
         # Add XAI explanations
@@ -587,33 +1025,9 @@ def infer_policy(csv_path: str, model_path: str = None, out_csv: str = "next_day
             df["BrandingActive_flag"] * 10.0
         )
         
-        df_sorted = df.sort_values(["eligible", "RL_priority"], ascending=[False, False]).reset_index()
-        
-        assignments = []
-        remaining_quota = int(DEFAULT_CONFIG["service_quota"])
-        
-        for idx, row in df_sorted.iterrows():
-            orig_idx = int(row["index"])
-            
-            # Check constraints
-            if row["eligible"] == 0:
-                assignments.append((orig_idx, "standby", "fitness_expired"))
-            elif row["BrakepadWear%"] >= DEFAULT_CONFIG["brake_threshold"]:
-                assignments.append((orig_idx, "under_maintenance", "brake_maintenance"))
-            elif row["HVACWear%"] >= DEFAULT_CONFIG["hvac_threshold"]:
-                assignments.append((orig_idx, "under_maintenance", "hvac_maintenance"))
-            elif row["OpenJobCards"] >= 3:
-                assignments.append((orig_idx, "under_maintenance", "high_jobcards"))
-            elif remaining_quota > 0:
-                assignments.append((orig_idx, "in_service", "selected"))
-                remaining_quota -= 1
-            else:
-                assignments.append((orig_idx, "standby", "quota_exhausted"))
-        
-        # Sort back to original order
-        assignments.sort(key=lambda x: x[0])
-        df["NextDayOperationalStatus"] = [a[1] for a in assignments]
-        df["ReasonForStatus"] = [a[2] for a in assignments]
+        statuses, reasons = heuristic_assignments(df, int(DEFAULT_CONFIG["service_quota"]))
+        df["NextDayOperationalStatus"] = statuses
+        df["ReasonForStatus"] = reasons
     
     df["OperationalStatus"] = df["NextDayOperationalStatus"]
     df = df.drop(columns=["NextDayOperationalStatus"])
@@ -621,6 +1035,19 @@ def infer_policy(csv_path: str, model_path: str = None, out_csv: str = "next_day
     if "ReasonForStatus" not in df.columns:
         df["ReasonForStatus"] = ""
 
+    return df
+
+def infer_policy(csv_path: str, model_path: str = None, out_csv: str = "next_day_plan_rl.csv", heuristic_fallback: bool = True,
+                 optimize: bool = False):
+    """Run inference with trained model, heuristic, or the exact MILP planner (optimize=True)"""
+    model = None
+    if optimize:
+        print("Using exact MILP planner")
+    elif model_path and SB3_AVAILABLE and os.path.exists(model_path):
+        print(f"Using trained model from {model_path}")
+        model = PPO.load(model_path)
+    df = plan_next_day(load_fleet_frame(csv_path), model=model, optimize=optimize)
+
     # Save **all** columns with added/updated columns
     df.to_csv(out_csv, index=False)
     print(f"Saved assignments to {out_csv}")
@@ -630,19 +1057,27 @@ def infer_policy(csv_path: str, model_path: str = None, out_csv: str = "next_day
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--mode", choices=["train", "infer"], required=True)
-    parser.add_argument("--csv", required=True, help="Path to MOO CSV (today)")
+    parser.add_argument("--csv", nargs="+", required=True,
+                        help="Path to MOO CSV (today); training accepts several fleet snapshots")
     parser.add_argument("--model", help="Path to saved model for inference (optional)")
     parser.add_argument("--out", default="next_day_plan_rl.csv", help="Output CSV path")
     parser.add_argument("--timesteps", type=int, default=10000, help="Timesteps for quick training")
     parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--n-envs", type=int, default=1, help="Parallel training environments")
+    parser.add_argument("--vec-env", choices=["subproc", "dummy"], default="dummy",
+                        help="Step environments in worker processes (subproc) or in-process (dummy)")
+    parser.add_argument("--optimize", action="store_true", help="Infer with the exact MILP planner instead of PPO/heuristic")
     args = parser.parse_args()
     if args.mode == "train":
         if not SB3_AVAILABLE:
             raise RuntimeError("stable-baselines3 or gym not installed in this Python environment. Install first.")
         model_path = args.model if args.model else "kmrl_ppo_model.zip"
-        print(f"Training PPO on {args.csv} for {args.timesteps} timesteps...")
-        train_ppo(args.csv, model_out=model_path, timesteps=args.timesteps, seed=args.seed)
+        print(f"Training PPO on {', '.join(args.csv)} for {args.timesteps} timesteps with {args.n_envs} {args.vec_env} env(s)...")
+        train_ppo(args.csv, model_out=model_path, timesteps=args.timesteps, seed=args.seed,
+                  n_envs=args.n_envs, vec_env=args.vec_env)
         print("Training finished. Run inference with --mode infer --model <model_path>")
 
     elif args.mode == "infer":
-        infer_policy(args.csv, model_path=args.model, out_csv=args.out)
+        if len(args.csv) > 1:
+            parser.error("--mode infer takes a single --csv")
+        infer_policy(args.csv[0], model_path=args.model, out_csv=args.out, optimize=args.optimize)
@@ -1,18 +1,18 @@
-import os
 import io
-import csv
-import json
-import sys
-import tempfile
-import subprocess
-from pathlib import Path
 import pandas as pd
-import httpx  # 👈 Async HTTP client
-from typing import List, Dict, Any
+from datetime import date
+from typing import List, Dict, Any, Optional
 from fastapi import HTTPException, UploadFile
 from fastapi.responses import StreamingResponse
 from app.api.rl.models import RLRequest, RLResponse, RLConfig
+from app.api.jobs.handler import JobHandler
+from app.api.jobs.models import JobSubmitted
+from app.api.rl.registry import policy_registry, file_sha256
+from app.api.rl.service import RLService
+from app.core.executors import ExecutorManager
+from app.core.jobs import JobManager
 from app.core.storage import StorageManager
+from app.core.webhooks import WebhookDispatcher
 from app.core.config import settings
 
 
@@ -23,11 +23,13 @@ class RLHandler:
     async def schedule_from_file_path(
         file_path: str,
         config: RLRequest,
-        runId: str
+        runId: str,
+        job_id: Optional[str] = None
     ) -> dict:
         """
         Start RL scheduling from file path using the new RL.py implementation.
         Saves results to organized RL output folder and sends webhook notification.
+        When run as a background job, the current stage is reported to job_id.
         """
         try:
             # Step 1: Log pipeline stage start
@@ -37,81 +39,64 @@ class RLHandler:
                 "config": config.dict()
             })
             
-            # Step 2: Load CSV from MOO output
-            df = await StorageManager.read_csv_from_path(file_path)
-            print(f"[RL] Loaded MOO result: {len(df)} trains from {file_path}")
-            
-            # Step 3: Save CSV temporarily for RL.py processing
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, newline='') as temp_file:
-                temp_path = temp_file.name
-                df.to_csv(temp_file, index=False)
-            
-            # Step 4: Run RL.py in inference mode
-            rl_script_path = Path(__file__).parent / "RL.py"
-            
-            # Use Windows-compatible temp directory
-            temp_dir = tempfile.gettempdir()
-            result_path = os.path.join(temp_dir, f"rl_result_{runId}.csv")
-            
-            # Ensure temp directory exists
-            os.makedirs(temp_dir, exist_ok=True)
-            
-            # Execute RL.py with subprocess
-            cmd = [
-                sys.executable, str(rl_script_path),
-                "--mode", "infer",
-                "--csv", temp_path,
-                "--out", result_path
-            ]
-            
-            print(f"[RL] Running command: {' '.join(cmd)}")
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-            
-            if result.returncode != 0:
-                error_msg = f"RL processing failed: {result.stderr}"
-                print(f"[RL Error] {error_msg}")
-                raise Exception(error_msg)
-            
-            print(f"[RL] RL.py completed successfully. Output: {result.stdout}")
-            
-            # Step 5: Load the result CSV
-            if not os.path.exists(result_path):
-                raise Exception(f"RL result file not found at {result_path}")
+            # Step 2: Reuse the cached plan of a byte-identical input with the same config and model
+            cache_key = await StorageManager.stage_cache_key(file_path, "rl", {
+                "config": config.dict(),
+                "model_sha256": await RLHandler.model_version(config),
+                # Inputs without CURRENT_DATE are planned from today
+                "today": date.today().isoformat()
+            })
+            cached = await StorageManager.load_cached_result(cache_key, "RL_FINAL", runId)
+            if cached is not None:
+                final_result_path, summary = cached
+            else:
+                # Step 3: Load CSV from MOO output (as raw text, the way RL.py reads it)
+                JobManager.update(job_id, stage="loading")
+                df = await StorageManager.read_csv_from_path(file_path, dtype=str)
+                print(f"[RL] Loaded MOO result: {len(df)} trains from {file_path}")
                 
-            result_df = pd.read_csv(result_path)
-            print(f"[RL] Result loaded: {len(result_df)} trains with scheduling")
-            
-            # Step 6: Save result to organized RL output folder
-            final_result_path = await StorageManager.save_rl_result(runId, result_df)
-            print(f"[RL] Final result saved to: {final_result_path}")
+                # Step 4: Run RL.py inference on the executor process pool
+                JobManager.update(job_id, stage="planning")
+                result_df = await RLHandler.run_inference(df, config.model, config.optimize)
+                print(f"[RL] Inference completed: {len(result_df)} trains with scheduling")
+                
+                # Step 5: Save result to organized RL output folder
+                JobManager.update(job_id, stage="saving")
+                final_result_path = await StorageManager.save_rl_result(runId, result_df)
+                print(f"[RL] Final result saved to: {final_result_path}")
+                
+                summary = {
+                    "total_trains": len(result_df),
+                    "trains_in_service": len(result_df[result_df.get("OperationalStatus", "") == "in_service"]),
+                    "trains_under_maintenance": len(result_df[result_df.get("OperationalStatus", "") == "under_maintenance"]),
+                    "trains_standby": len(result_df[result_df.get("OperationalStatus", "") == "standby"]),
+                    "operational_status_distribution": result_df.get("OperationalStatus", pd.Series()).value_counts().to_dict()
+                }
+                await StorageManager.store_cached_result(cache_key, final_result_path, summary)
             
-            # Step 7: Log pipeline stage completion
+            # Step 6: Log pipeline stage completion
             await StorageManager.save_pipeline_log(runId, "rl_complete", {
                 "message": "RL scheduling completed successfully",
                 "input_file_path": file_path,
                 "output_file_path": final_result_path,
-                "total_trains": len(result_df),
-                "trains_in_service": len(result_df[result_df.get("OperationalStatus", "") == "in_service"]),
-                "trains_under_maintenance": len(result_df[result_df.get("OperationalStatus", "") == "under_maintenance"]),
-                "trains_standby": len(result_df[result_df.get("OperationalStatus", "") == "standby"])
+                "total_trains": summary["total_trains"],
+                "trains_in_service": summary["trains_in_service"],
+                "trains_under_maintenance": summary["trains_under_maintenance"],
+                "trains_standby": summary["trains_standby"],
+                "cached": cached is not None
             })
             
-            # Step 8: Send webhook notification
+            # Step 7: Send webhook notification
             await RLHandler._send_webhook(runId, final_result_path, "success")
             
-            # Step 9: Cleanup temporary files
-            cleanup_files = [temp_path, result_path]
-            for cleanup_file in cleanup_files:
-                if os.path.exists(cleanup_file):
-                    os.remove(cleanup_file)
-            
             return {
                 "success": True,
                 "message": "RL scheduling completed successfully",
                 "runId": runId,
                 "result_file_path": final_result_path,
-                "total_trains": len(result_df),
-                "operational_status_distribution": result_df.get("OperationalStatus", pd.Series()).value_counts().to_dict(),
+                "total_trains": summary["total_trains"],
+                "operational_status_distribution": summary["operational_status_distribution"],
+                "cached": cached is not None,
                 "config_used": config.dict()
             }
             
@@ -131,25 +116,64 @@ class RLHandler:
             raise HTTPException(status_code=500, detail=error_msg)
 
     @staticmethod
-    async def _send_webhook(runId: str, filePath: str = None, status: str = "success", error_message: str = None):
-        """Send async webhook call to backend after RL scheduling completes"""
-        async with httpx.AsyncClient() as client:
+    async def submit_from_file_path(file_path: str, config: RLRequest, runId: str) -> JobSubmitted:
+        """
+        Queue schedule_from_file_path as a background job and return its id at once
+        (a missing input file or unknown model is rejected before queueing)
+        """
+        if not await StorageManager.file_exists(file_path):
+            raise HTTPException(status_code=404, detail=f"File not found: {file_path}")
+        if config.model and not config.optimize:
             try:
-                payload = {
-                    "runId": runId,
-                    "status": status,
-                    "outputFilePath": filePath,
-                    "error": error_message,
-                    "metadata": {
-                        "processedAt": pd.Timestamp.now().isoformat(),
-                        "service": "rl"
-                    }
-                }
-                response = await client.post(RLHandler.WEBHOOK_URL, json=payload, timeout=5)
-                response.raise_for_status()
-                print(f"[RL] Webhook sent successfully → {payload}")
-            except Exception as e:
-                print(f"[RL] Failed to send webhook: {str(e)}")
+                policy_registry.resolve(config.model)
+            except KeyError as e:
+                raise HTTPException(status_code=404, detail=str(e.args[0]))
+        return JobHandler.submit(
+            "rl", runId,
+            lambda job_id: RLHandler.schedule_from_file_path(file_path, config, runId, job_id)
+        )
+
+    @staticmethod
+    async def model_version(config: RLRequest) -> Optional[str]:
+        """SHA-256 of the named registry policy's file (None for the heuristic, MILP or an unknown model)"""
+        if not config.model or config.optimize:
+            return None
+        try:
+            _, path = policy_registry.resolve(config.model)
+        except KeyError:
+            return None  # run_inference reports the unknown model
+        return await ExecutorManager.run_io(file_sha256, path)
+
+    @staticmethod
+    async def run_inference(df: pd.DataFrame, model_name: str = None, optimize: bool = False) -> pd.DataFrame:
+        """
+        Run RL.py's planner on the executor processes (no subprocess or temp files), with the
+        exact MILP planner when optimize is set, else the named registry policy or the heuristic
+        when no model is given. Unknown model names are rejected before any work is queued.
+        """
+        if model_name and not optimize:
+            try:
+                policy_registry.resolve(model_name)
+            except KeyError as e:
+                raise HTTPException(status_code=404, detail=str(e.args[0]))
+        if model_name and not optimize:
+            return await ExecutorManager.run_model(RLService.plan_fleet, df, model_name, optimize)
+        return await ExecutorManager.run_cpu(RLService.plan_fleet, df, model_name, optimize)
+
+    @staticmethod
+    async def _send_webhook(runId: str, filePath: str = None, status: str = "success", error_message: str = None):
+        """Queue the RL-complete webhook for the backend (delivered in the background)"""
+        payload = {
+            "runId": runId,
+            "status": status,
+            "outputFilePath": filePath,
+            "error": error_message,
+            "metadata": {
+                "processedAt": pd.Timestamp.now().isoformat(),
+                "service": "rl"
+            }
+        }
+        await WebhookDispatcher.enqueue(RLHandler.WEBHOOK_URL, payload, "RL")
 
     @staticmethod
     async def schedule_and_return_json(
@@ -161,48 +185,8 @@ class RLHandler:
             # Process uploaded file
             df = await RLHandler.process_csv_file(file)
             
-            # Generate a temporary runId for non-pipeline calls
-            import uuid
-            runId = f"rl_{uuid.uuid4().hex[:8]}"
-            
-            # Save CSV temporarily for RL.py processing
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, newline='') as temp_file:
-                temp_path = temp_file.name
-                df.to_csv(temp_file, index=False)
-            
-            # Run RL.py in inference mode
-            rl_script_path = Path(__file__).parent / "RL.py"
-            
-            # Use Windows-compatible temp directory
-            temp_dir = tempfile.gettempdir()
-            result_path = os.path.join(temp_dir, f"rl_result_{runId}.csv")
-            
-            # Ensure temp directory exists
-            os.makedirs(temp_dir, exist_ok=True)
-            
-            cmd = [
-                sys.executable, str(rl_script_path),
-                "--mode", "infer",
-                "--csv", temp_path,
-                "--out", result_path
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-            
-            if result.returncode != 0:
-                raise Exception(f"RL processing failed: {result.stderr}")
-            
-            # Load results
-            if not os.path.exists(result_path):
-                raise Exception(f"RL result file not found at {result_path}")
-                
-            result_df = pd.read_csv(result_path)
-            
-            # Cleanup
-            cleanup_files = [temp_path, result_path]
-            for cleanup_file in cleanup_files:
-                if os.path.exists(cleanup_file):
-                    os.remove(cleanup_file)
+            # Run RL.py inference on the executor process pool
+            result_df = await RLHandler.run_inference(df, config.model, config.optimize)
             
             # Return JSON response
             return {
@@ -212,6 +196,8 @@ class RLHandler:
                 "assignments": result_df.to_dict('records')
             }
             
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"RL scheduling failed: {str(e)}")
     
@@ -235,6 +221,8 @@ class RLHandler:
             
             return simple_assignments
             
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"RL scheduling failed: {str(e)}")
     
@@ -246,9 +234,9 @@ class RLHandler:
             if not file.filename.endswith('.csv'):
                 raise HTTPException(status_code=400, detail="Only CSV files are supported")
             
-            # Read CSV content
+            # Read CSV content (as raw text, the way RL.py reads it)
             content = await file.read()
-            df = pd.read_csv(io.StringIO(content.decode('utf-8')))
+            df = await ExecutorManager.run_io(pd.read_csv, io.StringIO(content.decode('utf-8')), dtype=str)
             
             if df.empty:
                 raise HTTPException(status_code=400, detail="CSV file is empty")
@@ -293,7 +281,9 @@ class RLHandler:
             assignments_df = pd.DataFrame(full_response.get("assignments", []))
             
             # Return CSV response
-            return RLHandler.create_csv_response(assignments_df, "rl_schedule.csv")
+            return await ExecutorManager.run_io(RLHandler.create_csv_response, assignments_df, "rl_schedule.csv")
             
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"RL CSV scheduling failed: {str(e)}")
\ No newline at end of file
@@ -13,6 +13,8 @@ class RLRequest(BaseModel):
     today: Optional[str] = None
     seed: Optional[int] = None
     format: Optional[str] = "json"
+    model: Optional[str] = None  # registry model name; None = heuristic
+    optimize: Optional[bool] = False  # exact MILP plan instead of PPO/heuristic
 
     class Config:
         json_schema_extra = {
@@ -59,6 +61,27 @@ class RLResponse(BaseModel):
             }
         }
 
+class RLModelInfo(BaseModel):
+    """A policy available in the RL model registry"""
+    name: str
+    path: str
+    size_bytes: int
+    modified: float
+    loaded: bool
+    sha256: Optional[str] = None
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "name": "kmrl_models/best_model",
+                "path": "./kmrl_models/best_model.zip",
+                "size_bytes": 182345,
+                "modified": 1758214732.18,
+                "loaded": True,
+                "sha256": "3f5a..."
+            }
+        }
+
 class RLConfig(BaseModel):
     """Configuration for RL endpoint"""
     SEED: int = 42
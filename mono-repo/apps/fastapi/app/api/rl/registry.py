@@ -0,0 +1,180 @@
+"""
+Warm registry of trained PPO policies for RL inference.
+Policies are deserialized once and the most recently used ones stay in memory (LRU).
+Inference with a policy runs on the executors' model process (ExecutorManager.run_model),
+so that process's registry is the one that loads policies and reports their load state.
+A cached policy is reloaded when its file changes: a changed mtime or size triggers a
+SHA-256 check, so touching a file without changing its contents costs no reload.
+Only policies trained on the one-night environment are offered: a zip's observation shape
+is read from its saved metadata (no deserialization), so multi-day policies never resolve.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import zipfile
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.api.rl import RL
+from app.core.config import settings
+
+MODEL_SUFFIX = ".zip"
+
+
+@dataclass
+class LoadedPolicy:
+    """A deserialized policy and the file state it was loaded from"""
+    model: Any
+    path: str
+    mtime_ns: int
+    size: int
+    sha256: str
+
+
+def saved_observation_shape(path: str) -> Optional[Tuple[int, ...]]:
+    """Observation shape recorded in a stable-baselines3 zip (None when it cannot be read)"""
+    try:
+        with zipfile.ZipFile(path) as archive:
+            data = json.loads(archive.read("data"))
+        return tuple(data["observation_space"]["_shape"])
+    except (OSError, KeyError, TypeError, ValueError, zipfile.BadZipFile):
+        return None
+
+
+def file_sha256(path: str) -> str:
+    """SHA-256 of a model file"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PolicyRegistry:
+    """Named PPO policies under one model directory, kept warm with LRU eviction"""
+
+    def __init__(self, model_dir: str, capacity: int = 4):
+        self.model_dir = model_dir
+        self.capacity = max(1, capacity)
+        self.loaded: "OrderedDict[str, LoadedPolicy]" = OrderedDict()
+        self.shapes: Dict[str, Tuple[Tuple[int, int], Optional[Tuple[int, ...]]]] = {}
+        self.lock = threading.Lock()
+
+    def scan(self) -> Dict[str, str]:
+        """
+        Model name -> file path for every policy zip in the model directory and its
+        immediate subdirectories (e.g. "kmrl_ppo_model", "kmrl_models/best_model").
+        """
+        models = {}
+        if not os.path.isdir(self.model_dir):
+            return models
+        for entry in sorted(os.scandir(self.model_dir), key=lambda e: e.name):
+            if entry.is_file() and entry.name.endswith(MODEL_SUFFIX):
+                models[entry.name[:-len(MODEL_SUFFIX)]] = entry.path
+            elif entry.is_dir() and not entry.name.startswith("."):
+                for sub in sorted(os.scandir(entry.path), key=lambda e: e.name):
+                    if sub.is_file() and sub.name.endswith(MODEL_SUFFIX):
+                        models[f"{entry.name}/{sub.name[:-len(MODEL_SUFFIX)]}"] = sub.path
+        return models
+
+    def observation_shape(self, path: str) -> Optional[Tuple[int, ...]]:
+        """Saved observation shape of a policy file, cached until the file changes"""
+        stat = os.stat(path)
+        cached = self.shapes.get(path)
+        if cached is not None and cached[0] == (stat.st_mtime_ns, stat.st_size):
+            return cached[1]
+        shape = saved_observation_shape(path)
+        self.shapes[path] = ((stat.st_mtime_ns, stat.st_size), shape)
+        return shape
+
+    def usable(self, path: str) -> bool:
+        """Whether a policy file can plan a night (an unreadable shape is left to load() to check)"""
+        shape = self.observation_shape(path)
+        return shape is None or shape == RL.ONE_NIGHT_OBSERVATION_SHAPE
+
+    def available(self) -> Dict[str, str]:
+        """Model name -> file path of the policies the one-night planner can use"""
+        return {name: path for name, path in self.scan().items() if self.usable(path)}
+
+    def resolve(self, name: str) -> Tuple[str, str]:
+        """Registry key and file path of a model name (KeyError when there is no such usable model)"""
+        key = name[:-len(MODEL_SUFFIX)] if name.endswith(MODEL_SUFFIX) else name
+        path = self.scan().get(key)
+        if path is None:
+            raise KeyError(f"Unknown RL model '{name}'")
+        if not self.usable(path):
+            raise KeyError(
+                f"RL model '{name}' expects observations of shape {self.observation_shape(path)}, "
+                f"not the one-night shape {RL.ONE_NIGHT_OBSERVATION_SHAPE}"
+            )
+        return key, path
+
+    def get(self, name: str) -> Any:
+        """Return the named policy, loading it on first use or after its file changed"""
+        key, path = self.resolve(name)
+        stat = os.stat(path)
+
+        with self.lock:
+            cached = self.loaded.get(key)
+            if cached is not None and (cached.mtime_ns, cached.size) != (stat.st_mtime_ns, stat.st_size):
+                sha256 = file_sha256(path)
+                if sha256 == cached.sha256:
+                    cached.mtime_ns, cached.size = stat.st_mtime_ns, stat.st_size
+                else:
+                    print(f"[RL] Model '{key}' changed on disk, reloading")
+                    cached = None
+
+            if cached is None:
+                cached = self.load(path)
+                print(f"[RL] Loaded model '{key}' from {path}")
+            self.loaded[key] = cached
+            self.loaded.move_to_end(key)
+
+            while len(self.loaded) > self.capacity:
+                evicted, _ = self.loaded.popitem(last=False)
+                print(f"[RL] Evicted model '{evicted}' from the registry")
+            return cached.model
+
+    def load(self, path: str) -> LoadedPolicy:
+        """Deserialize a policy file"""
+        if not RL.SB3_AVAILABLE:
+            raise RuntimeError("stable-baselines3 not installed")
+        stat = os.stat(path)
+        sha256 = file_sha256(path)
+        model = RL.PPO.load(path, device="cpu")
+        shape = tuple(model.observation_space.shape)
+        if shape != RL.ONE_NIGHT_OBSERVATION_SHAPE:
+            raise ValueError(
+                f"RL model {path} expects observations of shape {shape}, "
+                f"not the one-night shape {RL.ONE_NIGHT_OBSERVATION_SHAPE}"
+            )
+        return LoadedPolicy(model, path, stat.st_mtime_ns, stat.st_size, sha256)
+
+    def describe(self) -> List[Dict[str, Any]]:
+        """Usable models with their load state, for the /rl/models endpoint"""
+        with self.lock:
+            loaded = dict(self.loaded)
+        models = []
+        for name, path in self.available().items():
+            stat = os.stat(path)
+            entry = loaded.get(name)
+            models.append({
+                "name": name,
+                "path": path,
+                "size_bytes": stat.st_size,
+                "modified": stat.st_mtime,
+                "loaded": entry is not None,
+                "sha256": entry.sha256 if entry is not None else None,
+            })
+        return models
+
+
+policy_registry = PolicyRegistry(settings.RL_MODEL_DIR, settings.RL_MODEL_CACHE_SIZE)
+
+
+def describe_models() -> List[Dict[str, Any]]:
+    """policy_registry.describe() (module-level so it can run on the model process)"""
+    return policy_registry.describe()
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, File, UploadFile, Depends, Query
+from fastapi import APIRouter, File, UploadFile, Depends, Query, Response
 from fastapi.responses import StreamingResponse
 from typing import Union, List, Any, Optional
 from enum import Enum
 from pydantic import BaseModel
 
-from app.api.rl.models import RLRequest, RLResponse, RLConfig
+from app.api.rl.models import RLRequest, RLResponse, RLConfig, RLModelInfo
 from app.api.rl.handler import RLHandler
+from app.api.jobs.models import JobSubmitted
+from app.api.rl.registry import describe_models
+from app.core.executors import ExecutorManager
 from app.core.storage import StorageManager
 
 router = APIRouter(prefix="/rl", tags=["Reinforcement Learning"])
@@ -21,6 +24,9 @@ class RLFilePathRequest(BaseModel):
     jobcard_reduction_if_maintenance: Optional[int] = 2
     jobcard_new_per_day_lambda: Optional[float] = 0.1
     today: Optional[str] = None
+    model: Optional[str] = None
+    optimize: Optional[bool] = False
+    background: bool = True
 
 class ResponseFormat(str, Enum):
     """Response format options"""
@@ -41,9 +47,13 @@ class ResponseFormat(str, Enum):
     **Input:**
     - file_path: Path to MOO result CSV file in shared storage
     - runId: Pipeline run identifier for tracking
+    - model: Optional registry model name (see /rl/models); heuristic when omitted
+    - optimize: Solve the night exactly as an integer program (MILP) instead of PPO/heuristic
+    - background: Queue the run as a background job (default) instead of answering when it is done
     
     **Output:**
-    - Success/failure status
+    - background: 202 with the job id; poll `/jobs/{jobId}` for the stage and the artifact path
+    - otherwise: Success/failure status
     - RL scheduling result will be saved to shared storage
     - Webhook notification sent to backend upon completion
     
@@ -53,8 +63,9 @@ class ResponseFormat(str, Enum):
     """
 )
 async def start_rl_from_file_path(
-    request: RLFilePathRequest
-) -> dict:
+    request: RLFilePathRequest,
+    response: Response
+) -> Union[JobSubmitted, dict]:
     """
     Start RL scheduling from file path for pipeline integration.
     Results are saved to shared storage and webhook is sent to backend.
@@ -67,9 +78,14 @@ async def start_rl_from_file_path(
         daily_exposure_hours=request.daily_exposure_hours,
         jobcard_reduction_if_maintenance=request.jobcard_reduction_if_maintenance,
         jobcard_new_per_day_lambda=request.jobcard_new_per_day_lambda,
-        today=request.today
+        today=request.today,
+        model=request.model,
+        optimize=request.optimize
     )
     
+    if request.background:
+        response.status_code = 202
+        return await RLHandler.submit_from_file_path(request.file_path, config, request.runId)
     result = await RLHandler.schedule_from_file_path(
         request.file_path,
         config,
@@ -116,7 +132,9 @@ async def schedule_train_fleet(
     daily_exposure_hours: Optional[float] = Query(default=16.0, description="Daily exposure hours if train is branded"),
     jobcard_reduction_if_maintenance: Optional[int] = Query(default=2, description="Jobcard reduction if train is under maintenance"),
     jobcard_new_per_day_lambda: Optional[float] = Query(default=0.1, description="Lambda for new jobcard generation"),
-    today: Optional[str] = Query(default=None, description="Current date for simulation")
+    today: Optional[str] = Query(default=None, description="Current date for simulation"),
+    model: Optional[str] = Query(default=None, description="Registry model name (see /rl/models); heuristic when omitted"),
+    optimize: Optional[bool] = Query(default=False, description="Solve the night exactly (MILP) instead of PPO/heuristic")
 ) -> Any:
     """
     🎯 One API to rule them all! 
@@ -135,7 +153,9 @@ async def schedule_train_fleet(
         daily_exposure_hours=daily_exposure_hours,
         jobcard_reduction_if_maintenance=jobcard_reduction_if_maintenance,
         jobcard_new_per_day_lambda=jobcard_new_per_day_lambda,
-        today=today
+        today=today,
+        model=model,
+        optimize=optimize
     )
     
     # Route to appropriate handler based on format
@@ -146,6 +166,16 @@ async def schedule_train_fleet(
     else:  # json format (default)
         return await RLHandler.schedule_and_return_json(file, config)
 
+@router.get(
+    "/models",
+    response_model=List[RLModelInfo],
+    summary="List RL Models",
+    description="Trained PPO policies available to the `model` parameter, and whether each is loaded in the warm registry"
+)
+async def list_rl_models() -> List[RLModelInfo]:
+    """List registry models, with the load state of the model process that runs inference"""
+    return [RLModelInfo(**info) for info in await ExecutorManager.run_model(describe_models)]
+
 @router.get(
     "/info",
     summary="RL Service Information",
@@ -161,6 +191,7 @@ async def get_rl_info():
         "version": "1.0.0",
         "endpoints": {
             "/schedule": "Universal scheduling endpoint with multiple response formats",
+            "/models": "Trained policies available for inference",
             "/info": "Service information and algorithm details"
         },
         "default_config": RLConfig().dict(),
@@ -1,8 +1,9 @@
+import io
 import os
 import sys
 from pathlib import Path
 import pandas as pd
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 # Add the project root directory to Python path
 PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
@@ -18,7 +19,10 @@ try:
 except ImportError:
     from RL import TrainSchedulingEnvMultiDay
 
+from app.api.rl import RL
 from app.api.rl.models import RLRequest, RLResponse
+from app.api.rl.registry import policy_registry
+from app.core.metrics import RL_INFERENCE_SECONDS
 
 
 class RLService:
@@ -39,15 +43,39 @@ class RLService:
         except Exception as e:
             raise ValueError(f"Input data validation failed: {str(e)}")
     
+    @staticmethod
+    def plan_fleet(df: pd.DataFrame, model_name: Optional[str] = None, optimize: bool = False) -> pd.DataFrame:
+        """
+        RL.plan_next_day with the named registry policy, re-typed through an in-memory CSV so
+        columns match the old file hand-off. Runs on the executors' model process when a
+        policy is named (where the registry keeps it loaded), else on the CPU pool.
+        """
+        model = policy_registry.get(model_name) if model_name and not optimize else None
+        with RL_INFERENCE_SECONDS.time(planner=RLService.planner_label(model, optimize)):
+            plan = RL.plan_next_day(df, model, optimize)
+        return pd.read_csv(io.StringIO(plan.to_csv(index=False)))
+    
+    @staticmethod
+    def planner_label(model: Any, optimize: bool) -> str:
+        """Which planner RL.plan_next_day uses, for metrics"""
+        if optimize:
+            return "milp"
+        return "ppo" if model is not None else "heuristic"
+    
     @staticmethod
     def run_rl_scheduling(config: RLRequest) -> RLResponse:
         """Run RL scheduling with given configuration"""
         try:
-            // Load model if not already loaded
-            if not hasattr(TrainSchedulingEnvMultiDay, 'model'):
-                TrainSchedulingEnvMultiDay.load_model()
+            if TrainSchedulingEnvMultiDay is None:
+                raise RuntimeError("stable-baselines3 not installed")
+
+            # Named policies come from the warm registry; otherwise the shared multi-day model
+            if config.model:
+                model = policy_registry.get(config.model)
+            else:
+                model = TrainSchedulingEnvMultiDay.model or TrainSchedulingEnvMultiDay.load_model()
             
-            // Create environment
+            # Create environment
             env = TrainSchedulingEnvMultiDay(
                 csv_path=config.csv_path,
                 service_quota=config.service_quota,
@@ -57,37 +85,36 @@ class RLService:
                 jobcard_reduction_if_maintenance=config.jobcard_reduction_if_maintenance,
                 jobcard_new_per_day_lambda=config.jobcard_new_per_day_lambda,
                 today=config.today,
-                seed=config.seed
+                seed=config.seed if config.seed is not None else 42
             )
             
-            // Run the environment
-            obs, _ = env.reset(seed=config.seed if config.seed else None)
-            terminated = False
+            # Run the environment
+            obs, _ = env.reset(seed=config.seed)
+            terminated = env.n_trains == 0
             total_reward = 0.0
             
             while not terminated:
-                action, _states = env.model.predict(obs, deterministic=False)
+                action, _states = model.predict(obs, deterministic=True)
                 obs, reward, terminated, truncated, info = env.step(int(action))
                 total_reward += reward
             
-            // Process results
+            # Process results
+            action_map = {0: "In_Service", 1: "Standby", 2: "Under_Maintenance"}
             assignments = []
             for day_idx, day_assignments in enumerate(env.assigned_actions_history):
-                for train_idx, action in enumerate(day_assignments):
-                    train_id = df.iloc[train_idx].get("TrainID", f"TRAIN_{train_idx:03d}")
-                    action_map = {0: "In_Service", 1: "Standby", 2: "Under_Maintenance"}
+                for train_id, action in zip(env.train_ids, day_assignments.tolist()):
                     assignments.append({
                         "TrainID": train_id,
-                        "OperationalStatus": action_map.get(int(action), "Unknown"),
+                        "OperationalStatus": action_map.get(action, "Unknown"),
                         "Day": day_idx + 1
                     })
             
-            // Create response
+            # Create response
             response = RLResponse(
                 success=True,
                 message="RL scheduling completed successfully",
-                total_trains=len(df),
-                episode_days=config.episode_days,
+                total_trains=env.n_trains,
+                episode_days=env.episode_days,
                 day_index=env.day_index,
                 total_shunting_cost=env.total_shunting_cost,
                 final_reward=total_reward,
@@ -97,4 +124,4 @@ class RLService:
             return response
             
         except Exception as e:
-            raise RuntimeError(f"Error running RL scheduling: {str(e)}")
\ No newline at end of file
+            raise RuntimeError(f"Error running RL scheduling: {str(e)}")
@@ -0,0 +1,165 @@
+"""
+Cleaning-bay capacity allocator shared by the row-wise and columnar simulators.
+Free in-progress and booked bays are kept in min-heaps and every train in the
+cleaning system is indexed to its bay, so acquiring or releasing a bay is O(log bays)
+and a whole day's cleaning demand is allocated in one pass, oldest LastCleanedDate first.
+Trains are identified by their row position in the fleet, which never changes during a run.
+"""
+
+import heapq
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from app.api.simulation.models import CleaningDepot
+from app.api.simulation.fleet_state import (
+    CLEANING_FREE, CLEANING_BOOKED, CLEANING_IN_PROGRESS, CLEANING_STATUS_LABELS
+)
+
+CLEANING_STATUS_UNKNOWN = -1
+
+
+def encode_cleaning_status(values: np.ndarray) -> np.ndarray:
+    """Map CleaningSlotStatus strings to codes (unknown values become CLEANING_STATUS_UNKNOWN)"""
+    codes = {label: code for code, label in enumerate(CLEANING_STATUS_LABELS)}
+    return np.array([codes.get(value, CLEANING_STATUS_UNKNOWN) for value in values], dtype=np.int16)
+
+
+def oldest_first(positions: np.ndarray, last_cleaned: np.ndarray) -> np.ndarray:
+    """Order train positions by oldest cleaning date, ties kept in row order"""
+    return positions[np.argsort(last_cleaned[positions], kind='stable')]
+
+
+class CleaningBayAllocator:
+    """In-progress and booked cleaning bays across one or more depots"""
+
+    def __init__(self, depots: List[CleaningDepot]):
+        # Bay labels by slot index; depots are filled in the order they are configured
+        self.cleaning_bays: List[str] = []
+        self.booking_bays: List[str] = []
+        for depot in depots:
+            prefix = f"{depot.depot_id}_" if depot.depot_id else ""
+            self.cleaning_bays += [f"{prefix}BAY_{i:02d}" for i in range(1, depot.in_progress_bays + 1)]
+            self.booking_bays += [
+                f"{prefix}BAY_{i:02d}"
+                for i in range(depot.in_progress_bays + 1, depot.in_progress_bays + depot.booked_bays + 1)
+            ]
+
+        # Free slot indices (a sorted list is already a valid heap)
+        self.free_cleaning: List[int] = list(range(len(self.cleaning_bays)))
+        self.free_booking: List[int] = list(range(len(self.booking_bays)))
+
+        # Train position -> (in_progress bay?, slot index)
+        self.bay_of: Dict[int, Tuple[bool, int]] = {}
+
+    @property
+    def in_progress_capacity(self) -> int:
+        return len(self.cleaning_bays)
+
+    @property
+    def booked_capacity(self) -> int:
+        return len(self.booking_bays)
+
+    @property
+    def capacity(self) -> int:
+        return self.in_progress_capacity + self.booked_capacity
+
+    def acquire(self, position: int, in_progress: bool) -> Optional[str]:
+        """Give the train the lowest free bay of the requested kind (None when all are taken)"""
+        heap = self.free_cleaning if in_progress else self.free_booking
+        if not heap:
+            return None
+        slot = heapq.heappop(heap)
+        self.bay_of[int(position)] = (in_progress, slot)
+        return self.cleaning_bays[slot] if in_progress else self.booking_bays[slot]
+
+    def release(self, position: int) -> None:
+        """Free the train's bay, if it holds one"""
+        held = self.bay_of.pop(int(position), None)
+        if held is not None:
+            in_progress, slot = held
+            heapq.heappush(self.free_cleaning if in_progress else self.free_booking, slot)
+
+    def load(self, status: np.ndarray, bays: np.ndarray) -> None:
+        """Register trains already in the cleaning system at the bays given in the input data"""
+        cleaning_slot = {label: slot for slot, label in enumerate(self.cleaning_bays)}
+        booking_slot = {label: slot for slot, label in enumerate(self.booking_bays)}
+        taken_cleaning, taken_booking = set(), set()
+
+        for position in np.flatnonzero((status == CLEANING_IN_PROGRESS) | (status == CLEANING_BOOKED)):
+            in_progress = status[position] == CLEANING_IN_PROGRESS
+            slots, taken = (cleaning_slot, taken_cleaning) if in_progress else (booking_slot, taken_booking)
+            slot = slots.get(bays[position])
+            # Trains without a valid bay stay in the system untracked; enforce_capacity trims any excess
+            if slot is not None and slot not in taken:
+                taken.add(slot)
+                self.bay_of[int(position)] = (bool(in_progress), slot)
+
+        self.free_cleaning = [slot for slot in range(len(self.cleaning_bays)) if slot not in taken_cleaning]
+        self.free_booking = [slot for slot in range(len(self.booking_bays)) if slot not in taken_booking]
+
+    def allocate_day(self, status: np.ndarray, bays: np.ndarray, last_cleaned: np.ndarray, today: int) -> None:
+        """
+        Advance the cleaning system by one day, editing status and bays in place:
+        in-progress trains finish, booked trains move into the freed bays and free trains
+        not cleaned for more than 7 days take the remaining capacity, oldest first.
+        """
+        was_free = status == CLEANING_FREE
+
+        # Cleaning takes 1 day, so every in-progress train completes
+        for position in np.flatnonzero(status == CLEANING_IN_PROGRESS):
+            self.release(position)
+            status[position] = CLEANING_FREE
+            bays[position] = 'NULL'
+
+        # Booked trains move into the free cleaning bays
+        booked = oldest_first(np.flatnonzero(status == CLEANING_BOOKED), last_cleaned)
+        for position in booked[:len(self.free_cleaning)]:
+            self.release(position)
+            bays[position] = self.acquire(position, in_progress=True)
+            status[position] = CLEANING_IN_PROGRESS
+
+        # Booked trains loaded without a valid bay take a free booking bay or leave the system
+        for position in np.flatnonzero(status == CLEANING_BOOKED):
+            if int(position) not in self.bay_of:
+                bay = self.acquire(position, in_progress=False)
+                status[position] = CLEANING_BOOKED if bay is not None else CLEANING_FREE
+                bays[position] = bay if bay is not None else 'NULL'
+
+        # New demand: cleaning bays first, then booking bays
+        due = oldest_first(np.flatnonzero(was_free & ((today - last_cleaned) > 7)), last_cleaned)
+        self.admit(due, status, bays)
+
+    def enforce_capacity(self, status: np.ndarray, bays: np.ndarray, last_cleaned: np.ndarray) -> None:
+        """
+        Keep the cleaning system at exactly its capacity, editing status and bays in place.
+        Excess trains are released (booked before in-progress, in row order); a shortfall is
+        topped up from the free trains with the oldest cleaning dates, if there are enough.
+        """
+        in_progress = np.flatnonzero(status == CLEANING_IN_PROGRESS)
+        booked = np.flatnonzero(status == CLEANING_BOOKED)
+        total = len(in_progress) + len(booked)
+
+        if total > self.capacity:
+            excess = total - self.capacity
+            for trains, kind_capacity in [(booked, self.booked_capacity), (in_progress, self.in_progress_capacity)]:
+                if excess > 0 and len(trains) > kind_capacity:
+                    for position in trains[:min(len(trains) - kind_capacity, excess)]:
+                        self.release(position)
+                        status[position] = CLEANING_FREE
+                        bays[position] = 'NULL'
+                        excess -= 1
+
+        elif total < self.capacity:
+            needed = self.capacity - total
+            free = np.flatnonzero(status == CLEANING_FREE)
+            if len(free) >= needed:
+                self.admit(oldest_first(free, last_cleaned)[:needed], status, bays)
+
+    def admit(self, positions: np.ndarray, status: np.ndarray, bays: np.ndarray) -> None:
+        """Put free trains into the cleaning system in order until the bays run out"""
+        for position in positions:
+            in_progress = bool(self.free_cleaning)
+            bay = self.acquire(position, in_progress)
+            if bay is None:
+                break
+            status[position] = CLEANING_IN_PROGRESS if in_progress else CLEANING_BOOKED
+            bays[position] = bay
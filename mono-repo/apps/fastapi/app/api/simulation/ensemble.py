@@ -0,0 +1,144 @@
+"""
+Monte Carlo ensemble runs of the train simulation.
+Each replica is an independently seeded simulation. Replicas run in batches on the managed
+CPU pool (at most max_workers batches at a time), and each batch only sends back a small
+(replicas x days x metrics) array, which the parent aggregates into statistics.
+"""
+
+import asyncio
+import time
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, List
+from app.api.simulation.models import SimulationConfig, EnsembleConfig
+from app.api.simulation.service import TrainSimulationService
+from app.api.simulation.fleet_state import FleetState, CLEANING_FREE, STATUS_IN_SERVICE
+from app.core.executors import ExecutorManager
+
+ENSEMBLE_METRICS = ['in_service', 'cleaning_occupancy', 'job_card_backlog']
+
+
+def fleet_metrics(fleet: FleetState) -> List[int]:
+    """Ensemble metrics for the current day of a columnar fleet"""
+    return [
+        int((fleet['OperationalStatus'] == STATUS_IN_SERVICE).sum()),
+        int((fleet['CleaningSlotStatus'] != CLEANING_FREE).sum()),
+        int(fleet['OpenJobCards'].sum()),
+    ]
+
+
+def dataframe_metrics(df: pd.DataFrame) -> List[int]:
+    """Ensemble metrics for one simulated day from the row-wise path"""
+    return [
+        int((df['OperationalStatus'] == 'In_Service').sum()),
+        int((df['CleaningSlotStatus'] != 'free').sum()),
+        int(pd.to_numeric(df['OpenJobCards'], errors='coerce').fillna(0).sum()),
+    ]
+
+
+def run_replica(df: pd.DataFrame, days: int, seed: int) -> np.ndarray:
+    """Run one seeded replica and return its per-day metrics (days x metrics)"""
+    simulator = TrainSimulationService(SimulationConfig(days_to_simulate=days, seed=seed))
+    simulator.verbose = False
+    metrics = np.zeros((days, len(ENSEMBLE_METRICS)), dtype=np.int64)
+
+    if FleetState.supports(df):
+        # Step the fleet arrays directly; no daily DataFrame is ever built
+        fleet = simulator.load_fleet_state(df)
+        for day in range(days):
+            simulator.current_day = day
+            simulator.simulate_single_day_columnar(fleet)
+            metrics[day] = fleet_metrics(fleet)
+    else:
+        for day_num, day_df in simulator.simulate_days_iter(df, days):
+            metrics[day_num - 1] = dataframe_metrics(day_df)
+
+    return metrics
+
+
+def run_replica_batch(df: pd.DataFrame, days: int, seeds: List[int]) -> np.ndarray:
+    """CPU-pool task: run a batch of replicas on one fleet (replicas x days x metrics)"""
+    return np.stack([run_replica(df, days, seed) for seed in seeds])
+
+
+class EnsembleSimulationService:
+    """Runs N seeded simulation replicas on the executor CPU pool and aggregates per-day statistics"""
+
+    def __init__(self, config: EnsembleConfig):
+        self.config = config
+        # Draw a base seed when none is given so the run can still be reproduced from the response
+        self.seed = config.seed if config.seed is not None else int(np.random.SeedSequence().entropy % (2 ** 32))
+
+    def replica_seeds(self) -> List[int]:
+        """Independent per-replica seeds derived from the base seed"""
+        children = np.random.SeedSequence(self.seed).spawn(self.config.replicas)
+        return [int(child.generate_state(1)[0]) for child in children]
+
+    def workers(self) -> int:
+        """CPU pool workers the ensemble may occupy at once (max_workers, capped by the pool size)"""
+        pool_size = max(1, ExecutorManager.cpu_workers())
+        return max(1, min(self.config.replicas, self.config.max_workers or pool_size, pool_size))
+
+    async def run_replicas(self, df: pd.DataFrame) -> np.ndarray:
+        """Run every replica in batches on the CPU pool and stack the results (replicas x days x metrics)"""
+        replicas = self.config.replicas
+        days = self.config.days_to_simulate
+        workers = self.workers()
+        # A few batches per worker keep the workers evenly loaded while each task carries the fleet once
+        seeds = self.replica_seeds()
+        batch_size = max(1, replicas // (workers * 4))
+        batches = [seeds[i:i + batch_size] for i in range(0, replicas, batch_size)]
+        limit = asyncio.Semaphore(workers)
+
+        async def run_batch(batch: List[int]) -> np.ndarray:
+            async with limit:
+                return await ExecutorManager.run_cpu(run_replica_batch, df, days, batch)
+
+        print(f"[Ensemble] Running {replicas} replicas x {days} days in {len(batches)} batch(es) on {workers} worker(s)")
+        results = await asyncio.gather(*(run_batch(batch) for batch in batches))
+        return np.concatenate(results)
+
+    def aggregate(self, results: np.ndarray) -> List[Dict[str, Any]]:
+        """Per-day mean/std/min/max/percentiles of every metric across replicas"""
+        percentiles = self.config.percentiles
+        means = results.mean(axis=0)
+        stds = results.std(axis=0)
+        mins = results.min(axis=0)
+        maxs = results.max(axis=0)
+        pcts = np.percentile(results, percentiles, axis=0) if percentiles else None
+
+        start = TrainSimulationService(SimulationConfig(days_to_simulate=1))
+        daily_stats = []
+        for day in range(results.shape[1]):
+            start.current_day = day
+            day_stats = {"day": day + 1, "date": start.format_date(start.get_current_date())}
+            for m, metric in enumerate(ENSEMBLE_METRICS):
+                day_stats[metric] = {
+                    "mean": round(float(means[day, m]), 3),
+                    "std": round(float(stds[day, m]), 3),
+                    "min": float(mins[day, m]),
+                    "max": float(maxs[day, m]),
+                    "percentiles": {
+                        f"p{p:g}": round(float(pcts[i, day, m]), 3) for i, p in enumerate(percentiles)
+                    },
+                }
+            daily_stats.append(day_stats)
+        return daily_stats
+
+    async def run(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """Run the ensemble and return the per-day aggregate statistics"""
+        started = time.perf_counter()
+        results = await self.run_replicas(df)
+        elapsed = time.perf_counter() - started
+        print(f"[Ensemble] {self.config.replicas} replicas finished in {elapsed:.2f}s")
+
+        return {
+            "success": True,
+            "message": f"Ensemble of {self.config.replicas} replicas completed for {self.config.days_to_simulate} day(s)",
+            "days_simulated": self.config.days_to_simulate,
+            "replicas": self.config.replicas,
+            "seed": self.seed,
+            "total_trains": len(df),
+            "elapsed_seconds": round(elapsed, 3),
+            "daily_stats": await ExecutorManager.run_io(self.aggregate, results),
+        }
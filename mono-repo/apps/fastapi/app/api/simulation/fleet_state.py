@@ -0,0 +1,223 @@
+"""
+Array-backed fleet state for the columnar simulation engine.
+Holds one typed NumPy array per simulated column and categorical codes for
+status strings; DataFrames and CSVs are only built when a caller asks for them.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional
+from pandas.api.types import is_numeric_dtype
+from app.core.dates import to_day_ordinals
+
+# Categorical codes (fixed labels come first, unseen input labels are appended)
+CATEGORY_DTYPE = np.int16
+
+CLEANING_FREE, CLEANING_BOOKED, CLEANING_IN_PROGRESS = 0, 1, 2
+CLEANING_STATUS_LABELS = ['free', 'booked', 'in_progress']
+
+STATUS_IN_SERVICE, STATUS_STANDBY, STATUS_UNDER_MAINTENANCE = 0, 1, 2
+OPERATIONAL_STATUS_LABELS = ['In_Service', 'Standby', 'Under_Maintenance']
+
+JOB_CARD_CLOSE, JOB_CARD_OPEN = 0, 1
+JOB_CARD_STATUS_LABELS = ['close', 'open']
+
+CATEGORICAL_COLUMNS = {
+    'CleaningSlotStatus': CLEANING_STATUS_LABELS,
+    'OperationalStatus': OPERATIONAL_STATUS_LABELS,
+    'JobCardStatus': JOB_CARD_STATUS_LABELS,
+}
+
+MAINTENANCE_NONE = 0
+MAINTENANCE_CODES = {"brakepad": 1, "hvac": 2, "service": 3, "general": 4}
+
+# (status column, expiry column, failure key, renewal after N days, validity days)
+FITNESS_CERTIFICATES = [
+    ('RollingStockFitnessStatus', 'RollingStockFitnessExpiryDate', 'rolling_stock', 4, 730),
+    ('SignallingFitnessStatus', 'SignallingFitnessExpiryDate', 'signalling', 5, 1825),
+    ('TelecomFitnessStatus', 'TelecomFitnessExpiryDate', 'telecom', 5, 1460),
+]
+
+BOOL_COLUMNS = [
+    'RollingStockFitnessStatus', 'SignallingFitnessStatus', 'TelecomFitnessStatus',
+    'BrandingActive', 'CleaningRequired'
+]
+
+INT_COLUMNS = ['OpenJobCards', 'ClosedJobCards', 'ExposureHoursAccrued', 'ExposureHoursTarget', 'ExposureDailyQuota']
+FLOAT_COLUMNS = ['TotalMileageKM', 'MileageSinceLastServiceKM', 'BrakepadWear%', 'HVACWear%']
+NUMERIC_COLUMNS = INT_COLUMNS + FLOAT_COLUMNS
+
+# Raw cells kept as objects so values the simulation does not touch are written back unchanged
+OBJECT_COLUMNS = [
+    'TrainID', 'RollingStockFitnessExpiryDate', 'SignallingFitnessExpiryDate', 'TelecomFitnessExpiryDate',
+    'LastJobCardUpdate', 'BrandCampaignID', 'BayOccupancyIDC', 'LastCleanedDate'
+]
+DATE_COLUMNS = ['RollingStockFitnessExpiryDate', 'SignallingFitnessExpiryDate', 'TelecomFitnessExpiryDate', 'LastCleanedDate']
+
+STABLING_COLUMNS = ['BayPositionID', 'StablingSequenceOrder', 'ShuntingMovesRequired']
+
+# Written through all-numeric result dicts (mileage, wear, stabling) by the row-wise path
+NUMERIC_RESULT_COLUMNS = ['TotalMileageKM', 'MileageSinceLastServiceKM', 'MileageBalanceVariance',
+                          'BrakepadWear%', 'HVACWear%'] + STABLING_COLUMNS
+
+# Columns written by a simulated day (CURRENT_DATE and OperationalStatus are appended if missing)
+SIMULATED_COLUMNS = BOOL_COLUMNS + NUMERIC_COLUMNS + OBJECT_COLUMNS + STABLING_COLUMNS + [
+    'JobCardStatus', 'MileageBalanceVariance', 'CleaningSlotStatus'
+]
+APPENDED_COLUMNS = ['CURRENT_DATE', 'OperationalStatus']
+
+
+def encode_categories(values: np.ndarray, labels: List[str]) -> tuple:
+    """Encode values as integer codes into labels, appending labels for unseen values"""
+    factor_codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    labels = list(labels)
+    mapping = np.empty(len(uniques), dtype=CATEGORY_DTYPE)
+    for i, value in enumerate(uniques):
+        if value not in labels:
+            labels.append(value)
+        mapping[i] = labels.index(value)
+    return mapping[factor_codes], np.array(labels, dtype=object)
+
+
+class FleetState:
+    """Typed per-train arrays for one fleet, owned and mutated in place by the simulator"""
+
+    def __init__(self, input_columns: List[str], passthrough: Dict[str, np.ndarray], n_trains: int):
+        self.input_columns = input_columns
+        self.passthrough = passthrough  # input columns the simulation never writes (views, not copies)
+        self.n_trains = n_trains
+        self.arrays: Dict[str, np.ndarray] = {}
+        self.categories: Dict[str, np.ndarray] = {}
+        self.current_date: Optional[str] = None  # CURRENT_DATE of the last simulated day
+
+    @staticmethod
+    def supports(df: pd.DataFrame) -> bool:
+        """Check whether the input follows the simulator schema the columnar engine supports"""
+        if any(col not in df.columns for col in SIMULATED_COLUMNS):
+            return False
+        if df['TrainID'].duplicated().any():
+            return False
+        for col in NUMERIC_COLUMNS:
+            if not is_numeric_dtype(df[col]) or df[col].isna().any():
+                return False
+        for col in BOOL_COLUMNS:
+            if not df[col].map(lambda v: isinstance(v, (bool, np.bool_, str))).all():
+                return False
+        return bool(df['CleaningSlotStatus'].isin(CLEANING_STATUS_LABELS).all())
+
+    @classmethod
+    def from_dataframe(
+        cls,
+        df: pd.DataFrame,
+        maintenance_schedule: Dict[str, Dict[str, Any]],
+        fitness_failures: Dict[str, Dict[str, int]]
+    ) -> "FleetState":
+        """Load a fleet DataFrame and the simulator's tracking dicts into typed arrays"""
+        n = len(df)
+        managed = set(SIMULATED_COLUMNS) | set(APPENDED_COLUMNS) | set(CATEGORICAL_COLUMNS)
+        passthrough = {col: df[col].to_numpy() for col in df.columns if col not in managed}
+        if 'CURRENT_DATE' in df.columns:
+            passthrough['CURRENT_DATE'] = df['CURRENT_DATE'].to_numpy()
+        state = cls(list(df.columns), passthrough, n)
+        arrays = state.arrays
+
+        for col in BOOL_COLUMNS:
+            arrays[col] = np.array(
+                [v.upper() == 'TRUE' if isinstance(v, str) else bool(v) for v in df[col]], dtype=bool
+            )
+        for col in INT_COLUMNS:
+            arrays[col] = np.trunc(df[col].to_numpy(dtype=np.float64)).astype(np.int64)
+        for col in FLOAT_COLUMNS + ['MileageBalanceVariance']:
+            arrays[col] = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float64, copy=True)
+        for col in STABLING_COLUMNS:
+            arrays[col] = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float64, copy=True)
+        for col in OBJECT_COLUMNS:
+            arrays[col] = df[col].to_numpy(dtype=object, copy=True)
+        for col in DATE_COLUMNS:
+            # NO_DATE marks NULL / unparseable dates (parse_date treats them as "today")
+            arrays[col + '_ord'] = to_day_ordinals(arrays[col])
+
+        for col, labels in CATEGORICAL_COLUMNS.items():
+            if col in df.columns:
+                arrays[col], state.categories[col] = encode_categories(df[col].to_numpy(dtype=object), labels)
+            else:
+                arrays[col] = np.zeros(n, dtype=CATEGORY_DTYPE)
+                state.categories[col] = np.array(labels, dtype=object)
+
+        # Maintenance schedule and fitness failure counters (-1 = not tracked)
+        index_of = {train_id: i for i, train_id in enumerate(arrays['TrainID'])}
+        arrays['maintenance_type'] = np.zeros(n, dtype=np.int8)
+        arrays['maintenance_days'] = np.zeros(n, dtype=np.int16)
+        for train_id, maintenance in maintenance_schedule.items():
+            if train_id in index_of:
+                arrays['maintenance_type'][index_of[train_id]] = MAINTENANCE_CODES[maintenance['type']]
+                arrays['maintenance_days'][index_of[train_id]] = maintenance['days_remaining']
+
+        for _, _, failure_key, _, _ in FITNESS_CERTIFICATES:
+            counter = np.full(n, -1, dtype=np.int16)
+            for train_id, failures in fitness_failures.items():
+                if train_id in index_of and failure_key in failures:
+                    counter[index_of[train_id]] = failures[failure_key]
+            arrays[failure_key + '_failure_days'] = counter
+
+        return state
+
+    def __len__(self) -> int:
+        return self.n_trains
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.arrays
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        return self.arrays[key]
+
+    def __setitem__(self, key: str, values: np.ndarray) -> None:
+        self.arrays[key] = values
+
+    def copy(self) -> "FleetState":
+        """Independent copy of the state arrays (passthrough columns are never written, so they are shared)"""
+        state = FleetState(self.input_columns, self.passthrough, self.n_trains)
+        state.arrays = {col: values.copy() for col, values in self.arrays.items()}
+        state.categories = dict(self.categories)
+        state.current_date = self.current_date
+        return state
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the state arrays (object cells count as pointers)"""
+        return sum(values.nbytes for values in self.arrays.values())
+
+    def labels(self, col: str) -> np.ndarray:
+        """Decode a categorical column to its string labels"""
+        return self.categories[col][self.arrays[col]]
+
+    def output_columns(self) -> List[str]:
+        """Column order of the materialized output (matches the row-wise simulator)"""
+        columns = list(self.input_columns)
+        if self.current_date is not None:
+            columns += [col for col in APPENDED_COLUMNS if col not in columns]
+        return columns
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Materialize the current state as a DataFrame laid out like the row-wise output"""
+        data = {}
+        for col in self.output_columns():
+            if col == 'CURRENT_DATE' and self.current_date is not None:
+                values = np.full(self.n_trains, self.current_date, dtype=object)
+            elif col in self.categories:
+                values = self.labels(col)
+            elif col == 'CleaningRequired' and self.current_date is not None:
+                values = np.where(self.arrays[col], 'TRUE', 'FALSE').astype(object)
+            elif col in NUMERIC_RESULT_COLUMNS:
+                values = self.arrays[col].astype(np.float64)
+            elif col in self.arrays:
+                values = self.arrays[col].copy()
+            else:
+                values = self.passthrough[col]
+            data[col] = values
+
+        return pd.DataFrame(data, columns=self.output_columns()).infer_objects()
+
+    def to_csv(self, path_or_buf=None, **kwargs) -> Optional[str]:
+        """Write the current state as CSV (returns the text when no target is given)"""
+        return self.to_dataframe().to_csv(path_or_buf, index=False, **kwargs)
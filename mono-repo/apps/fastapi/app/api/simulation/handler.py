@@ -1,15 +1,45 @@
 import io
+import os
+import itertools
+import uuid
 import zipfile
 import pandas as pd
-import httpx  # Async HTTP client
 from fastapi import HTTPException, UploadFile
-from fastapi.responses import StreamingResponse
-from typing import Optional, List, Tuple
-from app.api.simulation.models import SimulationConfig
-from app.api.simulation.service import TrainSimulationService
+from fastapi.responses import StreamingResponse, FileResponse
+from datetime import datetime
+from typing import Optional, Tuple, List, Dict, Any, Iterable, Iterator, BinaryIO
+from app.api.simulation.models import SimulationConfig, EnsembleConfig, FastForwardConfig
+from app.api.simulation.service import TrainSimulationService, simulate_days, profile_days
+from app.api.simulation.profiling import PROFILE_STEPS, PROFILE_CPROFILE, server_timing
+from app.api.simulation.ensemble import EnsembleSimulationService
+from app.api.jobs.handler import JobHandler
+from app.api.jobs.models import JobSubmitted
+from app.core.executors import ExecutorManager
+from app.core.jobs import JobManager
 from app.core.storage import StorageManager
+from app.core.webhooks import WebhookDispatcher
 from app.core.config import settings
 
+class ZipStreamSink:
+    """Write-only, non-seekable sink that lets ZipFile output be handed out chunk by chunk"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        """Return and forget everything written since the last drain"""
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
 class SimulationHandler:
     WEBHOOK_URL = settings.WEBHOOK_SIMULATION_URL  # Force reload config
 
@@ -17,31 +47,58 @@ class SimulationHandler:
     async def simulate_from_file_path(
         file_path: str,
         config: SimulationConfig,
-        runId: str
+        runId: str,
+        job_id: Optional[str] = None,
+        profile: Optional[str] = None
     ) -> dict:
         """
         Start simulation from file path for pipeline integration.
         Saves results to shared storage and sends webhook notification.
+        When run as a background job, progress (stage, day k of N) is reported to job_id.
+        A profiled run (see profile_mode) adds its per-step breakdown to the result and the pipeline log.
         """
         try:
-            # Step 1: Load CSV from storage
-            df = await StorageManager.read_csv_from_path(file_path)
-            
-            # Step 2: Run simulation
-            simulator = TrainSimulationService(config)
-            daily_results = simulator.simulate_multiple_days(df, config.days_to_simulate)
-            
-            # Step 3: Save results to storage
-            if config.days_to_simulate == 1:
-                day_num, simulated_df = daily_results[0]
-                result_file_path = await StorageManager.save_simulation_result(runId, simulated_df)
+            # Step 1: Reuse the cached result of a seeded run on a byte-identical input
+            # (runs without a seed are random and never cached, profiled runs always simulate)
+            cache_key = None
+            breakdown = None
+            if config.seed is not None and profile is None:
+                cache_key = await StorageManager.stage_cache_key(file_path, "simulation", {"config": config.dict()})
+            cached = await StorageManager.load_cached_result(cache_key, "SIMULATION_RESULT", runId)
+            if cached is not None:
+                result_file_path, summary = cached
             else:
-                # For multi-day, create a combined result or save first day result
-                # You can modify this based on your requirements
-                day_num, simulated_df = daily_results[0]
-                result_file_path = await StorageManager.save_simulation_result(runId, simulated_df)
+                # Step 2: Load CSV from storage
+                JobManager.update(job_id, stage="loading")
+                df = await StorageManager.read_csv_from_path(file_path)
+                
+                # Step 3: Run simulation on the executor process pool
+                # Only the first day is persisted, so skip materializing the others
+                JobManager.update(job_id, stage="simulating", day=0, days=config.days_to_simulate)
+                if profile is not None:
+                    daily_results, breakdown = await SimulationHandler.run_profiled(
+                        profile, config, df, [1], runId, job_id
+                    )
+                    await StorageManager.save_pipeline_log(runId, "simulation_profile", dict(breakdown))
+                else:
+                    daily_results = await ExecutorManager.run_cpu(
+                        simulate_days, config, df, config.days_to_simulate, [1], job_id
+                    )
+                
+                # Step 4: Save results to storage
+                JobManager.update(job_id, stage="saving")
+                if config.days_to_simulate == 1:
+                    day_num, simulated_df = daily_results[0]
+                    result_file_path = await StorageManager.save_simulation_result(runId, simulated_df)
+                else:
+                    # For multi-day, create a combined result or save first day result
+                    # You can modify this based on your requirements
+                    day_num, simulated_df = daily_results[0]
+                    result_file_path = await StorageManager.save_simulation_result(runId, simulated_df)
+                summary = {"total_trains": len(df)}
+                await StorageManager.store_cached_result(cache_key, result_file_path, summary)
             
-            # Step 4: Send webhook notification
+            # Step 5: Send webhook notification
             await SimulationHandler._send_webhook(runId, result_file_path)
             
             return {
@@ -49,7 +106,9 @@ class SimulationHandler:
                 "message": f"Simulation completed for {config.days_to_simulate} day(s)",
                 "runId": runId,
                 "result_file_path": result_file_path,
-                "total_trains": len(df)
+                "total_trains": summary["total_trains"],
+                "cached": cached is not None,
+                **({"profile": breakdown} if breakdown is not None else {})
             }
             
         except Exception as e:
@@ -62,93 +121,183 @@ class SimulationHandler:
                 pass  # Don't fail if webhook fails
             raise HTTPException(status_code=500, detail=error_msg)
 
+    @staticmethod
+    async def submit_from_file_path(
+        file_path: str,
+        config: SimulationConfig,
+        runId: str,
+        profile: Optional[str] = None
+    ) -> JobSubmitted:
+        """Queue simulate_from_file_path as a background job and return its id at once"""
+        if not await StorageManager.file_exists(file_path):
+            raise HTTPException(status_code=404, detail=f"File not found: {file_path}")
+        return JobHandler.submit(
+            "simulation", runId,
+            lambda job_id: SimulationHandler.simulate_from_file_path(file_path, config, runId, job_id, profile)
+        )
+
+    @staticmethod
+    def profile_mode(header: Optional[str]) -> Optional[str]:
+        """
+        Profiling requested by an X-Simulation-Profile header, else by SIMULATION_PROFILE:
+        None (off), "steps" (per-step timers) or "cprofile" (timers plus a pstats dump)
+        """
+        value = (header if header is not None else settings.SIMULATION_PROFILE).strip().lower()
+        if value in ("", "0", "false", "off"):
+            return None
+        if value in ("1", "true", "on", PROFILE_STEPS):
+            return PROFILE_STEPS
+        if value == PROFILE_CPROFILE:
+            return PROFILE_CPROFILE
+        raise HTTPException(status_code=400, detail=f"Invalid X-Simulation-Profile '{value}' (use steps or cprofile)")
+
+    @staticmethod
+    async def run_profiled(
+        profile: str,
+        config: SimulationConfig,
+        df: pd.DataFrame,
+        keep_days: Optional[Iterable[int]] = None,
+        runId: Optional[str] = None,
+        job_id: Optional[str] = None
+    ) -> Tuple[List[Tuple[int, pd.DataFrame]], Dict[str, Any]]:
+        """Run profile_days on the executor process pool (cProfile stats go to the shared temp directory)"""
+        pstats_path = None
+        if profile == PROFILE_CPROFILE:
+            pstats_path = os.path.join(
+                StorageManager.get_storage_path("TEMP"),
+                f"simulation_{runId or uuid.uuid4().hex[:8]}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pstats"
+            )
+        daily_results, breakdown = await ExecutorManager.run_cpu(
+            profile_days, config, df, config.days_to_simulate, keep_days, job_id, pstats_path
+        )
+        slowest = ", ".join(f"{entry['step']} {entry['share']:.0%}" for entry in breakdown["steps"][:3])
+        print(f"[Simulation] Profiled {breakdown['days']} day(s) on the {breakdown['engine']} engine "
+              f"in {breakdown['wall_seconds']:.3f}s: {slowest}")
+        return daily_results, breakdown
+
+    @staticmethod
+    def profile_headers(breakdown: Dict[str, Any]) -> Dict[str, str]:
+        """Response headers carrying a profile breakdown (and where its pstats file was dumped)"""
+        headers = {"Server-Timing": server_timing(breakdown)}
+        if breakdown.get("pstats_path"):
+            headers["X-Simulation-Profile-Stats"] = breakdown["pstats_path"]
+        return headers
+
     @staticmethod
     async def _send_webhook(runId: str, filePath: Optional[str], error_message: Optional[str] = None):
-        """Send async webhook call to backend after simulation completes"""
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                payload = {
-                    "runId": runId, 
-                    "status": "success" if filePath else "failed",
-                    "outputFilePath": filePath,
-                    "error": error_message
-                }
-                print(f"[Simulation] Attempting to send webhook to {SimulationHandler.WEBHOOK_URL}")
-                print(f"[Simulation] Webhook payload: {payload}")
-                
-                response = await client.post(SimulationHandler.WEBHOOK_URL, json=payload, timeout=30.0)
-                response.raise_for_status()
-                print(f"[Simulation] Webhook sent successfully → {payload}")
-                print(f"[Simulation] Response status: {response.status_code}")
-                print(f"[Simulation] Response text: {response.text}")
-            except httpx.TimeoutException as e:
-                print(f"[Simulation] Webhook timeout error: {str(e)}")
-            except httpx.ConnectError as e:
-                print(f"[Simulation] Webhook connection error: {str(e)}")
-            except Exception as e:
-                print(f"[Simulation] Failed to send webhook: {str(e)}")
-                print(f"[Simulation] Error type: {type(e).__name__}")
+        """Queue the simulation-complete webhook for the backend (delivered in the background)"""
+        payload = {
+            "runId": runId, 
+            "status": "success" if filePath else "failed",
+            "outputFilePath": filePath,
+            "error": error_message
+        }
+        print(f"[Simulation] Queueing webhook to {SimulationHandler.WEBHOOK_URL}: {payload}")
+        await WebhookDispatcher.enqueue(SimulationHandler.WEBHOOK_URL, payload, "Simulation")
 
     @staticmethod
     async def simulate_train_fleet(
         file: UploadFile,
         config: SimulationConfig,
-        runId: Optional[str] = None  # Accept optional runId argument
+        runId: Optional[str] = None,  # Accept optional runId argument
+        profile: Optional[str] = None
     ) -> StreamingResponse:
-        """Main simulation handler with webhook notification"""
+        """
+        Main simulation handler with webhook notification.
+        A profiled run simulates every day before answering and returns the day files with the
+        per-step breakdown in a Server-Timing header (no pipeline-mode webhook).
+        """
         try:
             # Step 1: Process CSV input
             df = await SimulationHandler.process_csv_file(file)
 
             # Step 2: Run simulation
-            simulator = TrainSimulationService(config)
+            if profile is not None:
+                daily_results, breakdown = await SimulationHandler.run_profiled(profile, config, df, runId=runId)
+                if config.days_to_simulate == 1:
+                    day_num, simulated_df = daily_results[0]
+                    response = await ExecutorManager.run_io(
+                        SimulationHandler.create_csv_response, simulated_df, f'day-{day_num}.csv'
+                    )
+                else:
+                    response = SimulationHandler.create_zip_response(daily_results, config.days_to_simulate)
+                response.headers.update(SimulationHandler.profile_headers(breakdown))
+                return response
 
             if config.days_to_simulate == 1:
-                daily_results = simulator.simulate_multiple_days(df, 1)
+                daily_results = await ExecutorManager.run_cpu(simulate_days, config, df, 1)
                 day_num, simulated_df = daily_results[0]
 
                 # Save result locally and fire webhook if runId provided (pipeline mode)
                 if runId:
                     output_path = f"/tmp/simulation_result_{runId}.csv"
-                    simulated_df.to_csv(output_path, index=False)
+                    await ExecutorManager.run_io(simulated_df.to_csv, output_path, index=False)
                     # Fire webhook
                     await SimulationHandler._send_webhook(runId, output_path, None)
 
-                return SimulationHandler.create_csv_response(simulated_df, f'day-{day_num}.csv')
+                return await ExecutorManager.run_io(SimulationHandler.create_csv_response, simulated_df, f'day-{day_num}.csv')
 
             else:
-                daily_results = simulator.simulate_multiple_days(df, config.days_to_simulate)
-
                 # Save results to ZIP for webhook if runId provided (pipeline mode)
                 if runId:
                     output_path = f"/tmp/simulation_result_{runId}.zip"
-                    zip_buffer = io.BytesIO()
-                    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                        for day_num, simulated_df in daily_results:
-                            csv_buffer = io.StringIO()
-                            simulated_df.to_csv(csv_buffer, index=False)
-                            zip_file.writestr(f'day-{day_num}.csv', csv_buffer.getvalue())
-
-                    zip_buffer.seek(0)
-                    with open(output_path, "wb") as f:
-                        f.write(zip_buffer.getvalue())
+                    await ExecutorManager.run_cpu(
+                        SimulationHandler.simulate_to_zip, config, df, config.days_to_simulate, output_path
+                    )
 
                     # Fire webhook
                     await SimulationHandler._send_webhook(runId, output_path, None)
 
-                return SimulationHandler.create_zip_response(daily_results, config.days_to_simulate)
+                    return FileResponse(
+                        output_path,
+                        media_type="application/zip",
+                        headers={"Content-Disposition": f"attachment; filename=simulation_{config.days_to_simulate}_days.zip"}
+                    )
+
+                # Run day 1 (off the event loop) before answering so schema errors still surface as a 500
+                daily_results = TrainSimulationService(config).simulate_days_iter(df, config.days_to_simulate)
+                first_day = await ExecutorManager.run_io(next, daily_results)
+                return SimulationHandler.create_zip_response(
+                    itertools.chain([first_day], daily_results), config.days_to_simulate
+                )
 
         except HTTPException:
             raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Internal error during simulation: {str(e)}")
 
+    @staticmethod
+    async def simulate_fast_forward(file: UploadFile, config: FastForwardConfig) -> StreamingResponse:
+        """Fast-forward a long horizon and stream a ZIP with the reporting days only"""
+        df = await SimulationHandler.process_csv_file(file)
+        try:
+            simulator = TrainSimulationService(SimulationConfig(seed=config.seed))
+            daily_results = simulator.fast_forward(df, config.days_to_simulate, config.report_days())
+
+            # Run up to the first reporting day (off the event loop) before answering so errors still surface as a 500
+            first_day = await ExecutorManager.run_io(next, daily_results)
+            return SimulationHandler.create_zip_response(
+                itertools.chain([first_day], daily_results), config.days_to_simulate
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Internal error during fast-forward simulation: {str(e)}")
+
+    @staticmethod
+    async def simulate_ensemble(file: UploadFile, config: EnsembleConfig) -> dict:
+        """Run a Monte Carlo ensemble of seeded simulations and return per-day aggregate statistics"""
+        df = await SimulationHandler.process_csv_file(file)
+        try:
+            # Replica batches share the managed CPU pool with the other stages
+            return await EnsembleSimulationService(config).run(df)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Internal error during ensemble simulation: {str(e)}")
+
     @staticmethod
     async def process_csv_file(file: UploadFile) -> pd.DataFrame:
         """Process uploaded CSV file and return DataFrame"""
         try:
             content = await file.read()
-            df = pd.read_csv(io.StringIO(content.decode('utf-8')))
+            df = await ExecutorManager.run_io(pd.read_csv, io.StringIO(content.decode('utf-8')))
             return df
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"Error processing CSV file: {str(e)}")
@@ -167,18 +316,43 @@ class SimulationHandler:
         )
     
     @staticmethod
-    def create_zip_response(daily_results: List[Tuple[int, pd.DataFrame]], days: int) -> StreamingResponse:
-        """Create ZIP response for multi-day simulation"""
-        zip_buffer = io.BytesIO()
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+    def write_csv_entry(zip_file: zipfile.ZipFile, name: str, df: pd.DataFrame):
+        """Write a DataFrame as a CSV entry straight into the archive (no intermediate buffer)"""
+        with zip_file.open(name, 'w') as entry:
+            with io.TextIOWrapper(entry, encoding='utf-8', newline='') as text:
+                df.to_csv(text, index=False)
+
+    @staticmethod
+    def write_zip(daily_results: Iterable[Tuple[int, pd.DataFrame]], fileobj: BinaryIO):
+        """Write day-N.csv entries to a file object as each day is simulated"""
+        with zipfile.ZipFile(fileobj, 'w', zipfile.ZIP_DEFLATED) as zip_file:
             for day_num, simulated_df in daily_results:
-                csv_buffer = io.StringIO()
-                simulated_df.to_csv(csv_buffer, index=False)
-                zip_file.writestr(f'day-{day_num}.csv', csv_buffer.getvalue())
-        
-        zip_buffer.seek(0)
+                SimulationHandler.write_csv_entry(zip_file, f'day-{day_num}.csv', simulated_df)
+
+    @staticmethod
+    def simulate_to_zip(config: SimulationConfig, df: pd.DataFrame, days: int, output_path: str) -> str:
+        """Simulate days straight into a ZIP file (runs in executor worker processes)"""
+        with open(output_path, "wb") as f:
+            SimulationHandler.write_zip(TrainSimulationService(config).simulate_days_iter(df, days), f)
+        return output_path
+
+    @staticmethod
+    def iter_zip(daily_results: Iterable[Tuple[int, pd.DataFrame]]) -> Iterator[bytes]:
+        """Yield the ZIP archive in chunks, one day-N.csv entry at a time"""
+        sink = ZipStreamSink()
+        with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+            for day_num, simulated_df in daily_results:
+                SimulationHandler.write_csv_entry(zip_file, f'day-{day_num}.csv', simulated_df)
+                yield sink.drain()
+        # Central directory is written when the archive closes
+        yield sink.drain()
+
+    @staticmethod
+    def create_zip_response(daily_results: Iterable[Tuple[int, pd.DataFrame]], days: int) -> StreamingResponse:
+        """Create a streamed ZIP response for multi-day simulation (days are simulated as the client reads)"""
+        # Sync iterators are drained in Starlette's threadpool, so the event loop stays free
         return StreamingResponse(
-            zip_buffer,
+            SimulationHandler.iter_zip(daily_results),
             media_type="application/zip",
             headers={"Content-Disposition": f"attachment; filename=simulation_{days}_days.zip"}
-        )
\ No newline at end of file
+        )
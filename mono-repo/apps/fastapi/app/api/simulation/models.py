@@ -1,16 +1,29 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator
+from typing import Optional, List, Dict
+
+class CleaningDepot(BaseModel):
+    """Cleaning capacity of one depot"""
+    
+    depot_id: str = Field(default="", description="Prefix for the depot's bay labels (empty: BAY_01, BAY_02, ...)")
+    in_progress_bays: int = Field(default=3, ge=0, description="Bays where a train is cleaned (1 day per train)")
+    booked_bays: int = Field(default=7, ge=0, description="Bays holding trains booked for cleaning")
 
 class SimulationConfig(BaseModel):
     """Configuration model for simulation parameters"""
     
     days_to_simulate: int = Field(default=30, ge=1, le=365, description="Number of days to simulate")
+    seed: Optional[int] = Field(default=None, ge=0, description="Seed for the run's RNG (omit for a non-reproducible run)")
+    cleaning_depots: List[CleaningDepot] = Field(
+        default_factory=lambda: [CleaningDepot()],
+        description="Cleaning capacity per depot (default: one depot with 3 in-progress + 7 booked bays)"
+    )
     # Removed unnecessary parameters since simulation follows exact specifications
     
     class Config:
         json_schema_extra = {
             "example": {
-                "days_to_simulate": 7
+                "days_to_simulate": 7,
+                "seed": 42
             }
         }
 
@@ -32,4 +45,85 @@ class SimulationResponse(BaseModel):
                 "total_trains": 150,
                 "file_type": "zip"
             }
-        }
\ No newline at end of file
+        }
+
+MAX_FAST_FORWARD_DAYS = 5 * 365 + 1  # five-year horizon including a leap day
+
+class FastForwardConfig(BaseModel):
+    """Configuration model for long-horizon fast-forward simulation"""
+    
+    days_to_simulate: int = Field(default=5 * 365, ge=1, le=MAX_FAST_FORWARD_DAYS, description="Horizon in days")
+    report_every: int = Field(default=30, ge=1, description="Report the fleet state every N days (the last day is always reported)")
+    seed: Optional[int] = Field(default=None, ge=0, description="Seed for the run's RNG")
+    
+    def report_days(self) -> List[int]:
+        """Reporting days within the horizon"""
+        days = list(range(self.report_every, self.days_to_simulate + 1, self.report_every))
+        if not days or days[-1] != self.days_to_simulate:
+            days.append(self.days_to_simulate)
+        return days
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "days_to_simulate": 1825,
+                "report_every": 30,
+                "seed": 42
+            }
+        }
+
+class EnsembleConfig(BaseModel):
+    """Configuration model for Monte Carlo ensemble simulation"""
+    
+    days_to_simulate: int = Field(default=30, ge=1, le=365, description="Number of days to simulate per replica")
+    replicas: int = Field(default=100, ge=1, le=10000, description="Number of independently seeded replicas")
+    seed: Optional[int] = Field(default=None, ge=0, description="Base seed for the replica seeds (random if omitted)")
+    percentiles: List[float] = Field(default=[5, 50, 95], description="Percentiles reported for every metric")
+    max_workers: Optional[int] = Field(default=None, ge=1, description="CPU pool workers to use at most (default: the whole pool)")
+    
+    @field_validator("percentiles")
+    @classmethod
+    def check_percentiles(cls, values: List[float]) -> List[float]:
+        if any(p < 0 or p > 100 for p in values):
+            raise ValueError("percentiles must be between 0 and 100")
+        return values
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "days_to_simulate": 30,
+                "replicas": 1000,
+                "seed": 42,
+                "percentiles": [5, 50, 95]
+            }
+        }
+
+class EnsembleMetricStats(BaseModel):
+    """Distribution of one metric across replicas on one day"""
+    
+    mean: float
+    std: float
+    min: float
+    max: float
+    percentiles: Dict[str, float]
+
+class EnsembleDayStats(BaseModel):
+    """Aggregate statistics for one simulated day"""
+    
+    day: int
+    date: str
+    in_service: EnsembleMetricStats
+    cleaning_occupancy: EnsembleMetricStats
+    job_card_backlog: EnsembleMetricStats
+
+class EnsembleResponse(BaseModel):
+    """Response model for Monte Carlo ensemble simulation"""
+    
+    success: bool
+    message: str
+    days_simulated: int
+    replicas: int
+    seed: int
+    total_trains: int
+    elapsed_seconds: float
+    daily_stats: List[EnsembleDayStats]
@@ -0,0 +1,67 @@
+"""
+Opt-in step profiling of the simulation day loop.
+The day engines call mark() at the start of a day and lap(step) after each sub-step, so a
+profiled run sums perf_counter deltas per step into plain dicts; unprofiled runs use the
+no-op NULL_PROFILER and pay one method call per step.
+"""
+
+import time
+from typing import Dict, Any, List
+
+# Header and SIMULATION_PROFILE values: step timers, or step timers plus a cProfile dump
+PROFILE_STEPS = "steps"
+PROFILE_CPROFILE = "cprofile"
+
+
+class NullProfiler:
+    """Profiler used when profiling is off"""
+    enabled = False
+
+    def mark(self) -> None:
+        pass
+
+    def lap(self, step: str) -> None:
+        pass
+
+
+class StepProfiler(NullProfiler):
+    """Wall time and call count per simulation step, summed over a run"""
+    enabled = True
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+        self.last = time.perf_counter()
+
+    def mark(self) -> None:
+        """Start timing the next step from now"""
+        self.last = time.perf_counter()
+
+    def lap(self, step: str) -> None:
+        """Charge the time since the previous mark or lap to step"""
+        now = time.perf_counter()
+        self.seconds[step] = self.seconds.get(step, 0.0) + now - self.last
+        self.calls[step] = self.calls.get(step, 0) + 1
+        self.last = now
+
+    def breakdown(self) -> Dict[str, Any]:
+        """Steps by total time, slowest first, with their share of the profiled time"""
+        total = sum(self.seconds.values())
+        steps: List[Dict[str, Any]] = [
+            {
+                "step": step,
+                "seconds": round(seconds, 6),
+                "calls": self.calls[step],
+                "share": round(seconds / total, 4) if total else 0.0
+            }
+            for step, seconds in sorted(self.seconds.items(), key=lambda item: -item[1])
+        ]
+        return {"total_seconds": round(total, 6), "steps": steps}
+
+
+NULL_PROFILER = NullProfiler()
+
+
+def server_timing(breakdown: Dict[str, Any]) -> str:
+    """Server-Timing header value of a breakdown (durations in milliseconds)"""
+    return ", ".join(f"{entry['step']};dur={entry['seconds'] * 1000:.3f}" for entry in breakdown["steps"])
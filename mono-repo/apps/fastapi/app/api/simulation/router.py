@@ -1,10 +1,11 @@
-from fastapi import APIRouter, File, UploadFile, Depends, Query
+from fastapi import APIRouter, File, UploadFile, Depends, Query, Header, HTTPException, Response
 from fastapi.responses import StreamingResponse
-from typing import Optional
-from pydantic import BaseModel
+from typing import Optional, List, Union
+from pydantic import BaseModel, ValidationError
 
-from app.api.simulation.models import SimulationConfig
+from app.api.simulation.models import SimulationConfig, EnsembleConfig, EnsembleResponse, FastForwardConfig, CleaningDepot
 from app.api.simulation.handler import SimulationHandler
+from app.api.jobs.models import JobSubmitted
 from app.core.storage import StorageManager
 
 # Pydantic models for file path requests
@@ -12,16 +13,21 @@ class SimulationFilePathRequest(BaseModel):
     file_path: str
     runId: str
     days_to_simulate: int = 1
+    seed: Optional[int] = None
+    cleaning_depots: Optional[List[CleaningDepot]] = None
+    background: bool = True
 
 router = APIRouter(prefix="/simulation", tags=["simulation"])
 
 def create_simulation_config(
     days_to_simulate: int = 1,
-    runId: Optional[str] = Query(None, description="Pipeline run ID for webhook notification")
+    runId: Optional[str] = Query(None, description="Pipeline run ID for webhook notification"),
+    seed: Optional[int] = Query(None, description="Seed for a reproducible simulation run")
 ) -> tuple[SimulationConfig, Optional[str]]:
     """Create simulation configuration from query parameters"""
     return SimulationConfig(
-        days_to_simulate=days_to_simulate
+        days_to_simulate=days_to_simulate,
+        seed=seed
     ), runId
 
 @router.post(
@@ -36,26 +42,45 @@ def create_simulation_config(
     - file_path: Path to CSV file in shared storage
     - runId: Pipeline run identifier for tracking
     - days_to_simulate: Number of days to simulate (default: 1)
+    - seed: Optional seed for a reproducible run
+    - cleaning_depots: Optional cleaning capacity per depot (default: 3 in_progress + 7 booked bays)
+    - background: Queue the run as a background job (default) instead of answering when it is done
+    - X-Simulation-Profile header: `steps` times each step of the day loop, `cprofile` also dumps
+      cProfile stats to shared temp storage (default: the SIMULATION_PROFILE setting)
     
     **Output:**
-    - Success/failure status
+    - background: 202 with the job id; poll `/jobs/{jobId}` for day k of N and the artifact path
+    - otherwise: Success/failure status and the saved result path
+    - Profiled runs: per-step breakdown in `profile`, the `simulation_profile` pipeline log
+      and (when not in the background) a Server-Timing header
     - Simulation result will be saved to shared storage
     - Webhook notification sent to backend upon completion
     """
 )
 async def start_simulation_from_file(
-    request: SimulationFilePathRequest
-) -> dict:
+    request: SimulationFilePathRequest,
+    response: Response,
+    x_simulation_profile: Optional[str] = Header(None, description="Profile the run: steps or cprofile")
+) -> Union[JobSubmitted, dict]:
     """
     Start simulation from file path for pipeline integration.
     Results are saved to shared storage and webhook is sent to backend.
     """
-    config = SimulationConfig(days_to_simulate=request.days_to_simulate)
+    config = SimulationConfig(days_to_simulate=request.days_to_simulate, seed=request.seed)
+    if request.cleaning_depots:
+        config.cleaning_depots = request.cleaning_depots
+    profile = SimulationHandler.profile_mode(x_simulation_profile)
+    if request.background:
+        response.status_code = 202
+        return await SimulationHandler.submit_from_file_path(request.file_path, config, request.runId, profile)
     result = await SimulationHandler.simulate_from_file_path(
         request.file_path, 
         config, 
-        request.runId
+        request.runId,
+        profile=profile
     )
+    if "profile" in result:
+        response.headers.update(SimulationHandler.profile_headers(result["profile"]))
     return result
 
 @router.post(
@@ -99,10 +124,12 @@ async def test_webhook():
     **Input:**
     - CSV file containing train data
     - Number of days to simulate (optional, default: 1)
+    - X-Simulation-Profile header (optional): `steps` or `cprofile`
     
     **Output:**
     - Single day: CSV file (day-1.csv)
     - Multiple days: ZIP file containing CSV files for each day (day-1.csv, day-2.csv, etc.)
+    - Profiled runs: per-step breakdown in a Server-Timing header
     
     **Simulation Features:**
     - Fitness certificate management (Rolling Stock: 4 days renewal, 2 years validity)
@@ -117,7 +144,8 @@ async def test_webhook():
 )
 async def simulate_train_fleet(
     file: UploadFile = File(..., description="CSV file containing train fleet data"),
-    config_and_runid: tuple[SimulationConfig, Optional[str]] = Depends(create_simulation_config)
+    config_and_runid: tuple[SimulationConfig, Optional[str]] = Depends(create_simulation_config),
+    x_simulation_profile: Optional[str] = Header(None, description="Profile the run: steps or cprofile")
 ) -> StreamingResponse:
     """
     Main endpoint for train fleet simulation.
@@ -127,7 +155,84 @@ async def simulate_train_fleet(
     For multiple days, returns a ZIP file with individual CSV files for each day.
     """
     config, runId = config_and_runid
-    return await SimulationHandler.simulate_train_fleet(file, config, runId)
+    profile = SimulationHandler.profile_mode(x_simulation_profile)
+    return await SimulationHandler.simulate_train_fleet(file, config, runId, profile)
+
+def create_fast_forward_config(
+    days_to_simulate: int = 5 * 365,
+    report_every: int = 30,
+    seed: Optional[int] = Query(None, description="Seed for a reproducible simulation run")
+) -> FastForwardConfig:
+    """Create fast-forward configuration from query parameters"""
+    try:
+        return FastForwardConfig(days_to_simulate=days_to_simulate, report_every=report_every, seed=seed)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@router.post(
+    "/fast-forward",
+    response_class=StreamingResponse,
+    summary="Long-Horizon Fast-Forward Simulation",
+    description="""
+    Simulate up to five years and return only the reporting days, for capacity planning.
+    
+    **Input:**
+    - CSV file containing train data
+    - days_to_simulate (max 1826), report_every (default 30), seed (query parameters)
+    
+    **Output:**
+    - ZIP file with day-N.csv for every report_every-th day and the last day.
+      Each file matches the same day of a day-by-day simulation with the same seed.
+    """
+)
+async def simulate_fast_forward(
+    file: UploadFile = File(..., description="CSV file containing train fleet data"),
+    config: FastForwardConfig = Depends(create_fast_forward_config)
+) -> StreamingResponse:
+    """Fast-forward a long horizon and stream the reporting days"""
+    return await SimulationHandler.simulate_fast_forward(file, config)
+
+def create_ensemble_config(
+    days_to_simulate: int = 30,
+    replicas: int = 100,
+    seed: Optional[int] = Query(None, description="Base seed for reproducible ensembles"),
+    percentiles: List[float] = Query([5, 50, 95], description="Percentiles reported per metric"),
+    max_workers: Optional[int] = Query(None, description="CPU pool workers to use at most (default: the whole pool)")
+) -> EnsembleConfig:
+    """Create ensemble configuration from query parameters"""
+    try:
+        return EnsembleConfig(
+            days_to_simulate=days_to_simulate,
+            replicas=replicas,
+            seed=seed,
+            percentiles=percentiles,
+            max_workers=max_workers
+        )
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@router.post(
+    "/ensemble",
+    response_model=EnsembleResponse,
+    summary="Monte Carlo Ensemble Simulation",
+    description="""
+    Run N independently seeded replicas of the fleet simulation in parallel on the shared CPU pool.
+    
+    **Input:**
+    - CSV file containing train data
+    - days_to_simulate, replicas, seed, percentiles, max_workers (query parameters)
+    
+    **Output:**
+    - Per-day mean, std, min, max and percentiles across replicas for:
+      in-service trains, cleaning occupancy (booked + in progress) and open job-card backlog
+    """
+)
+async def simulate_ensemble(
+    file: UploadFile = File(..., description="CSV file containing train fleet data"),
+    config: EnsembleConfig = Depends(create_ensemble_config)
+) -> EnsembleResponse:
+    """Run a Monte Carlo ensemble and return per-day aggregate statistics"""
+    return await SimulationHandler.simulate_ensemble(file, config)
 
 @router.get(
     "/config/default",
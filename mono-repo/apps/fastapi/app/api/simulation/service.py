@@ -1,9 +1,21 @@
+import os
+import time
+import cProfile
 import pandas as pd
 import numpy as np
-import random
-from datetime import datetime, timedelta
-from typing import List, Tuple, Dict, Any, Set
+from datetime import datetime, date, timedelta
+from typing import List, Tuple, Dict, Any, Set, Optional, Iterable, Iterator, Callable
 from app.api.simulation.models import SimulationConfig
+from app.api.simulation.fleet_state import (
+    FleetState, FITNESS_CERTIFICATES, MAINTENANCE_CODES, MAINTENANCE_NONE,
+    CLEANING_FREE, CLEANING_BOOKED, CLEANING_IN_PROGRESS, CLEANING_STATUS_LABELS,
+    STATUS_IN_SERVICE, STATUS_STANDBY, STATUS_UNDER_MAINTENANCE, JOB_CARD_OPEN, JOB_CARD_CLOSE
+)
+from app.core.dates import NO_DATE, date_ordinal, to_day_ordinals
+from app.core.executors import report_progress
+from app.core.metrics import SIMULATION_DAY_SECONDS
+from app.api.simulation.cleaning import CleaningBayAllocator, encode_cleaning_status
+from app.api.simulation.profiling import NULL_PROFILER, StepProfiler
 
 class TrainSimulationService:
     """Service class for train fleet simulation logic"""
@@ -19,12 +31,10 @@ class TrainSimulationService:
         # Stabling bay tracking (15 bays, max 3 trains per bay)
         self.bay_occupancy = {i: [] for i in range(1, 16)}  # bay_id: [train_ids]
         
-        # Cleaning system - Only 10 trains can be in cleaning at any time
-        # 3 in_progress bays (BAY_01, BAY_02, BAY_03)
-        # 7 booked bays (BAY_04 to BAY_10)
-        self.cleaning_bays = {"BAY_01": None, "BAY_02": None, "BAY_03": None}  # in_progress bays
-        self.booking_bays = {f"BAY_{i:02d}": None for i in range(4, 11)}  # booked bays (BAY_04 to BAY_10)
-        self.cleaning_queue = []  # Not used - only 10 trains max in cleaning system
+        # Cleaning system - capacity is the configured in_progress + booked bays
+        # (default: 3 in_progress bays BAY_01 to BAY_03, 7 booked bays BAY_04 to BAY_10)
+        self.cleaning_allocator = CleaningBayAllocator(config.cleaning_depots)
+        self.daily_cleaning: Dict[str, np.ndarray] = {}  # row-wise path: the day's allocation by row position
         
         # Job card tracking for maintenance duration
         self.maintenance_schedule = {}  # train_id: {"type": "brakepad", "days_remaining": 1}
@@ -32,26 +42,56 @@ class TrainSimulationService:
         # Fitness certificate tracking
         self.fitness_failures = {}  # train_id: {"rolling_stock": days_since_failure, etc.}
         
+        # Array-backed fleet state used by the columnar engine
+        self.fleet_state: Optional[FleetState] = None
+        
+        # Per-run RNG (seeded from config for reproducible runs); draws are made once per day
+        self.rng = np.random.default_rng(config.seed)
+        self.daily_draws: Dict[str, np.ndarray] = {}
+        
+        # Per-day logging from the columnar engine (turned off while fast-forwarding)
+        self.verbose = True
+        
+        # Step timers of the day loop (a StepProfiler when the run is profiled)
+        self.profiler = NULL_PROFILER
+        
     def get_current_date(self) -> datetime:
         """Get current simulation date"""
         return (self.simulation_start_date + timedelta(days=self.current_day + 1))  # +1 to start from next day
         
     def parse_date(self, date_str: str) -> datetime:
-        """Parse date string in DD-MM-YYYY format"""
-        if pd.isna(date_str) or date_str == "NULL":
+        """Parse date string in DD-MM-YYYY (or YYYY-MM-DD) format; NULL / unparseable means today"""
+        ordinal = date_ordinal(date_str)
+        if ordinal == NO_DATE:
             return self.get_current_date()
-        try:
-            return datetime.strptime(str(date_str), '%d-%m-%Y').date()
-        except:
-            try:
-                return datetime.strptime(str(date_str), '%Y-%m-%d').date()
-            except:
-                return self.get_current_date()
+        return date.fromordinal(ordinal)
     
     def format_date(self, date_obj: datetime) -> str:
         """Format date to DD-MM-YYYY string"""
         return date_obj.strftime('%d-%m-%Y')
     
+    def log(self, message: str):
+        """Print a per-day engine message unless running quietly"""
+        if self.verbose:
+            print(message)
+    
+    def is_campaign_day(self) -> bool:
+        """New branding campaigns can start every 45 days"""
+        return (self.current_day % 45 == 0) and (self.current_day > 0)
+    
+    def draw_daily_randoms(self, n_trains: int) -> Dict[str, np.ndarray]:
+        """Draw the whole fleet's random numbers for the current day in one batch (indexed by row position)"""
+        draws = {
+            'bay_position': self.rng.integers(1, 15, size=n_trains, endpoint=True),
+            'stabling_sequence': self.rng.integers(1, 3, size=n_trains, endpoint=True),
+        }
+        if self.is_campaign_day():
+            draws['campaign_start'] = self.rng.random(n_trains)
+            draws['campaign_target'] = self.rng.choice([280, 300, 320, 340], size=n_trains)
+            draws['campaign_quota'] = self.rng.choice([14, 15, 16], size=n_trains)
+        self.daily_draws = draws
+        return draws
+    
     def initialize_tracking_from_data(self, df: pd.DataFrame):
         """Initialize tracking structures from CSV data"""
         # Extract existing campaign IDs
@@ -111,16 +151,20 @@ class TrainSimulationService:
                 self.fitness_failures[train_id] = failures
         
         # Initialize bay occupancy from current data - ONLY for trains already in cleaning
-        for _, row in df.iterrows():
-            train_id = row['TrainID']
-            bay_id = row.get('BayOccupancyIDC')
-            cleaning_status = row.get('CleaningSlotStatus', 'free')
-            
-            # Only initialize if train is actually in cleaning system
-            if cleaning_status == 'in_progress' and bay_id in self.cleaning_bays:
-                self.cleaning_bays[bay_id] = train_id
-            elif cleaning_status == 'booked' and bay_id in self.booking_bays:
-                self.booking_bays[bay_id] = train_id
+        status, bays = self.cleaning_columns(df)
+        self.cleaning_allocator.load(status, bays)
+    
+    def cleaning_columns(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """CleaningSlotStatus codes and a copy of BayOccupancyIDC for a fleet frame"""
+        status = df['CleaningSlotStatus'] if 'CleaningSlotStatus' in df.columns else pd.Series('free', index=df.index)
+        bays = df['BayOccupancyIDC'] if 'BayOccupancyIDC' in df.columns else pd.Series('NULL', index=df.index)
+        return encode_cleaning_status(status.to_numpy(dtype=object)), bays.to_numpy(dtype=object, copy=True)
+    
+    def last_cleaned_ordinals(self, df: pd.DataFrame) -> np.ndarray:
+        """LastCleanedDate of a fleet frame as day ordinals (NO_DATE when missing)"""
+        if 'LastCleanedDate' not in df.columns:
+            return np.full(len(df), NO_DATE, dtype=np.int64)
+        return to_day_ordinals(df['LastCleanedDate'].to_numpy(dtype=object))
     
     
     # FITNESS CERTIFICATE MANAGEMENT
@@ -286,7 +330,7 @@ class TrainSimulationService:
     
     
     # BRANDING CAMPAIGN MANAGEMENT
-    def simulate_branding_campaign(self, row: pd.Series, operational_status: str) -> Dict[str, Any]:
+    def simulate_branding_campaign(self, row: pd.Series, operational_status: str, position: int) -> Dict[str, Any]:
         """Simulate branding campaign according to specifications"""
         train_id = row['TrainID']
         branding_active = row.get('BrandingActive', False)
@@ -317,14 +361,14 @@ class TrainSimulationService:
         else:
             # No active campaign - check if new campaign should start
             # Campaign starts every 45 days randomly to trains with BrandingActive = False
-            if (self.current_day % 45 == 0) and (self.current_day > 0):  # Every 45 days
-                if random.random() < 0.1:  # 10% chance per train per 45-day cycle
+            if self.is_campaign_day():  # Every 45 days
+                if self.daily_draws['campaign_start'][position] < 0.1:  # 10% chance per train per 45-day cycle
                     # Start new campaign
                     branding_active = True
                     campaign_id = self.generate_unique_campaign_id()
                     exposure_hours = 0
-                    target_hours = random.choice([280, 300, 320, 340])  # Random target
-                    daily_quota = random.choice([14, 15, 16])  # Random daily quota
+                    target_hours = int(self.daily_draws['campaign_target'][position])  # Random target
+                    daily_quota = int(self.daily_draws['campaign_quota'][position])  # Random daily quota
         
         return {
             'BrandingActive': branding_active,
@@ -417,111 +461,43 @@ class TrainSimulationService:
     
     
     # CLEANING MANAGEMENT
-    def simulate_cleaning(self, row: pd.Series) -> Dict[str, Any]:
-        """Simulate cleaning process with EXACTLY 10-train limit (3 in_progress + 7 booked)"""
-        train_id = row['TrainID']
-        last_cleaned = self.parse_date(row.get('LastCleanedDate'))
+    def allocate_cleaning_day(self, df: pd.DataFrame):
+        """Allocate the whole fleet's cleaning for the day in one pass (read back per row by simulate_cleaning)"""
+        status, bays = self.cleaning_columns(df)
+        bays[status == CLEANING_FREE] = 'NULL'
+        last_cleaned = self.last_cleaned_ordinals(df)
+        self.cleaning_allocator.allocate_day(status, bays, last_cleaned, self.get_current_date().toordinal())
+        self.daily_cleaning = {'status': status, 'bays': bays}
+    
+    def simulate_cleaning(self, row: pd.Series, position: int) -> Dict[str, Any]:
+        """Simulate cleaning process within the configured bay capacity (in_progress + booked)"""
         current_date = self.get_current_date()
-        
-        cleaning_required = row.get('CleaningRequired', False)
-        if isinstance(cleaning_required, str):
-            cleaning_required = cleaning_required.upper() == 'TRUE'
-            
-        cleaning_slot_status = row.get('CleaningSlotStatus', 'free')
-        bay_occupancy = row.get('BayOccupancyIDC', 'NULL')
-        
-        # STEP 1: Process trains currently in_progress (complete cleaning after 1 day)
-        if cleaning_slot_status == 'in_progress':
-            # Cleaning takes 1 day, so complete it
-            cleaning_required = False
-            cleaning_slot_status = 'free'
-            bay_occupancy = 'NULL'
-            last_cleaned = self.format_date(current_date)
-            
-            # Remove from cleaning bays
-            for bay, occupant in self.cleaning_bays.items():
-                if occupant == train_id:
-                    self.cleaning_bays[bay] = None
-                    break
-        
-        # STEP 2: Process trains currently booked (may move to in_progress)
-        elif cleaning_slot_status == 'booked':
-            # Check if can move to in_progress (if there's an available cleaning bay)
-            available_cleaning_bay = None
-            for bay, occupant in self.cleaning_bays.items():
-                if occupant is None:
-                    available_cleaning_bay = bay
-                    break
-            
-            if available_cleaning_bay:
-                # Move to in_progress
-                cleaning_slot_status = 'in_progress'
-                bay_occupancy = available_cleaning_bay
-                self.cleaning_bays[available_cleaning_bay] = train_id
-                
-                # Remove from booking bay
-                for bay, occupant in self.booking_bays.items():
-                    if occupant == train_id:
-                        self.booking_bays[bay] = None
-                        break
-        
-        # STEP 3: Handle new cleaning requirements - BUT ENFORCE EXACT 10-TRAIN LIMIT
-        elif cleaning_slot_status == 'free':
-            # Check if this train actually needs cleaning (after 7 days)
-            days_since_cleaning = (current_date - last_cleaned).days
-            train_needs_cleaning = days_since_cleaning > 7
-            
-            # Count current trains in cleaning system
-            total_in_cleaning = sum(1 for occupant in self.cleaning_bays.values() if occupant is not None)
-            total_booked = sum(1 for occupant in self.booking_bays.values() if occupant is not None)
-            total_in_system = total_in_cleaning + total_booked
-            
-            # STRICT ENFORCEMENT: Only allow EXACTLY 10 trains in cleaning system
-            if train_needs_cleaning and total_in_system < 10:
-                # First try to assign to in_progress bay
-                available_cleaning_bay = None
-                for bay, occupant in self.cleaning_bays.items():
-                    if occupant is None:
-                        available_cleaning_bay = bay
-                        break
-                
-                if available_cleaning_bay:
-                    # Start cleaning immediately
-                    cleaning_required = True
-                    cleaning_slot_status = 'in_progress'
-                    bay_occupancy = available_cleaning_bay
-                    self.cleaning_bays[available_cleaning_bay] = train_id
-                else:
-                    # Try to assign to booking bay
-                    available_booking_bay = None
-                    for bay, occupant in self.booking_bays.items():
-                        if occupant is None:
-                            available_booking_bay = bay
-                            break
-                    
-                    if available_booking_bay:
-                        # Book for cleaning
-                        cleaning_required = True
-                        cleaning_slot_status = 'booked'
-                        bay_occupancy = available_booking_bay
-                        self.booking_bays[available_booking_bay] = train_id
-            else:
-                # Either train doesn't need cleaning OR system is at capacity
-                # Force CleaningRequired = False for trains not in the cleaning system
-                cleaning_required = False
-                cleaning_slot_status = 'free'
-                bay_occupancy = 'NULL'
-        
+        status = self.daily_cleaning['status'][position]
+        
+        # Unknown slot statuses are left as they are
+        if status < 0:
+            cleaning_required = row.get('CleaningRequired', False)
+            if isinstance(cleaning_required, str):
+                cleaning_required = cleaning_required.upper() == 'TRUE'
+            return {
+                'CleaningRequired': cleaning_required,
+                'CleaningSlotStatus': row.get('CleaningSlotStatus'),
+                'BayOccupancyIDC': row.get('BayOccupancyIDC', 'NULL'),
+                'LastCleanedDate': row.get('LastCleanedDate')
+            }
+        
+        # Trains in the system keep their cleaning date; free trains are stamped today
+        in_system = status != CLEANING_FREE
         return {
-            'CleaningRequired': cleaning_required,
-            'CleaningSlotStatus': cleaning_slot_status,
-            'BayOccupancyIDC': bay_occupancy,
-            'LastCleanedDate': last_cleaned if cleaning_slot_status in ['booked', 'in_progress'] else self.format_date(current_date) if cleaning_slot_status == 'free' and not cleaning_required else row.get('LastCleanedDate')
+            'CleaningRequired': bool(in_system),
+            'CleaningSlotStatus': CLEANING_STATUS_LABELS[status],
+            'BayOccupancyIDC': self.daily_cleaning['bays'][position],
+            'LastCleanedDate': self.parse_date(row.get('LastCleanedDate')) if in_system else self.format_date(current_date)
         }
     
     
     # STABLING GEOMETRY MANAGEMENT
-    def simulate_stabling(self, row: pd.Series, total_trains: int) -> Dict[str, Any]:
+    def simulate_stabling(self, row: pd.Series, total_trains: int, position: int) -> Dict[str, Any]:
         """Simulate stabling geometry according to specifications"""
         train_id = row['TrainID']
         
@@ -530,10 +506,10 @@ class TrainSimulationService:
         current_sequence = int(row.get('StablingSequenceOrder', 1))
         
         # Randomize bay position (1-15 bays)
-        bay_position = random.randint(1, 15)
+        bay_position = int(self.daily_draws['bay_position'][position])
         
         # Ensure max 3 trains per bay by managing sequence order
-        stabling_sequence = random.randint(1, 3)  # Max 3 trains per bay
+        stabling_sequence = int(self.daily_draws['stabling_sequence'][position])  # Max 3 trains per bay
         
         # Calculate shunting moves
         shunting_moves = max(0, stabling_sequence - 1)
@@ -576,107 +552,42 @@ class TrainSimulationService:
         return "In_Service"
     
     def enforce_exact_cleaning_limit(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Enforce exactly 10 trains in cleaning system (3 in_progress + 7 booked)"""
-        df_copy = df.copy()
-        
-        # Convert CleaningRequired to boolean
-        df_copy['CleaningRequired_bool'] = df_copy['CleaningRequired'].apply(
-            lambda x: x == 'TRUE' if isinstance(x, str) else bool(x)
-        )
-        
-        # Count current cleaning system usage
-        in_progress_trains = df_copy[df_copy['CleaningSlotStatus'] == 'in_progress']
-        booked_trains = df_copy[df_copy['CleaningSlotStatus'] == 'booked']
+        """Keep exactly the configured number of trains in the cleaning system, editing df in place"""
+        allocator = self.cleaning_allocator
+        status, bays = self.cleaning_columns(df)
         
-        current_in_progress = len(in_progress_trains)
-        current_booked = len(booked_trains)
+        current_in_progress = int((status == CLEANING_IN_PROGRESS).sum())
+        current_booked = int((status == CLEANING_BOOKED).sum())
         current_total = current_in_progress + current_booked
         
         print(f"🧼 Enforcing cleaning limits - Current: {current_in_progress} in_progress, {current_booked} booked, {current_total} total")
-        
-        # If we have more than 10 trains in cleaning system, reduce to exactly 10
-        if current_total > 10:
-            excess = current_total - 10
-            print(f"⚠️  Reducing {excess} excess trains from cleaning system")
-            
-            # First, reduce from booked trains if we have more than 7
-            if current_booked > 7:
-                booked_excess = min(current_booked - 7, excess)
-                booked_to_free = booked_trains.head(booked_excess)
-                for idx in booked_to_free.index:
-                    df_copy.loc[idx, 'CleaningRequired'] = False
-                    df_copy.loc[idx, 'CleaningSlotStatus'] = 'free'
-                    df_copy.loc[idx, 'BayOccupancyIDC'] = 'NULL'
-                excess -= booked_excess
-            
-            # Then reduce from in_progress if needed (but keep at least some)
-            if excess > 0 and current_in_progress > 3:
-                in_progress_excess = min(current_in_progress - 3, excess)
-                in_progress_to_free = in_progress_trains.head(in_progress_excess)
-                for idx in in_progress_to_free.index:
-                    df_copy.loc[idx, 'CleaningRequired'] = False
-                    df_copy.loc[idx, 'CleaningSlotStatus'] = 'free'
-                    df_copy.loc[idx, 'BayOccupancyIDC'] = 'NULL'
-                excess -= in_progress_excess
-        
-        # If we have fewer than 10 trains in cleaning system, add more
-        elif current_total < 10:
-            needed = 10 - current_total
-            print(f"📈 Adding {needed} trains to cleaning system")
-            
-            # Find trains that could need cleaning (oldest last cleaned dates)
-            free_trains = df_copy[
-                (df_copy['CleaningSlotStatus'] == 'free') & 
-                (df_copy['CleaningRequired_bool'] == False)
-            ].copy()
-            
-            if len(free_trains) >= needed:
-                # Convert LastCleanedDate to datetime for sorting
-                free_trains['LastCleanedDate_dt'] = pd.to_datetime(
-                    free_trains['LastCleanedDate'], format='%d-%m-%Y', errors='coerce'
-                )
-                
-                # Sort by oldest cleaning date
-                oldest_trains = free_trains.nsmallest(needed, 'LastCleanedDate_dt')
-                
-                # Add to cleaning system
-                for idx in oldest_trains.index:
-                    df_copy.loc[idx, 'CleaningRequired'] = True
-                    
-                    # Assign to appropriate slot
-                    if current_in_progress < 3:
-                        df_copy.loc[idx, 'CleaningSlotStatus'] = 'in_progress'
-                        df_copy.loc[idx, 'BayOccupancyIDC'] = f'BAY_{current_in_progress + 1:02d}'
-                        current_in_progress += 1
-                    else:
-                        df_copy.loc[idx, 'CleaningSlotStatus'] = 'booked'
-                        df_copy.loc[idx, 'BayOccupancyIDC'] = f'BAY_{current_booked + 4:02d}'
-                        current_booked += 1
-        
-        # Final cleanup: ensure CleaningRequired matches cleaning slot status
-        for idx, row in df_copy.iterrows():
-            if row['CleaningSlotStatus'] in ['in_progress', 'booked']:
-                df_copy.loc[idx, 'CleaningRequired'] = True
-            elif row['CleaningSlotStatus'] == 'free':
-                df_copy.loc[idx, 'CleaningRequired'] = False
-                df_copy.loc[idx, 'BayOccupancyIDC'] = 'NULL'
-        
-        # Convert boolean back to string format
-        df_copy['CleaningRequired'] = df_copy['CleaningRequired'].apply(
-            lambda x: 'TRUE' if x else 'FALSE'
+        if current_total > allocator.capacity:
+            print(f"⚠️  Reducing {current_total - allocator.capacity} excess trains from cleaning system")
+        elif current_total < allocator.capacity:
+            print(f"📈 Adding {allocator.capacity - current_total} trains to cleaning system")
+        
+        allocator.enforce_capacity(status, bays, self.last_cleaned_ordinals(df))
+        
+        # CleaningRequired follows the cleaning slot status (unknown statuses keep their value)
+        free = status == CLEANING_FREE
+        in_system = (status == CLEANING_IN_PROGRESS) | (status == CLEANING_BOOKED)
+        cleaning_required = df['CleaningRequired'].apply(lambda x: x == 'TRUE' if isinstance(x, str) else bool(x))
+        cleaning_required = np.where(in_system, True, np.where(free, False, cleaning_required.to_numpy(dtype=bool)))
+        bays[free] = 'NULL'
+        
+        known = status >= 0
+        df['CleaningSlotStatus'] = np.where(
+            known, np.array(CLEANING_STATUS_LABELS, dtype=object)[np.where(known, status, 0)], df['CleaningSlotStatus'].to_numpy(dtype=object)
         )
-        
-        # Drop the helper column
-        df_copy = df_copy.drop(['CleaningRequired_bool'], axis=1)
+        df['BayOccupancyIDC'] = bays
+        df['CleaningRequired'] = np.where(cleaning_required, 'TRUE', 'FALSE').astype(object)
         
         # Verify the result
-        final_in_progress = len(df_copy[df_copy['CleaningSlotStatus'] == 'in_progress'])
-        final_booked = len(df_copy[df_copy['CleaningSlotStatus'] == 'booked'])
-        final_cleaning_required = len(df_copy[df_copy['CleaningRequired'] == 'TRUE'])
+        final_in_progress = int((status == CLEANING_IN_PROGRESS).sum())
+        final_booked = int((status == CLEANING_BOOKED).sum())
+        print(f"✅ Final result: {final_in_progress} in_progress, {final_booked} booked, {int(cleaning_required.sum())} CleaningRequired=True")
         
-        print(f"✅ Final result: {final_in_progress} in_progress, {final_booked} booked, {final_cleaning_required} CleaningRequired=True")
-        
-        return df_copy
+        return df
     
     def ensure_minimum_in_service_trains(self, df: pd.DataFrame, min_required: int = 13) -> pd.DataFrame:
         """Ensure at least the minimum number of trains are In_Service"""
@@ -760,10 +671,15 @@ class TrainSimulationService:
     
     def simulate_single_day(self, df: pd.DataFrame) -> pd.DataFrame:
         """Simulate one day for all trains according to specifications"""
+        profiler = self.profiler
+        profiler.mark()
         current_date = self.get_current_date()
         simulated_data = []
+        self.draw_daily_randoms(len(df))
+        self.allocate_cleaning_day(df)
+        profiler.lap("day_setup")
         
-        for _, row in df.iterrows():
+        for position, (_, row) in enumerate(df.iterrows()):
             train_id = row['TrainID']
             
             # Convert boolean strings to actual booleans for processing
@@ -774,30 +690,39 @@ class TrainSimulationService:
             
             # Update CURRENT_DATE
             row['CURRENT_DATE'] = self.format_date(current_date)
+            profiler.lap("row_setup")
             
             # 1. Simulate fitness certificates
             fitness_results = self.simulate_fitness_certificates(row)
+            profiler.lap("fitness")
             
             # 2. Simulate job cards
             job_results = self.simulate_job_cards(row, fitness_results)
+            profiler.lap("job_cards")
             
             # 3. Simulate mileage
             mileage_results = self.simulate_mileage(row, row.get('OperationalStatus', 'In_Service'))
+            profiler.lap("mileage")
             
             # 4. Simulate brakepad and HVAC wear
             wear_results = self.simulate_wear_and_maintenance(row)
+            profiler.lap("wear")
             
             # 5. Simulate cleaning
-            cleaning_results = self.simulate_cleaning(row)
+            cleaning_results = self.simulate_cleaning(row, position)
+            profiler.lap("cleaning")
             
             # 6. Determine operational status (now using cleaning_results)
             operational_status = self.determine_operational_status(row, fitness_results, job_results, wear_results, cleaning_results)
+            profiler.lap("status")
             
             # 7. Simulate branding campaign
-            branding_results = self.simulate_branding_campaign(row, operational_status)
+            branding_results = self.simulate_branding_campaign(row, operational_status, position)
+            profiler.lap("branding")
             
             # 8. Simulate stabling geometry
-            stabling_results = self.simulate_stabling(row, len(df))
+            stabling_results = self.simulate_stabling(row, len(df), position)
+            profiler.lap("stabling")
             
             # Update row with all results
             row.update(fitness_results)
@@ -810,30 +735,403 @@ class TrainSimulationService:
             row['OperationalStatus'] = operational_status
             
             simulated_data.append(row.to_dict())
+            profiler.lap("row_update")
         
         # Convert to DataFrame
         result_df = pd.DataFrame(simulated_data)
+        profiler.lap("frame_build")
         
         # ENFORCE EXACT CLEANING REQUIREMENTS: 10 trains total (3 in_progress + 7 booked)
         result_df = self.enforce_exact_cleaning_limit(result_df)
+        profiler.lap("enforce_cleaning_limit")
         
         # Ensure at least 13 trains are In_Service
         result_df = self.ensure_minimum_in_service_trains(result_df, min_required=13)
+        profiler.lap("ensure_min_in_service")
         
         return result_df
     
     
-    def simulate_multiple_days(self, df: pd.DataFrame, days: int) -> List[Tuple[int, pd.DataFrame]]:
-        """Simulate multiple days and return list of (day_number, dataframe) tuples"""
+    # COLUMNAR DAY-STEP ENGINE
+    # Applies the same rules as simulate_single_day to the whole fleet at once.
+    # Fleet state lives in a FleetState (NumPy columns); cleaning bays go through the same
+    # CleaningBayAllocator and the same per-day RNG draws, so results match the row-wise path.
+
+    def round_percent(self, values: np.ndarray) -> np.ndarray:
+        """Round to 2 decimals exactly like Python's round(), which differs from np.round near ties"""
+        rounded = np.round(values, 2)
+        scaled = values * 100
+        near_tie = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+        for i in near_tie:
+            rounded[i] = round(float(values[i]), 2)
+        return rounded
+
+    def simulate_single_day_columnar(
+        self,
+        fleet: FleetState,
+        running: Optional[np.ndarray] = None,
+        daily_mileage: float = 436.96
+    ) -> None:
+        """
+        Simulate one day for all trains in place on the fleet columns.
+        running optionally marks the trains a schedule put in service for the day: only those
+        accrue mileage and branding exposure (by default every train runs and exposure follows
+        the simulated status).
+        """
+        profiler = self.profiler
+        profiler.mark()
+        n = len(fleet)
+        current_date = self.get_current_date()
+        today = current_date.toordinal()
+        today_str = self.format_date(current_date)
+        fleet.current_date = today_str
+
+        # Values from the previous day that several rules read
+        prev_brake = fleet['BrakepadWear%']
+        prev_hvac = fleet['HVACWear%']
+        prev_mileage_since = fleet['MileageSinceLastServiceKM']
+        prev_cleaning_required = fleet['CleaningRequired']
+        maintenance_type = fleet['maintenance_type']
+        maintenance_days = fleet['maintenance_days']
+        profiler.lap("day_setup")
+
+        # 1. Fitness certificates: expire, count failure days, renew
+        fit_all = np.ones(n, dtype=bool)
+        failed_count = np.zeros(n, dtype=np.int64)
+        for status_col, expiry_col, failure_key, renew_after, validity in FITNESS_CERTIFICATES:
+            status = fleet[status_col] & ~(fleet[expiry_col + '_ord'] < today)
+            counter = fleet[failure_key + '_failure_days']
+            failed = ~status
+            counter = np.where(failed, np.where(counter < 0, 0, counter + 1), counter)
+            renew = failed & (counter >= renew_after)
+            if renew.any():
+                status[renew] = True
+                counter[renew] = -1
+                fleet[expiry_col][renew] = self.format_date(current_date + timedelta(days=validity))
+                fleet[expiry_col + '_ord'][renew] = today + validity
+            fleet[status_col] = status
+            fleet[failure_key + '_failure_days'] = counter
+            fit_all &= status
+            failed_count += ~status
+        profiler.lap("fitness")
+
+        # 2. Job cards: new cards from failures, wear, mileage and cleaning, then close one per day
+        brake_due = prev_brake > 80
+        hvac_due = prev_hvac > 90
+        service_due = np.trunc(prev_mileage_since) >= 10000
+        new_jobs = failed_count + brake_due + hvac_due + service_due + prev_cleaning_required
+        for due, kind, days_remaining in [(brake_due, "brakepad", 1), (hvac_due, "hvac", 3), (service_due, "service", 2)]:
+            maintenance_type[due] = MAINTENANCE_CODES[kind]
+            maintenance_days[due] = days_remaining
+
+        open_jobs = fleet['OpenJobCards'] + new_jobs
+        jobs_completed = open_jobs > 0
+        open_jobs = open_jobs - jobs_completed
+        fleet['OpenJobCards'] = open_jobs
+        fleet['ClosedJobCards'] = fleet['ClosedJobCards'] + jobs_completed
+        fleet['JobCardStatus'] = np.where(open_jobs > 0, JOB_CARD_OPEN, JOB_CARD_CLOSE).astype(fleet['JobCardStatus'].dtype)
+        fleet['LastJobCardUpdate'][(open_jobs == 0) & jobs_completed] = today_str
+        profiler.lap("job_cards")
+
+        # 3. Mileage: fixed daily increment, reset on completed service
+        increment = daily_mileage if running is None else np.where(running, daily_mileage, 0.0)
+        mileage_since = prev_mileage_since + increment
+        service_done = (maintenance_type == MAINTENANCE_CODES["service"]) & (maintenance_days <= 0)
+        mileage_since[service_done] = 0
+        maintenance_type[service_done] = MAINTENANCE_NONE
+        fleet['TotalMileageKM'] = np.trunc(fleet['TotalMileageKM'] + increment)
+        fleet['MileageBalanceVariance'] = np.trunc(10000 - mileage_since).astype(np.int64)
+        fleet['MileageSinceLastServiceKM'] = np.trunc(mileage_since)
+        profiler.lap("mileage")
+
+        # 4. Wear: count down maintenance, reset wear on completion, otherwise accrue
+        brake = prev_brake.copy()
+        hvac = prev_hvac.copy()
+        scheduled = maintenance_type != MAINTENANCE_NONE
+        maintenance_days[scheduled] -= 1
+        completed = scheduled & (maintenance_days <= 0)
+        brake[completed & (maintenance_type == MAINTENANCE_CODES["brakepad"])] = 0
+        hvac[completed & (maintenance_type == MAINTENANCE_CODES["hvac"])] = 0
+        maintenance_type[completed] = MAINTENANCE_NONE
+        accrue = ~np.isin(maintenance_type, [MAINTENANCE_CODES["brakepad"], MAINTENANCE_CODES["hvac"]])
+        brake[accrue] += 0.27
+        hvac[accrue] += 0.16
+        fleet['BrakepadWear%'] = self.round_percent(np.minimum(100, brake))
+        fleet['HVACWear%'] = self.round_percent(np.minimum(100, hvac))
+        profiler.lap("wear")
+
+        # 5. Cleaning
+        self.simulate_cleaning_columnar(fleet, current_date)
+        profiler.lap("cleaning")
+
+        # 6. Operational status
+        under_maintenance = (
+            (fleet['CleaningSlotStatus'] == CLEANING_IN_PROGRESS) |
+            (fleet['BrakepadWear%'] >= 80) |
+            (fleet['HVACWear%'] >= 90) |
+            (maintenance_type != MAINTENANCE_NONE)
+        )
+        operational_status = np.where(
+            ~fit_all, STATUS_STANDBY,
+            np.where(under_maintenance, STATUS_UNDER_MAINTENANCE, STATUS_IN_SERVICE)
+        ).astype(fleet['OperationalStatus'].dtype)
+        fleet['OperationalStatus'] = operational_status
+        profiler.lap("status")
+
+        # 7. Branding: accrue exposure for active campaigns, close finished ones
+        active = fleet['BrandingActive'] & (fleet['BrandCampaignID'] != 'NULL')
+        in_service = operational_status == STATUS_IN_SERVICE if running is None else running
+        exposure = fleet['ExposureHoursAccrued'] + np.where(active & in_service, fleet['ExposureDailyQuota'], 0)
+        finished = active & (exposure >= fleet['ExposureHoursTarget'])
+        fleet['ExposureHoursAccrued'] = exposure
+        fleet['BrandingActive'][finished] = False
+        fleet['BrandCampaignID'][finished] = 'NULL'
+        for col in ['ExposureHoursAccrued', 'ExposureHoursTarget', 'ExposureDailyQuota']:
+            fleet[col][finished] = 0
+
+        # 7/8. New campaigns and stabling use the day's batched draws (same row positions as the row-wise path)
+        draws = self.draw_daily_randoms(n)
+        if self.is_campaign_day():
+            start = ~active & (draws['campaign_start'] < 0.1)
+            for i in np.flatnonzero(start):
+                fleet['BrandCampaignID'][i] = self.generate_unique_campaign_id()
+            fleet['BrandingActive'][start] = True
+            fleet['ExposureHoursAccrued'][start] = 0
+            fleet['ExposureHoursTarget'][start] = draws['campaign_target'][start]
+            fleet['ExposureDailyQuota'][start] = draws['campaign_quota'][start]
+        profiler.lap("branding")
+        stabling_sequence = draws['stabling_sequence']
+        fleet['BayPositionID'] = draws['bay_position']
+        fleet['StablingSequenceOrder'] = stabling_sequence
+        fleet['ShuntingMovesRequired'] = np.maximum(0, stabling_sequence - 1)
+        profiler.lap("stabling")
+
+        # Fleet-wide constraints
+        self.enforce_exact_cleaning_limit_columnar(fleet)
+        profiler.lap("enforce_cleaning_limit")
+        self.ensure_minimum_in_service_columnar(fleet, min_required=13)
+        profiler.lap("ensure_min_in_service")
+
+    def simulate_cleaning_columnar(self, fleet: FleetState, current_date) -> None:
+        """Simulate the cleaning bays for the whole fleet in one allocator pass"""
+        today = current_date.toordinal()
+        status = fleet['CleaningSlotStatus']
+        bays = fleet['BayOccupancyIDC']
+        last_cleaned = fleet['LastCleanedDate_ord']
+
+        bays[status == CLEANING_FREE] = 'NULL'
+        self.cleaning_allocator.allocate_day(status, bays, last_cleaned, today)
+        fleet['CleaningRequired'][:] = status != CLEANING_FREE
+
+        # Trains in the system keep their parsed cleaning date; free trains are stamped today
+        in_system = np.flatnonzero(status != CLEANING_FREE)
+        last_cleaned[in_system] = np.where(last_cleaned[in_system] == NO_DATE, today, last_cleaned[in_system])
+        for i in in_system:
+            fleet['LastCleanedDate'][i] = date.fromordinal(int(last_cleaned[i]))
+        now_free = status == CLEANING_FREE
+        fleet['LastCleanedDate'][now_free] = self.format_date(current_date)
+        last_cleaned[now_free] = today
+
+    def enforce_exact_cleaning_limit_columnar(self, fleet: FleetState) -> None:
+        """Columnar counterpart of enforce_exact_cleaning_limit"""
+        allocator = self.cleaning_allocator
+        status = fleet['CleaningSlotStatus']
+        required = fleet['CleaningRequired']
+        bays = fleet['BayOccupancyIDC']
+
+        current_in_progress = int((status == CLEANING_IN_PROGRESS).sum())
+        current_booked = int((status == CLEANING_BOOKED).sum())
+        current_total = current_in_progress + current_booked
+
+        self.log(f"🧼 Enforcing cleaning limits - Current: {current_in_progress} in_progress, {current_booked} booked, {current_total} total")
+        if current_total > allocator.capacity:
+            self.log(f"⚠️  Reducing {current_total - allocator.capacity} excess trains from cleaning system")
+        elif current_total < allocator.capacity:
+            self.log(f"📈 Adding {allocator.capacity - current_total} trains to cleaning system")
+
+        allocator.enforce_capacity(status, bays, fleet['LastCleanedDate_ord'])
+
+        # Final cleanup: CleaningRequired follows the slot status
+        free = status == CLEANING_FREE
+        required[:] = ~free
+        bays[free] = 'NULL'
+
+        final_in_progress = int((status == CLEANING_IN_PROGRESS).sum())
+        final_booked = int((status == CLEANING_BOOKED).sum())
+        self.log(f"✅ Final result: {final_in_progress} in_progress, {final_booked} booked, {int(required.sum())} CleaningRequired=True")
+
+    def ensure_minimum_in_service_columnar(self, fleet: FleetState, min_required: int = 13) -> None:
+        """Columnar counterpart of ensure_minimum_in_service_trains"""
+        operational_status = fleet['OperationalStatus']
+        in_service_count = int((operational_status == STATUS_IN_SERVICE).sum())
+
+        if in_service_count < min_required:
+            needed = min_required - in_service_count
+
+            releasable = (
+                (fleet['CleaningSlotStatus'] != CLEANING_IN_PROGRESS) &
+                (fleet['BrakepadWear%'] < 80) &
+                (fleet['HVACWear%'] < 90)
+            )
+            standby_candidates = np.flatnonzero((operational_status == STATUS_STANDBY) & releasable)
+            maintenance_candidates = np.flatnonzero(
+                (operational_status == STATUS_UNDER_MAINTENANCE) & releasable & (fleet['OpenJobCards'] == 0)
+            )
+            selected_candidates = np.concatenate([standby_candidates, maintenance_candidates])[:needed]
+            operational_status[selected_candidates] = STATUS_IN_SERVICE
+
+            actual_moved = len(selected_candidates)
+            if actual_moved > 0:
+                self.log(f"Moved {actual_moved} trains to In_Service to meet minimum requirement")
+            else:
+                self.log(f"Could not find suitable candidates to move to In_Service")
+
+    def load_fleet_state(self, df: pd.DataFrame) -> FleetState:
+        """Initialize tracking from the input data and load it into a FleetState owned by the simulator"""
+        self.initialize_tracking_from_data(df)
+        self.fleet_state = FleetState.from_dataframe(df, self.maintenance_schedule, self.fitness_failures)
+        return self.fleet_state
+
+    def simulate_days_iter(
+        self,
+        df: pd.DataFrame,
+        days: int,
+        keep_days: Optional[Iterable[int]] = None,
+        on_day: Optional[Callable[[int, int], None]] = None
+    ) -> Iterator[Tuple[int, pd.DataFrame]]:
+        """
+        Simulate day by day, yielding (day_number, dataframe) as soon as each day is done.
+        Only the day numbers in keep_days are materialized (default: every day);
+        the final state stays available on self.fleet_state.
+        on_day(day_number, days) is called after every simulated day.
+        """
+        keep = None if keep_days is None else set(keep_days)
+
+        # Inputs following the simulator schema run on the columnar engine
+        if FleetState.supports(df):
+            self.profiler.mark()
+            fleet = self.load_fleet_state(df)
+            self.profiler.lap("load")
+            for day in range(days):
+                start = time.perf_counter()
+                self.current_day = day
+                self.simulate_single_day_columnar(fleet)
+                SIMULATION_DAY_SECONDS.observe(time.perf_counter() - start, engine="columnar")
+                if on_day is not None:
+                    on_day(day + 1, days)
+                if keep is None or day + 1 in keep:
+                    self.profiler.mark()
+                    day_df = fleet.to_dataframe()
+                    self.profiler.lap("frame_build")
+                    yield day + 1, day_df
+            return
+
         # Initialize tracking from the input data
+        self.profiler.mark()
         self.initialize_tracking_from_data(df)
-        
-        current_df = df.copy()
-        results = []
-        
+        self.profiler.lap("load")
+
+        # simulate_single_day builds a new frame each day, so no per-day copies are needed
+        current_df = df
         for day in range(days):
+            start = time.perf_counter()
             self.current_day = day
             current_df = self.simulate_single_day(current_df)
-            results.append((day + 1, current_df.copy()))
-        
-        return results
\ No newline at end of file
+            SIMULATION_DAY_SECONDS.observe(time.perf_counter() - start, engine="frame")
+            if on_day is not None:
+                on_day(day + 1, days)
+            if keep is None or day + 1 in keep:
+                yield day + 1, current_df
+
+    def fast_forward(
+        self,
+        df: pd.DataFrame,
+        days: int,
+        report_days: Iterable[int]
+    ) -> Iterator[Tuple[int, pd.DataFrame]]:
+        """
+        Run a long horizon and yield the fleet state only on the reporting days.
+        Days in between are stepped quietly on the fleet arrays without building frames,
+        so every reported day is identical to the same day of a day-by-day run.
+        """
+        report_days = sorted({day for day in report_days if 1 <= day <= days})
+        if not report_days:
+            return
+        print(f"[Simulation] Fast-forwarding {days} days, reporting {len(report_days)} day(s)")
+
+        verbose = self.verbose
+        self.verbose = False
+        try:
+            # Nothing after the last reporting day can change a report, so stop there
+            yield from self.simulate_days_iter(df, report_days[-1], keep_days=report_days)
+        finally:
+            self.verbose = verbose
+
+    def simulate_multiple_days(
+        self,
+        df: pd.DataFrame,
+        days: int,
+        keep_days: Optional[Iterable[int]] = None,
+        on_day: Optional[Callable[[int, int], None]] = None
+    ) -> List[Tuple[int, pd.DataFrame]]:
+        """
+        Simulate multiple days and return list of (day_number, dataframe) tuples.
+        Only the day numbers in keep_days are materialized (default: every day).
+        """
+        return list(self.simulate_days_iter(df, days, keep_days, on_day))
+
+
+def simulate_days(
+    config: SimulationConfig,
+    df: pd.DataFrame,
+    days: int,
+    keep_days: Optional[Iterable[int]] = None,
+    job_id: Optional[str] = None
+) -> List[Tuple[int, pd.DataFrame]]:
+    """
+    simulate_multiple_days on a fresh simulator (module-level so executor worker processes can run it).
+    With a job_id, every simulated day is reported as the job's progress.
+    """
+    on_day = None if job_id is None else lambda day, total: report_progress(job_id, day=day, days=total)
+    return TrainSimulationService(config).simulate_multiple_days(df, days, keep_days, on_day)
+
+
+def profile_days(
+    config: SimulationConfig,
+    df: pd.DataFrame,
+    days: int,
+    keep_days: Optional[Iterable[int]] = None,
+    job_id: Optional[str] = None,
+    pstats_path: Optional[str] = None
+) -> Tuple[List[Tuple[int, pd.DataFrame]], Dict[str, Any]]:
+    """
+    simulate_days with the day loop's step timers on; returns the days and the per-step breakdown.
+    With a pstats_path, the run is also traced by cProfile and its stats are dumped there.
+    """
+    on_day = None if job_id is None else lambda day, total: report_progress(job_id, day=day, days=total)
+    simulator = TrainSimulationService(config)
+    profiler = simulator.profiler = StepProfiler()
+    tracer = cProfile.Profile() if pstats_path else None
+
+    start = time.perf_counter()
+    if tracer is not None:
+        tracer.enable()
+    try:
+        results = simulator.simulate_multiple_days(df, days, keep_days, on_day)
+    finally:
+        if tracer is not None:
+            tracer.disable()
+    wall_seconds = time.perf_counter() - start
+
+    breakdown = {
+        "engine": "columnar" if simulator.fleet_state is not None else "frame",
+        "days": days,
+        "trains": len(df),
+        "wall_seconds": round(wall_seconds, 6),
+        **profiler.breakdown()
+    }
+    if tracer is not None:
+        os.makedirs(os.path.dirname(pstats_path), exist_ok=True)
+        tracer.dump_stats(pstats_path)
+        breakdown["pstats_path"] = pstats_path
+    return results, breakdown
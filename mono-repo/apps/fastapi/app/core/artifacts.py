@@ -0,0 +1,182 @@
+"""
+Artifact formats for pipeline files, selected by file extension.
+CSV stays the default hand-off; Parquet (compressed, columnar) and Arrow IPC (uncompressed,
+memory-mapped, for hand-offs on one host) store a typed schema: booleans, categorical status
+columns and dates are written as typed columns, so readers do not re-parse them.
+Parquet and Arrow need pyarrow (pinned in requirements.txt; without it only CSV works).
+"""
+
+import os
+import time
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+from app.core.dates import NO_DATE, UNIX_EPOCH_ORDINAL, to_day_ordinals
+from app.core.metrics import ARTIFACT_IO_BYTES, ARTIFACT_IO_SECONDS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Format name -> file extension
+ARTIFACT_EXTENSIONS: Dict[str, str] = {
+    "csv": ".csv",
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+}
+TYPED_FORMATS = ("parquet", "arrow")
+
+# Status columns stored as categoricals (dictionary-encoded) in typed formats
+CATEGORICAL_COLUMNS = ("OperationalStatus", "JobCardStatus", "CleaningSlotStatus")
+
+BOOL_TEXT = {"TRUE": True, "FALSE": False}
+MISSING_TEXT = ("NULL", "")
+
+
+def artifact_format(path: str) -> str:
+    """Artifact format of a file path, from its extension"""
+    ext = os.path.splitext(path)[1].lower()
+    for fmt, fmt_ext in ARTIFACT_EXTENSIONS.items():
+        if ext == fmt_ext:
+            return fmt
+    if ext == ".feather":
+        return "arrow"
+    raise ValueError(f"Unsupported artifact format '{ext}' (expected one of {', '.join(ARTIFACT_EXTENSIONS.values())})")
+
+
+def artifact_extension(fmt: str) -> str:
+    """File extension of an artifact format name"""
+    if fmt not in ARTIFACT_EXTENSIONS:
+        raise ValueError(f"Unknown artifact format '{fmt}' (expected one of {', '.join(ARTIFACT_EXTENSIONS)})")
+    return ARTIFACT_EXTENSIONS[fmt]
+
+
+def require_pyarrow(fmt: str) -> None:
+    """Fail clearly when a typed format is used without pyarrow"""
+    if fmt in TYPED_FORMATS and not PYARROW_AVAILABLE:
+        raise RuntimeError(f"pyarrow not installed (needed for {fmt} artifacts)")
+
+
+def typed_column(name: str, values: pd.Series) -> pd.Series:
+    """
+    Type one text column: TRUE/FALSE cells become booleans, date cells become dates,
+    status columns become categoricals and NULL / blank cells become missing. Other
+    mixed cells are stored as text.
+    """
+    # Distinct cells are classified once (missing cells get code -1)
+    codes, uniques = pd.factorize(values.to_numpy(dtype=object))
+    if not len(uniques):
+        return values
+    cells = pd.Series(uniques, dtype=object)
+    kinds = set(cells.map(type))
+
+    if kinds <= {bool, np.bool_, str} and cells.map(lambda v: not isinstance(v, str) or v.upper() in BOOL_TEXT).all():
+        flags = np.array([BOOL_TEXT[v.upper()] if isinstance(v, str) else bool(v) for v in uniques], dtype=bool)[codes]
+        if (codes >= 0).all():
+            return pd.Series(flags, index=values.index, name=values.name)
+        return pd.Series(pd.array(flags, dtype="boolean"), index=values.index, name=values.name).mask(codes < 0)
+
+    if kinds <= {str} and name in CATEGORICAL_COLUMNS:
+        return values.astype("category")
+
+    ordinals = to_day_ordinals(cells)
+    dated = ordinals != NO_DATE
+    if not kinds <= {bool, np.bool_, int, float} and dated.any() and (dated | cells.isin(MISSING_TEXT).to_numpy()).all():
+        days = np.where(dated, ordinals - UNIX_EPOCH_ORDINAL, np.iinfo(np.int64).min)
+        # datetime64[D] -> datetime.date cells (NaT -> None), which Arrow stores as date32
+        dates = np.append(days.astype("datetime64[D]").astype(object), None)
+        return pd.Series(dates[codes], index=values.index, name=values.name)
+
+    # NULL / blank placeholders are missing, as pd.read_csv reads them
+    values = values.mask(values.isin(MISSING_TEXT))
+    if len(kinds) > 1:
+        return values.where(values.isna(), values.astype(str))
+    return values
+
+
+def typed_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Copy of df with its text columns typed for a Parquet / Arrow artifact"""
+    out = df.copy(deep=False)
+    for col in out.columns:
+        if out[col].dtype == object:
+            out[col] = typed_column(str(col), out[col])
+    return out
+
+
+def to_arrow_table(df: pd.DataFrame) -> "pa.Table":
+    """Arrow table of df with its typed schema"""
+    return pa.Table.from_pandas(typed_frame(df), preserve_index=False)
+
+
+def observe_io(operation: str, path: str, start: float) -> None:
+    """Record the wall time since start and the file size of one artifact read or write"""
+    fmt = artifact_format(path)
+    ARTIFACT_IO_SECONDS.observe(time.perf_counter() - start, operation=operation, format=fmt)
+    ARTIFACT_IO_BYTES.observe(os.path.getsize(path), operation=operation, format=fmt)
+
+
+def write_artifact(df: pd.DataFrame, path: str) -> None:
+    """Write df in the format of path's extension"""
+    start = time.perf_counter()
+    fmt = artifact_format(path)
+    require_pyarrow(fmt)
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+    elif fmt == "parquet":
+        pq.write_table(to_arrow_table(df), path, compression="zstd")
+    else:
+        table = to_arrow_table(df)
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    observe_io("write", path, start)
+
+
+def read_arrow_table(path: str) -> "pa.Table":
+    """Arrow table of a Parquet or Arrow IPC artifact (Arrow files are memory-mapped, not copied)"""
+    fmt = artifact_format(path)
+    require_pyarrow(fmt)
+    if fmt == "parquet":
+        return pq.read_table(path)
+    if fmt == "arrow":
+        with pa.memory_map(path, "r") as source:
+            return pa.ipc.open_file(source).read_all()
+    raise ValueError(f"{path} is not a typed artifact")
+
+
+def read_artifact(path: str, **read_kwargs) -> pd.DataFrame:
+    """
+    Read an artifact in the format of path's extension. read_kwargs go to pd.read_csv for
+    CSV files; typed formats are already typed and ignore them.
+    Dates come back as datetime.date cells, which every date parser in the app accepts.
+    """
+    start = time.perf_counter()
+    if artifact_format(path) == "csv":
+        df = pd.read_csv(path, **read_kwargs)
+    else:
+        df = read_arrow_table(path).to_pandas()
+    observe_io("read", path, start)
+    return df
+
+
+def read_artifacts(paths: List[str], **read_kwargs) -> pd.DataFrame:
+    """
+    Read several artifacts (e.g. a run of daily fleet snapshots) into one DataFrame.
+    Typed files are concatenated as Arrow tables and converted to pandas once.
+    """
+    if not paths:
+        return pd.DataFrame()
+    if any(artifact_format(path) == "csv" for path in paths):
+        return pd.concat([read_artifact(path, **read_kwargs) for path in paths], ignore_index=True)
+    tables = []
+    for path in paths:
+        start = time.perf_counter()
+        tables.append(read_arrow_table(path))
+        observe_io("read", path, start)
+    try:
+        return pa.concat_tables(tables, promote_options="permissive").to_pandas()
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # A column typed differently across files (e.g. dates in one, text in another)
+        return pd.concat([table.to_pandas() for table in tables], ignore_index=True)
@@ -0,0 +1,89 @@
+"""
+Content-addressed cache of pipeline stage results.
+An entry is keyed by SHA-256 over the stage's input file bytes, the stage name and its
+parameters (config, seed, model version, artifact format), so byte-identical uploads under
+different run ids share one result. Entries are an artifact file plus a JSON sidecar with the
+stage's response summary; a hit refreshes their mtime and the least recently used entries
+are evicted once the cache exceeds its size cap.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+# Bump when a stage's output changes for the same input and parameters
+CACHE_VERSION = 1
+
+META_SUFFIX = ".json"
+
+
+def cache_key(file_path: str, stage: str, params: Dict[str, Any]) -> str:
+    """SHA-256 over the input file's bytes, the stage and its parameters"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps({"version": CACHE_VERSION, "stage": stage, "params": params},
+                             sort_keys=True, default=str).encode())
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_get(cache_dir: str, key: str, ext: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Cached artifact path and summary of a key, marked as recently used (None on a miss)"""
+    artifact_path = os.path.join(cache_dir, key + ext)
+    meta_path = os.path.join(cache_dir, key + META_SUFFIX)
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        os.utime(artifact_path)
+        os.utime(meta_path)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return artifact_path, meta
+
+
+def cache_put(cache_dir: str, key: str, artifact_path: str, meta: Dict[str, Any]) -> None:
+    """Store a copy of a stage artifact and its summary (the summary is written last, so it marks a complete entry)"""
+    os.makedirs(cache_dir, exist_ok=True)
+    suffix = f".{uuid.uuid4().hex}.tmp"
+
+    cached_path = os.path.join(cache_dir, key + os.path.splitext(artifact_path)[1])
+    shutil.copyfile(artifact_path, cached_path + suffix)
+    os.replace(cached_path + suffix, cached_path)
+
+    meta_path = os.path.join(cache_dir, key + META_SUFFIX)
+    with open(meta_path + suffix, "w") as f:
+        json.dump(meta, f)
+    os.replace(meta_path + suffix, meta_path)
+
+
+def cache_evict(cache_dir: str, max_bytes: int) -> int:
+    """Remove least recently used entries until the cache fits in max_bytes; returns entries removed"""
+    if not os.path.isdir(cache_dir):
+        return 0
+    entries: Dict[str, Dict[str, Any]] = {}
+    for item in os.scandir(cache_dir):
+        if not item.is_file() or item.name.endswith(".tmp"):
+            continue
+        stat = item.stat()
+        entry = entries.setdefault(item.name.split(".", 1)[0], {"size": 0, "used": 0.0, "paths": []})
+        entry["size"] += stat.st_size
+        entry["used"] = max(entry["used"], stat.st_mtime)
+        entry["paths"].append(item.path)
+
+    total = sum(entry["size"] for entry in entries.values())
+    removed = 0
+    for entry in sorted(entries.values(), key=lambda e: e["used"]):
+        if total <= max_bytes:
+            break
+        for path in entry["paths"]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        total -= entry["size"]
+        removed += 1
+    return removed
@@ -24,9 +24,33 @@ class Settings(BaseSettings):
     # Simulation Settings (optional overrides)
     SIMULATION_MAX_DAYS: int = 365
     SIMULATION_DEFAULT_DAYS: int = 1
+    # Profile every simulation run: "" (off), "steps" (per-step timers) or "cprofile" (also dump pstats
+    # to <storage>/temp); requests can override it with an X-Simulation-Profile header
+    SIMULATION_PROFILE: str = ""
+
+    # RL policy registry: directory scanned for PPO model zips (the AIML experiments by default)
+    # and how many stay loaded
+    RL_MODEL_DIR: str = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "AIML"))
+    RL_MODEL_CACHE_SIZE: int = 4
+    
+    # Executor pools: threads for file I/O, processes for simulation / MOO / RL
+    # (CPU_POOL_WORKERS unset = one per CPU, 0 = run CPU work on the I/O threads)
+    IO_POOL_WORKERS: int = 8
+    CPU_POOL_WORKERS: Optional[int] = None
+    
+    # Background jobs: unfinished jobs accepted at once, jobs running at a time per stage,
+    # and finished jobs kept for status polling
+    JOB_QUEUE_LIMIT: int = 100
+    JOB_SIMULATION_CONCURRENCY: int = 1
+    JOB_RL_CONCURRENCY: int = 2
+    JOB_HISTORY_LIMIT: int = 500
     
     # Shared Storage Configuration
     SHARED_STORAGE_PATH: str = "/shared/storage"
+    # Format of saved pipeline artifacts: "csv", "parquet" or "arrow" (the last two need pyarrow, see requirements.txt)
+    ARTIFACT_FORMAT: str = "csv"
+    # Size cap of the content-addressed stage result cache under <storage>/cache (0 = off)
+    STAGE_CACHE_MAX_BYTES: int = 1024 ** 3
     
     # Backend Communication URLs
     BACKEND_BASE_URL: str = "http://localhost:8000"
@@ -34,6 +58,15 @@ class Settings(BaseSettings):
     WEBHOOK_MOO_URL: str = "http://localhost:8000/api/webhook/moo-complete"
     WEBHOOK_RL_URL: str = "http://localhost:8000/api/webhook/rl-complete"
     
+    # Webhook delivery: background workers, pooled connections, retries with exponential backoff,
+    # and an optional on-disk outbox journal so undelivered events survive a restart
+    WEBHOOK_WORKERS: int = 2
+    WEBHOOK_MAX_CONNECTIONS: int = 10
+    WEBHOOK_TIMEOUT_SECONDS: float = 10.0
+    WEBHOOK_MAX_ATTEMPTS: int = 6
+    WEBHOOK_BACKOFF_SECONDS: float = 1.0
+    WEBHOOK_OUTBOX_PATH: Optional[str] = None
+    
     @property
     def ALLOWED_HOSTS(self) -> List[str]:
         """Convert ALLOWED_HOSTS_STR to list"""
@@ -0,0 +1,111 @@
+"""
+Shared date ingestion for the simulation, MOO and RL services.
+Date columns are converted once into integer day ordinals (date.toordinal()), so the
+services compare integers instead of parsing strings per train and per day.
+Well-formed strings go through one vectorized pd.to_datetime pass per format; anything
+else (NULL, odd spellings, date objects) falls back to an LRU-cached scalar parser.
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Iterable, Optional, Tuple
+
+# Ordinal for missing / unparseable dates
+NO_DATE = np.iinfo(np.int64).max
+
+# Formats accepted by the simulator, in the order parse_date tries them
+SIMULATION_DATE_FORMATS = ('%d-%m-%Y', '%Y-%m-%d')
+
+# Formats accepted by RL.py (followed by a free-form pd.to_datetime attempt)
+RL_DATE_FORMATS = ('%Y-%m-%d', '%d-%m-%Y', '%d/%m/%Y')
+
+# Strings that can only match one of the formats; these take the vectorized path
+FAST_PATTERNS = {
+    '%d-%m-%Y': r'\d{2}-\d{2}-\d{4}',
+    '%Y-%m-%d': r'\d{4}-\d{2}-\d{2}',
+    '%d/%m/%Y': r'\d{2}/\d{2}/\d{4}',
+}
+
+UNIX_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+@lru_cache(maxsize=16384)
+def parse_date_text(text: str, formats: Tuple[str, ...] = SIMULATION_DATE_FORMATS, lenient: bool = False) -> int:
+    """
+    Parse one date string to an ordinal (cached). lenient=True follows RL.py's parse_date:
+    strip whitespace, try the formats, then a free-form pd.to_datetime.
+    """
+    if text == "NULL" or text.strip() == "":
+        return NO_DATE
+    for fmt in formats:
+        try:
+            return datetime.strptime(text.strip() if lenient else text, fmt).date().toordinal()
+        except ValueError:
+            pass
+    if lenient:
+        try:
+            parsed = pd.to_datetime(text)
+            return NO_DATE if pd.isna(parsed) else parsed.date().toordinal()
+        except Exception:
+            pass
+    return NO_DATE
+
+
+def date_ordinal(value: Any, formats: Tuple[str, ...] = SIMULATION_DATE_FORMATS, lenient: bool = False) -> int:
+    """Convert one date cell (string, date or missing) to a day ordinal"""
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return value.toordinal()
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return NO_DATE
+    if isinstance(value, str):
+        return parse_date_text(value, formats, lenient)
+    if lenient:
+        try:
+            return pd.to_datetime(value).date().toordinal()
+        except Exception:
+            return NO_DATE
+    return parse_date_text(str(value), formats, lenient)
+
+
+def to_day_ordinals(
+    values: Iterable[Any],
+    formats: Tuple[str, ...] = SIMULATION_DATE_FORMATS,
+    lenient: bool = False
+) -> np.ndarray:
+    """Convert a date column to int64 day ordinals (NO_DATE for missing or unparseable cells)"""
+    # Date columns repeat a handful of values, so only the distinct ones are parsed
+    codes, uniques = pd.factorize(pd.Series(np.asarray(values, dtype=object), dtype=object))
+    cells = pd.Series(np.asarray(uniques, dtype=object), dtype=object)
+    unique_ordinals = np.full(len(cells) + 1, NO_DATE, dtype=np.int64)  # last slot: missing cells (code -1)
+    parsed = np.zeros(len(cells), dtype=bool)
+
+    text = cells.where(cells.map(type) == str)
+    for fmt in formats:
+        pattern = FAST_PATTERNS.get(fmt)
+        if pattern is None or not len(cells):
+            continue
+        match = text.str.fullmatch(pattern, na=False).to_numpy() & ~parsed
+        if not match.any():
+            continue
+        stamps = pd.to_datetime(text[match], format=fmt, errors='coerce').to_numpy('datetime64[D]')
+        ok = ~np.isnat(stamps)
+        rows = np.flatnonzero(match)[ok]
+        unique_ordinals[rows] = stamps[ok].astype(np.int64) + UNIX_EPOCH_ORDINAL
+        parsed[rows] = True
+
+    # Odd strings and date objects go through the cached scalar parser
+    for i in np.flatnonzero(~parsed):
+        unique_ordinals[i] = date_ordinal(cells.iat[i], formats, lenient)
+    return unique_ordinals[codes]
+
+
+def ordinal_to_date(ordinal: int) -> Optional[date]:
+    """Day ordinal back to a date (None for NO_DATE)"""
+    return None if ordinal == NO_DATE else date.fromordinal(int(ordinal))
+
+
+def days_until_ordinals(ordinals: np.ndarray, reference: int) -> np.ndarray:
+    """Days from reference to each ordinal, 0 where the date is missing"""
+    return np.where(ordinals == NO_DATE, 0, ordinals - reference)
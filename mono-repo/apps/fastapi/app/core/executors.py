@@ -0,0 +1,210 @@
+"""
+Managed executors for blocking stage work.
+File I/O and CSV/Parquet (de)serialization run on a thread pool; CPU-bound simulation, MOO
+and RL planning run on a process pool, so a long run neither freezes the event loop nor
+serializes the other requests of the worker on the GIL. Pool sizes come from Settings.
+Inference with trained RL policies runs on one dedicated model process, so the policy registry
+(and its loaded models) exists once instead of once per CPU worker.
+Process-pool tasks must be module-level functions with picklable arguments.
+Stage code reports background-job progress with report_progress, from any worker; progress and
+metric observations from worker processes reach the app over one worker channel.
+"""
+
+import asyncio
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.core.metrics import REGISTRY, Gauge
+
+# Worker channel of this process (inherited by pool workers through the initializer)
+_worker_queue: Optional[Any] = None
+
+
+def _warm_up() -> int:
+    """No-op task that makes the process pool start its workers"""
+    return os.getpid()
+
+
+def _init_worker(worker_queue) -> None:
+    """Process pool initializer: keep the parent's worker channel and forward metrics over it"""
+    global _worker_queue
+    _worker_queue = worker_queue
+    REGISTRY.sink = lambda *observation: worker_queue.put(("metric", observation))
+
+
+def report_progress(job_id: Optional[str], **progress) -> None:
+    """Publish a progress update of a background job (no-op when not running as a job)"""
+    if job_id is not None and _worker_queue is not None:
+        _worker_queue.put(("progress", (job_id, progress)))
+
+
+class ExecutorManager:
+    """Process-wide thread pool (I/O), process pool (CPU) and model process shared by all handlers"""
+
+    io_pool: Optional[ThreadPoolExecutor] = None
+    cpu_pool: Optional[ProcessPoolExecutor] = None
+    model_pool: Optional[ProcessPoolExecutor] = None
+    lock = threading.Lock()
+    channel_thread: Optional[threading.Thread] = None
+    progress_listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+    # Tasks submitted and not finished yet (queued or running), per pool
+    inflight: Dict[str, int] = {"io": 0, "cpu": 0, "model": 0}
+
+    @classmethod
+    def io_workers(cls) -> int:
+        """I/O threads"""
+        return max(1, settings.IO_POOL_WORKERS)
+
+    @classmethod
+    def cpu_workers(cls) -> int:
+        """Worker processes (0 = CPU work runs on the I/O threads)"""
+        if settings.CPU_POOL_WORKERS is None:
+            return os.cpu_count() or 1
+        return max(0, settings.CPU_POOL_WORKERS)
+
+    @classmethod
+    def io_executor(cls) -> ThreadPoolExecutor:
+        """Thread pool for file and network I/O, created on first use"""
+        with cls.lock:
+            if cls.io_pool is None:
+                cls.io_pool = ThreadPoolExecutor(max_workers=cls.io_workers(), thread_name_prefix="io")
+            return cls.io_pool
+
+    @classmethod
+    def worker_channel(cls):
+        """Queue carrying job progress and worker metrics back to the app, created on first use"""
+        global _worker_queue
+        with cls.lock:
+            if _worker_queue is None:
+                _worker_queue = multiprocessing.Queue()
+                cls.channel_thread = threading.Thread(
+                    target=cls.forward_messages, args=(_worker_queue,), name="worker-channel", daemon=True
+                )
+                cls.channel_thread.start()
+            return _worker_queue
+
+    @classmethod
+    def forward_messages(cls, queue) -> None:
+        """Apply worker metrics and hand progress updates to the listeners until the channel is closed"""
+        for topic, message in iter(queue.get, None):
+            if topic == "metric":
+                REGISTRY.apply(*message)
+            else:
+                for listener in cls.progress_listeners:
+                    listener(*message)
+
+    @classmethod
+    def cpu_executor(cls) -> Executor:
+        """Process pool for CPU-bound stage work, created on first use"""
+        if cls.cpu_workers() == 0:
+            cls.worker_channel()
+            return cls.io_executor()
+        worker_queue = cls.worker_channel()
+        with cls.lock:
+            if cls.cpu_pool is None:
+                cls.cpu_pool = ProcessPoolExecutor(
+                    max_workers=cls.cpu_workers(), initializer=_init_worker, initargs=(worker_queue,)
+                )
+            return cls.cpu_pool
+
+    @classmethod
+    def model_executor(cls) -> Executor:
+        """Single worker process holding the RL policy registry, created on first use"""
+        if cls.cpu_workers() == 0:
+            # Everything runs in the app process, whose registry is then the only one
+            return cls.cpu_executor()
+        worker_queue = cls.worker_channel()
+        with cls.lock:
+            if cls.model_pool is None:
+                cls.model_pool = ProcessPoolExecutor(
+                    max_workers=1, initializer=_init_worker, initargs=(worker_queue,)
+                )
+            return cls.model_pool
+
+    @classmethod
+    async def run_io(cls, fn: Callable, *args, **kwargs) -> Any:
+        """Run a blocking I/O call on the thread pool"""
+        loop = asyncio.get_running_loop()
+        cls.inflight["io"] += 1
+        try:
+            return await loop.run_in_executor(cls.io_executor(), functools.partial(fn, *args, **kwargs))
+        finally:
+            cls.inflight["io"] -= 1
+
+    @classmethod
+    async def run_cpu(cls, fn: Callable, *args, **kwargs) -> Any:
+        """Run a CPU-bound call on the process pool (a crashed pool is replaced on the next call)"""
+        return await cls.run_in_process("cpu", cls.cpu_executor(), fn, *args, **kwargs)
+
+    @classmethod
+    async def run_model(cls, fn: Callable, *args, **kwargs) -> Any:
+        """Run a call that uses the RL policy registry on the model process"""
+        return await cls.run_in_process("model", cls.model_executor(), fn, *args, **kwargs)
+
+    @classmethod
+    async def run_in_process(cls, pool: str, executor: Executor, fn: Callable, *args, **kwargs) -> Any:
+        """Run a call on a process pool, forgetting the pool when one of its workers died"""
+        loop = asyncio.get_running_loop()
+        cls.inflight[pool] += 1
+        try:
+            return await loop.run_in_executor(executor, functools.partial(fn, *args, **kwargs))
+        except BrokenProcessPool:
+            attr = f"{pool}_pool"
+            with cls.lock:
+                if getattr(cls, attr) is executor:
+                    setattr(cls, attr, None)
+            print(f"[Executors] {pool} process pool broke (a worker died); it will be restarted")
+            raise
+        finally:
+            cls.inflight[pool] -= 1
+
+    @classmethod
+    def queue_depth(cls) -> Dict[Tuple[str], float]:
+        """Submitted tasks waiting for a free worker, per pool (CPU work on threads shares the I/O threads)"""
+        workers = {"io": cls.io_workers(), "cpu": cls.cpu_workers(), "model": 1}
+        if workers["cpu"] == 0:
+            busy = cls.inflight["io"] + cls.inflight["cpu"] + cls.inflight["model"]
+            return {("io",): max(0, busy - workers["io"]), ("cpu",): 0, ("model",): 0}
+        return {(pool,): max(0, cls.inflight[pool] - workers[pool]) for pool in workers}
+
+    @classmethod
+    async def start(cls) -> None:
+        """Create the pools and start the worker processes before the first request"""
+        cls.io_executor()
+        if cls.cpu_workers() > 0:
+            # Workers start together on the first task, before the app serves requests
+            await asyncio.gather(cls.run_cpu(_warm_up), cls.run_model(_warm_up))
+        print(f"[Executors] I/O threads: {cls.io_workers()}, CPU processes: {cls.cpu_workers()}"
+              + (", model process: 1" if cls.cpu_workers() > 0 else ""))
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """Stop the pools (waits for running tasks) and close the worker channel"""
+        global _worker_queue
+        with cls.lock:
+            pools = [cls.io_pool, cls.cpu_pool, cls.model_pool]
+            cls.io_pool, cls.cpu_pool, cls.model_pool = None, None, None
+        for pool in pools:
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+        with cls.lock:
+            queue, thread, _worker_queue, cls.channel_thread = _worker_queue, cls.channel_thread, None, None
+        if queue is not None:
+            queue.put(None)
+            thread.join()
+            queue.close()
+
+
+EXECUTOR_INFLIGHT = Gauge(
+    "executor_inflight_tasks", "Tasks submitted to an executor pool and not finished (queued or running)", ["pool"],
+    collect=lambda: {(pool,): float(count) for pool, count in ExecutorManager.inflight.items()}
+)
+EXECUTOR_QUEUE_DEPTH = Gauge(
+    "executor_queue_depth", "Tasks waiting for a free executor worker", ["pool"],
+    collect=ExecutorManager.queue_depth
+)
@@ -0,0 +1,177 @@
+"""
+Background jobs for long stage runs.
+POST endpoints submit their work here and answer with a job id at once; each stage kind runs
+at most its configured number of jobs at a time (the rest wait in line), and clients poll
+GET /jobs/{id} for the stage, day k of N and the saved artifact paths. Jobs live in memory,
+and only the newest JOB_HISTORY_LIMIT finished jobs are kept.
+"""
+
+import asyncio
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.executors import ExecutorManager
+from app.core.metrics import Gauge
+
+
+class JobQueueFull(RuntimeError):
+    """Raised when JOB_QUEUE_LIMIT jobs are already queued or running"""
+
+
+@dataclass
+class Job:
+    """One background stage run"""
+    kind: str
+    run_id: str
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = "queued"
+    progress: Dict[str, Any] = field(default_factory=lambda: {"stage": "queued"})
+    artifacts: Dict[str, str] = field(default_factory=dict)
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def describe(self) -> Dict[str, Any]:
+        """Status snapshot for GET /jobs/{id}"""
+        end = self.finished_at or datetime.now()
+        return {
+            "jobId": self.id,
+            "kind": self.kind,
+            "runId": self.run_id,
+            "status": self.status,
+            "progress": dict(self.progress),
+            "artifacts": dict(self.artifacts),
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "elapsed_seconds": (end - self.started_at).total_seconds() if self.started_at else None,
+        }
+
+
+class JobManager:
+    """Process-wide registry and runner of background jobs"""
+
+    jobs: "OrderedDict[str, Job]" = OrderedDict()
+    tasks: Dict[str, asyncio.Task] = {}
+    limits: Dict[str, asyncio.Semaphore] = {}
+    loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def concurrency(cls, kind: str) -> int:
+        """Jobs of one kind that may run at the same time"""
+        limits = {"simulation": settings.JOB_SIMULATION_CONCURRENCY, "rl": settings.JOB_RL_CONCURRENCY}
+        return max(1, limits.get(kind, 1))
+
+    @classmethod
+    def submit(cls, kind: str, run_id: str, work: Callable[[str], Awaitable[Dict[str, Any]]]) -> Job:
+        """
+        Queue work(job_id) as a background job and return the job at once.
+        work returns the stage result; its result_file_path is reported as the job's artifact.
+        """
+        loop = asyncio.get_running_loop()
+        if cls.loop is not loop:
+            # Semaphores belong to the loop that created them
+            cls.loop, cls.limits = loop, {}
+        if len(cls.tasks) >= settings.JOB_QUEUE_LIMIT:
+            raise JobQueueFull(f"{len(cls.tasks)} jobs are already queued or running, try again later")
+
+        job = Job(kind, run_id)
+        cls.jobs[job.id] = job
+        cls.tasks[job.id] = loop.create_task(cls.execute(job, work))
+        cls.prune()
+        print(f"[Jobs] {kind} job {job.id} queued for run {run_id}")
+        return job
+
+    @classmethod
+    async def execute(cls, job: Job, work: Callable[[str], Awaitable[Dict[str, Any]]]) -> None:
+        """Wait for a free slot of the job's kind, run the work and record its outcome"""
+        limit = cls.limits.setdefault(job.kind, asyncio.Semaphore(cls.concurrency(job.kind)))
+        try:
+            async with limit:
+                job.status, job.started_at = "running", datetime.now()
+                job.progress["stage"] = "starting"
+                result = await work(job.id)
+            job.result = result
+            if result.get("result_file_path"):
+                job.artifacts[job.kind] = result["result_file_path"]
+            job.status = "succeeded"
+        except asyncio.CancelledError:
+            job.status, job.error = "failed", "Cancelled at shutdown"
+            raise
+        except Exception as e:
+            # Handlers raise HTTPException, whose message is in detail
+            job.status, job.error = "failed", str(getattr(e, "detail", None) or e)
+        finally:
+            job.finished_at = datetime.now()
+            job.progress["stage"] = job.status
+            cls.tasks.pop(job.id, None)
+            print(f"[Jobs] {job.kind} job {job.id} {job.status}" + (f": {job.error}" if job.error else ""))
+
+    @classmethod
+    def update(cls, job_id: Optional[str], **progress) -> None:
+        """Merge a progress update into a job (no-op without a job id, e.g. for synchronous requests)"""
+        job = cls.jobs.get(job_id) if job_id is not None else None
+        if job is not None and not job.finished:
+            job.progress.update(progress)
+
+    @classmethod
+    def on_progress(cls, job_id: str, progress: Dict[str, Any]) -> None:
+        """Progress listener for updates reported from executor workers (called on the worker channel thread)"""
+        if cls.loop is None:
+            return
+        try:
+            cls.loop.call_soon_threadsafe(lambda: cls.update(job_id, **progress))
+        except RuntimeError:
+            pass  # loop already closed
+
+    @classmethod
+    def get(cls, job_id: str) -> Job:
+        """Job by id (KeyError when unknown or already pruned)"""
+        if job_id not in cls.jobs:
+            raise KeyError(f"Job '{job_id}' not found")
+        return cls.jobs[job_id]
+
+    @classmethod
+    def status_counts(cls) -> Dict[Tuple[str, str], float]:
+        """Number of jobs per (kind, status), for metrics"""
+        counts: Dict[Tuple[str, str], float] = {}
+        for job in list(cls.jobs.values()):
+            counts[(job.kind, job.status)] = counts.get((job.kind, job.status), 0.0) + 1
+        return counts
+
+    @classmethod
+    def prune(cls) -> None:
+        """Forget the oldest finished jobs beyond JOB_HISTORY_LIMIT"""
+        finished = [job_id for job_id, job in cls.jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - settings.JOB_HISTORY_LIMIT)]:
+            del cls.jobs[job_id]
+
+    @classmethod
+    async def shutdown(cls) -> None:
+        """Cancel queued and running jobs"""
+        tasks = list(cls.tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if tasks:
+            print(f"[Jobs] {len(tasks)} unfinished jobs cancelled at shutdown")
+
+
+ExecutorManager.progress_listeners.append(JobManager.on_progress)
+
+JOBS = Gauge(
+    "jobs", "Background jobs by kind and status (finished jobs while they are kept)", ["kind", "status"],
+    collect=JobManager.status_counts
+)
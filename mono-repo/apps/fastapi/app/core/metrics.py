@@ -0,0 +1,240 @@
+"""
+In-process metrics registry with a Prometheus text exposition (served at /metrics).
+Counters, gauges and histograms are kept per label set. Code running in executor worker
+processes records the same way: there the registry's sink forwards each observation to the
+app process over the executors' worker channel. Gauges may read their value at scrape time.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Seconds: from a cached stage hit up to a long simulation
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# Bytes: 1 KiB to 1 GiB in powers of 4
+SIZE_BUCKETS = tuple(float(1024 * 4 ** i) for i in range(11))
+
+LabelValues = Tuple[str, ...]
+
+
+def format_value(value: float) -> str:
+    """Sample value in exposition format"""
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """{name="value",...} with exposition-format escaping ("" without labels)"""
+    if not names:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for v in values)
+    return "{" + ",".join(f'{n}="{v}"' for n, v in zip(names, escaped)) + "}"
+
+
+class Metric:
+    """Base class: a named metric with fixed label names, registered on creation"""
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), registry: Optional["MetricsRegistry"] = None):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+        self.registry = registry or REGISTRY
+        self.registry.register(self)
+
+    def label_values(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def record(self, op: str, value: float, labels: Dict[str, Any]) -> None:
+        """Apply an observation here, or forward it when this is an executor worker process"""
+        if self.registry.sink is not None:
+            self.registry.sink(self.name, op, value, labels)
+        else:
+            self.apply(op, value, self.label_values(labels))
+
+    def apply(self, op: str, value: float, key: LabelValues) -> None:
+        raise NotImplementedError
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class ValueMetric(Metric):
+    """One value per label set, set by observations or read at scrape time from collect()"""
+
+    def __init__(self, *args, collect: Optional[Callable[[], Dict[LabelValues, float]]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.values: Dict[LabelValues, float] = {}
+        self.collect = collect
+
+    def samples(self) -> List[str]:
+        with self.lock:
+            values = dict(self.values)
+        if self.collect is not None:
+            values.update(self.collect())
+        return [f"{self.name}{format_labels(self.labelnames, key)} {format_value(v)}" for key, v in sorted(values.items())]
+
+
+class Counter(ValueMetric):
+    """Monotonically increasing count"""
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        self.record("inc", amount, labels)
+
+    def apply(self, op: str, value: float, key: LabelValues) -> None:
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + value
+
+
+class Gauge(ValueMetric):
+    """Value that goes up and down"""
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        self.record("set", value, labels)
+
+    def apply(self, op: str, value: float, key: LabelValues) -> None:
+        with self.lock:
+            self.values[key] = value
+
+
+class Histogram(Metric):
+    """Distribution of observations in cumulative buckets, with their sum and count"""
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = LATENCY_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # label values -> [count per bucket (non-cumulative), sum, count]
+        self.series: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        self.record("observe", value, labels)
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the wall time of a with-block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def apply(self, op: str, value: float, key: LabelValues) -> None:
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [[0] * len(self.buckets), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self) -> List[str]:
+        with self.lock:
+            series = {key: (list(counts), total, count) for key, (counts, total, count) in self.series.items()}
+        lines = []
+        names = self.labelnames + ("le",)
+        for key, (counts, total, count) in sorted(series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{format_labels(names, key + (format_value(bound),))} {cumulative}")
+            labels = format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """All metrics of the process, rendered together"""
+
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+        # Set in executor worker processes: forwards (name, op, value, labels) to the app process
+        self.sink: Optional[Callable[[str, str, float, Dict[str, Any]], None]] = None
+
+    def register(self, metric: Metric) -> None:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+
+    def apply(self, name: str, op: str, value: float, labels: Dict[str, Any]) -> None:
+        """Apply an observation forwarded from a worker process"""
+        metric = self.metrics.get(name)
+        if metric is not None:
+            metric.apply(op, value, metric.label_values(labels))
+
+    def render(self) -> str:
+        """Prometheus text exposition format 0.0.4"""
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# Stage metrics recorded by the services (the subsystems define their own next to their code)
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency until the response body is sent, by router",
+    ["router", "method", "status"]
+)
+SIMULATION_DAY_SECONDS = Histogram(
+    "simulation_day_seconds", "Wall time of one simulated day", ["engine"]
+)
+MOO_RANKING_SECONDS = Histogram(
+    "moo_ranking_seconds", "Wall time of one MOO fleet ranking"
+)
+RL_INFERENCE_SECONDS = Histogram(
+    "rl_inference_seconds", "Wall time of one RL night plan, by planner", ["planner"]
+)
+ARTIFACT_IO_SECONDS = Histogram(
+    "artifact_io_seconds", "Wall time of reading or writing one artifact file", ["operation", "format"]
+)
+ARTIFACT_IO_BYTES = Histogram(
+    "artifact_io_bytes", "Size of artifact files read or written", ["operation", "format"], buckets=SIZE_BUCKETS
+)
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware timing every HTTP request, labelled by router (first path segment after /api/v1)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    @staticmethod
+    def router_label(path: str) -> str:
+        parts = [part for part in path.split("/") if part]
+        if parts[:2] == ["api", "v1"]:
+            parts = parts[2:]
+        return parts[0] if parts else "root"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # 404 answers share one label so scanning unknown paths cannot blow up the series count
+            router = "unmatched" if status[0] == 404 else self.router_label(scope["path"])
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start, router=router, method=scope["method"], status=status[0]
+            )
@@ -4,11 +4,16 @@ Provides centralized file handling for the pipeline system
 """
 
 import os
+import shutil
 import time
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 import pandas as pd
 from app.core.config import settings
+from app.core.artifacts import ARTIFACT_EXTENSIONS, artifact_extension, read_artifact, read_artifacts, write_artifact
+from app.core.cache import cache_evict, cache_get, cache_key, cache_put
+from app.core.executors import ExecutorManager
+from app.core.metrics import Counter
 
 class StorageManager:
     """Storage utility class for managing pipeline files in FastAPI services"""
@@ -24,17 +29,32 @@ class StorageManager:
         "MOO_OUTPUT": "output/moo", 
         "RL_OUTPUT": "output/rl",
         "TEMP": "temp",
-        "LOGS": "logs"
+        "LOGS": "logs",
+        "CACHE": "cache"
     }
     
-    # File naming patterns
+    # Artifact format of saved results (see app.core.artifacts)
+    ARTIFACT_FORMAT = settings.ARTIFACT_FORMAT
+    
+    # File naming patterns (the extension selects the artifact format)
     FILE_PATTERNS = {
-        "USER_UPLOAD": lambda upload_id: f"user_upload_{upload_id}.csv",
-        "SIMULATION_RESULT": lambda run_id: f"simulation_result_{run_id}.csv",
-        "MOO_RESULT": lambda run_id: f"moo_result_{run_id}.csv",
-        "RL_FINAL": lambda run_id: f"rl_final_{run_id}.csv"
+        "USER_UPLOAD": lambda upload_id, ext=".csv": f"user_upload_{upload_id}{ext}",
+        "SIMULATION_RESULT": lambda run_id, ext=".csv": f"simulation_result_{run_id}{ext}",
+        "MOO_RESULT": lambda run_id, ext=".csv": f"moo_result_{run_id}{ext}",
+        "RL_FINAL": lambda run_id, ext=".csv": f"rl_final_{run_id}{ext}"
+    }
+    
+    # Output folder of each stage result pattern
+    RESULT_DIRECTORIES = {
+        "SIMULATION_RESULT": "SIMULATION_OUTPUT",
+        "MOO_RESULT": "MOO_OUTPUT",
+        "RL_FINAL": "RL_OUTPUT"
     }
     
+    # Content-addressed stage result cache (see app.core.cache); 0 bytes disables it
+    CACHE_MAX_BYTES = settings.STAGE_CACHE_MAX_BYTES
+    cache_counters = {"hits": 0, "misses": 0, "evictions": 0}
+    
     @classmethod
     async def initialize_storage(cls) -> None:
         """Initialize storage directories if they don't exist"""
@@ -46,7 +66,8 @@ class StorageManager:
                 cls.get_storage_path("MOO_OUTPUT"),
                 cls.get_storage_path("RL_OUTPUT"),
                 cls.get_storage_path("TEMP"),
-                cls.get_storage_path("LOGS")
+                cls.get_storage_path("LOGS"),
+                cls.get_storage_path("CACHE")
             ]
             
             for directory in directories:
@@ -68,56 +89,141 @@ class StorageManager:
         return os.path.join(cls.get_storage_path(directory), filename)
     
     @classmethod
-    async def read_csv_from_path(cls, file_path: str) -> pd.DataFrame:
-        """Read CSV file from storage path and return DataFrame"""
+    def artifact_extension(cls, fmt: Optional[str] = None) -> str:
+        """File extension for an artifact format (the configured ARTIFACT_FORMAT by default)"""
+        return artifact_extension(fmt or cls.ARTIFACT_FORMAT)
+    
+    @classmethod
+    async def read_artifact_from_path(cls, file_path: str, **read_kwargs) -> pd.DataFrame:
+        """
+        Read a CSV, Parquet or Arrow artifact (chosen by extension) and return DataFrame
+        (read_kwargs go to pd.read_csv and are ignored by the typed formats)
+        """
         try:
             if not os.path.exists(file_path):
                 raise FileNotFoundError(f"File not found: {file_path}")
                 
-            df = pd.read_csv(file_path)
-            print(f"[Storage] CSV loaded from: {file_path} ({len(df)} rows)")
+            df = await ExecutorManager.run_io(read_artifact, file_path, **read_kwargs)
+            print(f"[Storage] Artifact loaded from: {file_path} ({len(df)} rows)")
             return df
             
         except Exception as e:
-            print(f"[Storage] Failed to read CSV from {file_path}: {e}")
+            print(f"[Storage] Failed to read artifact from {file_path}: {e}")
             raise
     
     @classmethod
-    async def save_csv_to_storage(cls, df: pd.DataFrame, directory: str, filename: str) -> str:
-        """Save DataFrame as CSV to storage and return file path"""
+    async def read_artifacts_from_paths(cls, file_paths: List[str], **read_kwargs) -> pd.DataFrame:
+        """Read several artifacts (e.g. daily snapshots of one run) into one DataFrame"""
+        try:
+            missing = [path for path in file_paths if not os.path.exists(path)]
+            if missing:
+                raise FileNotFoundError(f"File not found: {missing[0]}")
+            
+            df = await ExecutorManager.run_io(read_artifacts, file_paths, **read_kwargs)
+            print(f"[Storage] {len(file_paths)} artifacts loaded ({len(df)} rows)")
+            return df
+            
+        except Exception as e:
+            print(f"[Storage] Failed to read artifacts: {e}")
+            raise
+    
+    @classmethod
+    async def read_csv_from_path(cls, file_path: str, **read_kwargs) -> pd.DataFrame:
+        """Read CSV file from storage path and return DataFrame (Parquet / Arrow paths are read typed)"""
+        return await cls.read_artifact_from_path(file_path, **read_kwargs)
+    
+    @classmethod
+    async def save_artifact_to_storage(cls, df: pd.DataFrame, directory: str, filename: str) -> str:
+        """Save DataFrame to storage in the format of the filename's extension and return file path"""
         try:
             file_path = cls.get_file_path(directory, filename)
             
             # Ensure directory exists
             Path(file_path).parent.mkdir(parents=True, exist_ok=True)
             
-            # Save CSV
-            df.to_csv(file_path, index=False)
-            print(f"[Storage] CSV saved to: {file_path} ({len(df)} rows)")
+            await ExecutorManager.run_io(write_artifact, df, file_path)
+            print(f"[Storage] Artifact saved to: {file_path} ({len(df)} rows)")
             
             return file_path
             
         except Exception as e:
-            print(f"[Storage] Failed to save CSV: {e}")
+            print(f"[Storage] Failed to save artifact: {e}")
             raise
     
     @classmethod
-    async def save_simulation_result(cls, run_id: str, df: pd.DataFrame) -> str:
+    async def save_csv_to_storage(cls, df: pd.DataFrame, directory: str, filename: str) -> str:
+        """Save DataFrame as CSV to storage and return file path"""
+        return await cls.save_artifact_to_storage(df, directory, filename)
+    
+    @classmethod
+    async def save_simulation_result(cls, run_id: str, df: pd.DataFrame, fmt: Optional[str] = None) -> str:
         """Save simulation results to organized simulation output folder"""
-        filename = cls.FILE_PATTERNS["SIMULATION_RESULT"](run_id)
-        return await cls.save_csv_to_storage(df, "SIMULATION_OUTPUT", filename)
+        filename = cls.FILE_PATTERNS["SIMULATION_RESULT"](run_id, cls.artifact_extension(fmt))
+        return await cls.save_artifact_to_storage(df, "SIMULATION_OUTPUT", filename)
     
     @classmethod
-    async def save_moo_result(cls, run_id: str, df: pd.DataFrame) -> str:
+    async def save_moo_result(cls, run_id: str, df: pd.DataFrame, fmt: Optional[str] = None) -> str:
         """Save MOO ranking results to organized MOO output folder"""
-        filename = cls.FILE_PATTERNS["MOO_RESULT"](run_id)
-        return await cls.save_csv_to_storage(df, "MOO_OUTPUT", filename)
+        filename = cls.FILE_PATTERNS["MOO_RESULT"](run_id, cls.artifact_extension(fmt))
+        return await cls.save_artifact_to_storage(df, "MOO_OUTPUT", filename)
     
     @classmethod
-    async def save_rl_result(cls, run_id: str, df: pd.DataFrame) -> str:
+    async def save_rl_result(cls, run_id: str, df: pd.DataFrame, fmt: Optional[str] = None) -> str:
         """Save RL scheduling results to organized RL output folder"""
-        filename = cls.FILE_PATTERNS["RL_FINAL"](run_id)
-        return await cls.save_csv_to_storage(df, "RL_OUTPUT", filename)
+        filename = cls.FILE_PATTERNS["RL_FINAL"](run_id, cls.artifact_extension(fmt))
+        return await cls.save_artifact_to_storage(df, "RL_OUTPUT", filename)
+    
+    @classmethod
+    async def stage_cache_key(cls, file_path: str, stage: str, params: Dict[str, Any]) -> Optional[str]:
+        """
+        Cache key of a stage run on an input file: hash of the file's bytes, the stage, its
+        parameters and the artifact format (None when the cache is disabled)
+        """
+        if cls.CACHE_MAX_BYTES <= 0:
+            return None
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+        params = dict(params, artifact_format=cls.ARTIFACT_FORMAT)
+        return await ExecutorManager.run_io(cache_key, file_path, stage, params)
+    
+    @classmethod
+    async def load_cached_result(cls, key: Optional[str], pattern: str, run_id: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        On a cache hit, copy the cached artifact to this run's result path (as named by the
+        FILE_PATTERNS entry) and return the path with the stored summary; None on a miss
+        """
+        if key is None:
+            return None
+        filename = cls.FILE_PATTERNS[pattern](run_id, cls.artifact_extension())
+        file_path = cls.get_file_path(cls.RESULT_DIRECTORIES[pattern], filename)
+        try:
+            hit = await ExecutorManager.run_io(cache_get, cls.get_storage_path("CACHE"), key, cls.artifact_extension())
+            if hit is not None:
+                Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+                await ExecutorManager.run_io(shutil.copyfile, hit[0], file_path)
+        except FileNotFoundError:
+            hit = None  # evicted in the meantime
+        if hit is None:
+            cls.cache_counters["misses"] += 1
+            return None
+        cls.cache_counters["hits"] += 1
+        print(f"[Storage] Cache hit {key[:12]}, result copied to: {file_path}")
+        return file_path, hit[1]
+    
+    @classmethod
+    async def store_cached_result(cls, key: Optional[str], file_path: str, summary: Dict[str, Any]) -> None:
+        """Add a saved stage result to the cache and evict least recently used entries beyond the size cap"""
+        if key is None:
+            return
+        cache_dir = cls.get_storage_path("CACHE")
+        try:
+            await ExecutorManager.run_io(cache_put, cache_dir, key, file_path, summary)
+            evicted = await ExecutorManager.run_io(cache_evict, cache_dir, cls.CACHE_MAX_BYTES)
+            cls.cache_counters["evictions"] += evicted
+            print(f"[Storage] Cached result {key[:12]}" + (f" ({evicted} entries evicted)" if evicted else ""))
+        except Exception as e:
+            # The result is already saved; a cache failure only costs a future recomputation
+            print(f"[Storage] Failed to cache result: {e}")
     
     @classmethod
     async def save_pipeline_log(cls, run_id: str, stage: str, log_data: dict) -> str:
@@ -199,14 +305,22 @@ class StorageManager:
             return {"input_files": 0, "output_files": 0, "temp_files": 0}
 
 
+STAGE_CACHE_EVENTS = Counter(
+    "stage_cache_events_total", "Stage result cache hits, misses and evicted entries", ["event"],
+    collect=lambda: {(event,): float(count) for event, count in StorageManager.cache_counters.items()}
+)
+
+
 # Utility functions for pipeline integration
 async def extract_run_id_from_path(file_path: str, pattern_type: str) -> Optional[str]:
     """Extract run ID from file path based on naming pattern"""
     try:
         filename = os.path.basename(file_path)
         
-        # Remove .csv extension
-        name_without_ext = filename.replace('.csv', '')
+        # Remove the artifact extension (.csv, .parquet, .arrow)
+        name_without_ext, ext = os.path.splitext(filename)
+        if ext not in ARTIFACT_EXTENSIONS.values():
+            name_without_ext = filename
         
         # Extract run ID based on pattern
         if pattern_type == "simulation":
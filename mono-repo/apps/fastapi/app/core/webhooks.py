@@ -0,0 +1,234 @@
+"""
+Shared webhook delivery for the pipeline services.
+Stage handlers enqueue an event and return as soon as their artifact is saved; background
+workers deliver the outbox over one pooled httpx client and retry failures with exponential
+backoff. A pending event for the same backend URL and run is replaced by a newer one, since
+the backend only acts on a run's latest status. With WEBHOOK_OUTBOX_PATH set, the outbox is
+journaled to disk so undelivered events survive a restart.
+"""
+
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.core.config import settings
+from app.core.metrics import Counter, Gauge, Histogram
+
+# Longest wait between two attempts of one event
+MAX_BACKOFF_SECONDS = 60.0
+
+# 4xx answers that are worth retrying (everything else in 4xx is a permanent rejection)
+RETRYABLE_CLIENT_ERRORS = {408, 409, 425, 429}
+
+
+@dataclass
+class WebhookEvent:
+    """One webhook call waiting in the outbox"""
+    url: str
+    payload: Dict[str, Any]
+    service: str = "Webhook"
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    attempts: int = 0
+
+    @property
+    def key(self) -> Tuple[str, Any]:
+        """Coalescing key: one pending event per backend URL and run"""
+        return self.url, self.payload.get("runId")
+
+
+class WebhookDispatcher:
+    """Process-wide webhook outbox drained by background workers over a pooled client"""
+
+    client: Optional[httpx.AsyncClient] = None
+    loop: Optional[asyncio.AbstractEventLoop] = None
+    pending: "OrderedDict[Tuple[str, Any], WebhookEvent]" = OrderedDict()
+    queue: Optional[asyncio.Queue] = None
+    workers: List[asyncio.Task] = []
+    counters: Dict[str, int] = {"enqueued": 0, "coalesced": 0, "delivered": 0, "retried": 0, "dropped": 0}
+
+    @classmethod
+    async def start(cls) -> None:
+        """Create the pooled client and the workers, and re-queue events left in the journal"""
+        loop = asyncio.get_running_loop()
+        if cls.workers and cls.loop is loop:
+            return
+        # Pending events of a previous (closed) event loop are carried over; the first start reads the journal
+        events = list(cls.pending.values()) if cls.loop is not None else cls.replay_journal()
+        cls.pending = OrderedDict()
+        cls.loop = loop
+        cls.client = httpx.AsyncClient(
+            timeout=settings.WEBHOOK_TIMEOUT_SECONDS,
+            limits=httpx.Limits(max_connections=settings.WEBHOOK_MAX_CONNECTIONS,
+                                max_keepalive_connections=settings.WEBHOOK_MAX_CONNECTIONS),
+        )
+        cls.queue = asyncio.Queue()
+        for event in events:
+            cls.pending[event.key] = event
+            cls.queue.put_nowait(event.key)
+        cls.workers = [asyncio.create_task(cls.worker()) for _ in range(max(1, settings.WEBHOOK_WORKERS))]
+        print(f"[Webhooks] Dispatcher started with {len(cls.workers)} workers ({len(cls.pending)} pending)")
+
+    @classmethod
+    async def stop(cls, drain_seconds: float = 5.0) -> None:
+        """Give the outbox a moment to drain, then stop the workers and close the client"""
+        if cls.queue is not None and cls.pending:
+            try:
+                await asyncio.wait_for(cls.queue.join(), timeout=drain_seconds)
+            except asyncio.TimeoutError:
+                pass
+        if cls.pending:
+            print(f"[Webhooks] {len(cls.pending)} events still pending at shutdown")
+        for task in cls.workers:
+            task.cancel()
+        await asyncio.gather(*cls.workers, return_exceptions=True)
+        cls.workers = []
+        if cls.client is not None:
+            await cls.client.aclose()
+            cls.client = None
+
+    @classmethod
+    async def enqueue(cls, url: str, payload: Dict[str, Any], service: str = "Webhook") -> None:
+        """Queue a webhook call and return immediately (delivery happens in the background)"""
+        if cls.loop is not asyncio.get_running_loop():
+            await cls.start()
+        event = WebhookEvent(url, payload, service)
+        cls.counters["enqueued"] += 1
+        cls.journal("add", event)
+
+        replaced = cls.pending.get(event.key)
+        cls.pending[event.key] = event
+        if replaced is not None:
+            # The queued (or retrying) slot of the older event delivers this one instead
+            cls.counters["coalesced"] += 1
+            cls.journal("done", replaced)
+            print(f"[{service}] Webhook for run {payload.get('runId')} replaces a pending one")
+        else:
+            cls.queue.put_nowait(event.key)
+
+    @classmethod
+    async def worker(cls) -> None:
+        """Deliver queued events until cancelled"""
+        while True:
+            key = await cls.queue.get()
+            event = cls.pending.get(key)
+            try:
+                if event is not None:
+                    await cls.attempt(key, event)
+            except Exception as e:
+                # One bad event must not take the worker down with it
+                print(f"[Webhooks] Dropping webhook for run {key[1]} after an unexpected error: {e!r}")
+                if cls.pending.get(key) is event:
+                    del cls.pending[key]
+                    cls.counters["dropped"] += 1
+            finally:
+                cls.queue.task_done()
+
+    @classmethod
+    async def attempt(cls, key: Tuple[str, Any], event: WebhookEvent) -> None:
+        """Try one delivery; schedule a retry with backoff or drop the event when it cannot succeed"""
+        event.attempts += 1
+        start = time.perf_counter()
+        try:
+            response = await cls.client.post(event.url, json=event.payload)
+            response.raise_for_status()
+            retry = None
+        except httpx.HTTPStatusError as e:
+            status = e.response.status_code
+            retry = status >= 500 or status in RETRYABLE_CLIENT_ERRORS
+            error, reason = f"HTTP {status}", str(status)
+        except httpx.HTTPError as e:
+            # A URL without http(s):// is a configuration error, not a transient one
+            retry = not isinstance(e, httpx.UnsupportedProtocol)
+            error, reason = f"{type(e).__name__}: {e}", type(e).__name__
+        except Exception as e:
+            # Bad URL, a payload that is not JSON serializable, ...: retrying cannot help
+            retry = False
+            error, reason = f"{type(e).__name__}: {e}", type(e).__name__
+        WEBHOOK_ATTEMPT_SECONDS.observe(
+            time.perf_counter() - start, service=event.service, outcome="delivered" if retry is None else "failed"
+        )
+        if retry is not None:
+            WEBHOOK_FAILURES.inc(service=event.service, reason=reason)
+
+        superseded = cls.pending.get(key) is not event
+        if retry is None:
+            cls.counters["delivered"] += 1
+            print(f"[{event.service}] Webhook sent successfully → {event.payload}")
+        elif retry and not superseded and event.attempts < settings.WEBHOOK_MAX_ATTEMPTS:
+            delay = min(MAX_BACKOFF_SECONDS, settings.WEBHOOK_BACKOFF_SECONDS * 2 ** (event.attempts - 1))
+            delay *= random.uniform(0.8, 1.2)
+            cls.counters["retried"] += 1
+            print(f"[{event.service}] Webhook attempt {event.attempts} failed ({error}), retrying in {delay:.1f}s")
+            asyncio.get_running_loop().call_later(delay, cls.queue.put_nowait, key)
+            return
+        elif not superseded:
+            cls.counters["dropped"] += 1
+            print(f"[{event.service}] Failed to send webhook after {event.attempts} attempts: {error}")
+
+        cls.journal("done", event)
+        if superseded:
+            # A newer event for this run arrived during the attempt and still needs its slot
+            cls.queue.put_nowait(key)
+        else:
+            del cls.pending[key]
+
+    @staticmethod
+    def journal(op: str, event: WebhookEvent) -> None:
+        """Append an outbox change to the on-disk journal (no-op unless WEBHOOK_OUTBOX_PATH is set)"""
+        path = settings.WEBHOOK_OUTBOX_PATH
+        if not path:
+            return
+        record = {"op": op, "id": event.id}
+        if op == "add":
+            record.update(url=event.url, payload=event.payload, service=event.service)
+        with open(path, "a") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+
+    @staticmethod
+    def replay_journal() -> List[WebhookEvent]:
+        """Undelivered events from the journal, which is then compacted to just those events"""
+        path = settings.WEBHOOK_OUTBOX_PATH
+        if not path or not os.path.exists(path):
+            return []
+        events: "OrderedDict[str, WebhookEvent]" = OrderedDict()
+        with open(path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line after a crash
+                if record["op"] == "add":
+                    events[record["id"]] = WebhookEvent(record["url"], record["payload"], record["service"], record["id"])
+                else:
+                    events.pop(record["id"], None)
+        latest = {event.key: event for event in events.values()}
+        with open(path + ".tmp", "w") as f:
+            for event in latest.values():
+                f.write(json.dumps({"op": "add", "id": event.id, "url": event.url,
+                                    "payload": event.payload, "service": event.service}) + "\n")
+        os.replace(path + ".tmp", path)
+        return list(latest.values())
+
+
+WEBHOOK_ATTEMPT_SECONDS = Histogram(
+    "webhook_attempt_seconds", "Latency of one webhook delivery attempt", ["service", "outcome"]
+)
+WEBHOOK_FAILURES = Counter(
+    "webhook_failures_total", "Failed webhook delivery attempts, by HTTP status or transport error", ["service", "reason"]
+)
+WEBHOOK_EVENTS = Counter(
+    "webhook_events_total", "Webhook outbox events: enqueued, coalesced, delivered, retried, dropped", ["event"],
+    collect=lambda: {(event,): float(count) for event, count in WebhookDispatcher.counters.items()}
+)
+WEBHOOK_PENDING = Gauge(
+    "webhook_outbox_pending", "Webhook events waiting for delivery or a retry",
+    collect=lambda: {(): float(len(WebhookDispatcher.pending))}
+)
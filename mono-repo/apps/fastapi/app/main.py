@@ -3,11 +3,18 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.core.database import connect_db, disconnect_db
 from app.core.config import settings
 from app.core.storage import StorageManager
+from app.core.executors import ExecutorManager
+from app.core.webhooks import WebhookDispatcher
+from app.core.jobs import JobManager
+from app.core.metrics import RequestMetricsMiddleware
 from app.api.health.router import router as health_router
 from app.api.user.router import router as user_router
 from app.api.simulation.router import router as simulation_router
 from app.api.moo.router import router as moo_router
 from app.api.rl.router import router as rl_router
+from app.api.pipeline.router import router as pipeline_router
+from app.api.jobs.router import router as jobs_router
+from app.api.metrics.router import router as metrics_router
 
 
 def create_application() -> FastAPI:
@@ -30,6 +37,9 @@ def create_application() -> FastAPI:
         allow_headers=["*"],
     )
     
+    # Time every request for /metrics
+    app.add_middleware(RequestMetricsMiddleware)
+    
     # Include existing routers
     app.include_router(health_router, prefix="/api/v1")
     app.include_router(user_router, prefix="/api/v1")
@@ -41,6 +51,15 @@ def create_application() -> FastAPI:
     # Include RL router
     app.include_router(rl_router, prefix="/api/v1")
     
+    # Include fused pipeline router
+    app.include_router(pipeline_router, prefix="/api/v1")
+    
+    # Include background job status router
+    app.include_router(jobs_router, prefix="/api/v1")
+    
+    # Include Prometheus metrics endpoint (unprefixed, where scrapers look for it)
+    app.include_router(metrics_router)
+    
     return app
 
 app = create_application()
@@ -50,11 +69,16 @@ async def startup():
     """Application startup event"""
     await connect_db()
     await StorageManager.initialize_storage()
+    await ExecutorManager.start()
+    await WebhookDispatcher.start()
 
 @app.on_event("shutdown")
 async def shutdown():
     """Application shutdown event"""
+    await JobManager.shutdown()
+    await WebhookDispatcher.stop()
     await disconnect_db()
+    ExecutorManager.shutdown()
 
 @app.get("/")
 async def root():
@@ -68,7 +92,10 @@ async def root():
             "Health Monitoring", 
             "Train Fleet Simulation",
             "Multi-Objective Optimization (MOO) Train Ranking",
-            "Reinforcement Learning Train Scheduling"  # Added RL feature
+            "Reinforcement Learning Train Scheduling",  # Added RL feature
+            "Fused Simulation -> MOO -> RL Pipeline",
+            "Background Jobs with Progress Polling",
+            "Prometheus Metrics"
         ],
         "endpoints": {
             "/api/v1/health": "Application health checks",
@@ -76,6 +103,9 @@ async def root():
             "/api/v1/simulation": "Train fleet simulation operations",
             "/api/v1/moo": "Multi-Objective Optimization train ranking",
             "/api/v1/rl": "Reinforcement Learning train scheduling",  # Added RL endpoint
+            "/api/v1/pipeline": "Fused in-memory pipeline runs",
+            "/api/v1/jobs": "Background job status and progress",
+            "/metrics": "Prometheus metrics",
             "/docs": "Interactive API documentation"
         }
     }
@@ -0,0 +1,73 @@
+"""
+Shared fleets for the regression tests: the AIML sample fleet shipped with the repo and a
+larger synthetic fleet generated from a fixed seed in the simulator's input schema.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+AIML_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "AIML"))
+SAMPLE_FLEET_CSV = os.path.join(AIML_DIR, "final1output.csv")
+
+
+def make_fleet(n: int, seed: int = 0) -> pd.DataFrame:
+    """Synthetic fleet in the upload schema (fitness / branding / cleaning mix, some missing dates)"""
+    rng = np.random.default_rng(seed)
+    base = pd.Timestamp("2025-09-16")
+
+    def dates(lo: int, hi: int):
+        return [(base + pd.Timedelta(days=int(x))).strftime("%d-%m-%Y") for x in rng.integers(lo, hi, n)]
+
+    slots = rng.choice(["free", "booked", "in_progress"], n, p=[0.9, 0.06, 0.04])
+    df = pd.DataFrame({
+        "Trainname": [f"Train{i}" for i in range(n)],
+        "TrainID": [f"T{i:05d}" for i in range(n)],
+        "CURRENT_DATE": "15-09-2025",
+        "RollingStockFitnessStatus": rng.random(n) > 0.1,
+        "SignallingFitnessStatus": rng.random(n) > 0.1,
+        "TelecomFitnessStatus": rng.random(n) > 0.1,
+        "RollingStockFitnessExpiryDate": dates(-30, 200),
+        "SignallingFitnessExpiryDate": dates(-30, 400),
+        "TelecomFitnessExpiryDate": dates(-30, 300),
+        "JobCardStatus": rng.choice(["close", "open"], n, p=[0.8, 0.2]),
+        "OpenJobCards": rng.integers(0, 5, n),
+        "ClosedJobCards": rng.integers(0, 10, n),
+        "LastJobCardUpdate": dates(-900, -1),
+        "BrandingActive": rng.random(n) > 0.7,
+        "BrandCampaignID": [f"KMM-RLJ-WRP-25-{i:02d}" if rng.random() > 0.3 else np.nan for i in range(n)],
+        "ExposureHoursAccrued": rng.integers(0, 300, n),
+        "ExposureHoursTarget": rng.choice([280, 300, 320, 340], n),
+        "ExposureDailyQuota": rng.choice([14, 15, 16], n),
+        "TotalMileageKM": rng.integers(1000, 200000, n).astype(float),
+        "MileageSinceLastServiceKM": rng.uniform(0, 10500, n).round(1),
+        "MileageBalanceVariance": rng.integers(-500, 10000, n).astype(float),
+        "BrakepadWear%": rng.uniform(0, 99, n).round(3),
+        "HVACWear%": rng.uniform(0, 99.9, n).round(3),
+        "CleaningRequired": slots != "free",
+        "CleaningSlotStatus": slots,
+        "BayOccupancyIDC": [f"BAY_{rng.integers(1, 11):02d}" if slot != "free" else np.nan for slot in slots],
+        "LastCleanedDate": [d if rng.random() > 0.05 else np.nan for d in dates(-30, 0)],
+        "BayPositionID": rng.integers(1, 16, n).astype(float),
+        "ShuntingMovesRequired": rng.integers(0, 3, n).astype(float),
+        "StablingSequenceOrder": rng.integers(1, 4, n).astype(float),
+        "OperationalStatus": "In_Service",
+    })
+    # A few ISO dates and worn-out brake pads
+    df.loc[df.index[::7], "LastCleanedDate"] = "2025-08-01"
+    df.loc[df.index[::11], "BrakepadWear%"] = 99.9
+    return df
+
+
+@pytest.fixture
+def sample_fleet() -> pd.DataFrame:
+    """The 25-train sample fleet from the AIML experiments"""
+    return pd.read_csv(SAMPLE_FLEET_CSV)
+
+
+@pytest.fixture
+def synthetic_fleet() -> pd.DataFrame:
+    """An 80-train synthetic fleet"""
+    return make_fleet(80, seed=7)
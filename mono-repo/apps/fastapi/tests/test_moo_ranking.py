@@ -0,0 +1,44 @@
+"""
+rank_fleet (what the executor workers run) must rank exactly like MooService.rank_trains,
+and the vectorized scores must match the row-wise calculate_score.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.api.moo.models import MooConfig
+from app.api.moo.service import MooService, rank_fleet
+
+# Columns a previous ranking appended to the sample fleet
+RANKING_COLUMNS = ["Score", "Rank", "JobCardPriority", "BrandingCompletionRatio",
+                   "MileageBalanceAbs", "CleaningPriority", "ShuntingPriority"]
+
+
+@pytest.fixture(params=["sample_fleet", "synthetic_fleet"])
+def fleet(request) -> pd.DataFrame:
+    df = request.getfixturevalue(request.param)
+    return df.drop(columns=[c for c in RANKING_COLUMNS if c in df.columns])
+
+
+@pytest.mark.parametrize("limit", [10000, 3])
+def test_rank_fleet_matches_rank_trains(fleet, limit):
+    config = MooConfig(mileage_limit_before_service=limit)
+    service = MooService(config)
+    expected = service.rank_trains(fleet)
+
+    ranked_df, contributions = rank_fleet(config, fleet)
+
+    pd.testing.assert_frame_equal(ranked_df, expected)
+    pd.testing.assert_frame_equal(contributions, service.contributions)
+    assert ranked_df["Rank"].tolist() == list(range(1, len(fleet) + 1))
+
+
+def test_scores_match_row_wise_calculate_score(fleet):
+    service = MooService(MooConfig())
+    ranked_df, contributions = rank_fleet(MooConfig(), fleet)
+
+    row_scores = fleet.apply(service.calculate_score, axis=1)
+    assert ranked_df["Score"].tolist() == row_scores.loc[ranked_df.index].tolist()
+    # The per-objective breakdown adds up to the (rounded) score
+    assert np.allclose(contributions.sum(axis=1).round(2), ranked_df["Score"], atol=0.0101)
@@ -0,0 +1,74 @@
+"""
+predict_fleet batches the one-night policy over the whole fleet; it must pick the same
+action for every train as stepping the environment with model.predict one train at a time.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.api.rl import RL
+from app.api.rl.registry import saved_observation_shape
+
+from conftest import AIML_DIR, SAMPLE_FLEET_CSV
+
+pytestmark = pytest.mark.skipif(not RL.SB3_AVAILABLE, reason="stable-baselines3 not installed")
+
+MODEL_PATH = os.path.join(AIML_DIR, "kmrl_ppo_model.zip")
+
+
+@pytest.fixture(scope="module")
+def model():
+    if not os.path.exists(MODEL_PATH):
+        pytest.skip("AIML one-night policy not available")
+    return RL.PPO.load(MODEL_PATH, device="cpu")
+
+
+def resampled_fleet(n: int, seed: int) -> pd.DataFrame:
+    """n trains drawn from the sample fleet with fresh ids, scores and job cards (RL reads text cells)"""
+    rng = np.random.default_rng(seed)
+    base = pd.read_csv(SAMPLE_FLEET_CSV, dtype=str).fillna("")
+    df = base.sample(n, replace=True, random_state=seed).reset_index(drop=True)
+    df["TrainID"] = [f"T{i:05d}" for i in range(n)]
+    df["Score"] = rng.uniform(0, 100, n).round(2).astype(str)
+    df["Rank"] = np.arange(1, n + 1).astype(str)
+    df["OpenJobCards"] = rng.integers(0, 5, n).astype(str)
+    df["ShuntingMovesRequired"] = rng.integers(0, 4, n).astype(str)
+    df.loc[rng.random(n) < 0.1, "TelecomFitnessExpiryDate"] = "01-01-2020"
+    return df
+
+
+def sequential_actions(model, env) -> np.ndarray:
+    """One model.predict per train, stepping the environment in between"""
+    obs, _ = env.reset()
+    actions = []
+    for _ in range(env.n_trains):
+        action, _ = model.predict(obs, deterministic=True)
+        actions.append(int(action))
+        obs, _, terminated, _, _ = env.step(action)
+        if terminated:
+            break
+    return np.array(actions)
+
+
+@pytest.mark.parametrize("fleet, config", [
+    ("sample", None),
+    ((300, 1), None),
+    ((300, 2), {"service_quota": 150}),
+])
+def test_predict_fleet_matches_sequential_predict(model, fleet, config, tmp_path, monkeypatch):
+    # Finished episodes of large fleets write a debug CSV under ./kmrl_logs
+    monkeypatch.chdir(tmp_path)
+    df = pd.read_csv(SAMPLE_FLEET_CSV, dtype=str).fillna("") if fleet == "sample" else resampled_fleet(*fleet)
+
+    expected = sequential_actions(model, RL.KMrlOneNightEnv(df, config=config))
+    actual = RL.predict_fleet(model, RL.KMrlOneNightEnv(df, config=config))
+
+    np.testing.assert_array_equal(actual, expected)
+
+
+def test_policy_matches_one_night_observation_shape(model):
+    assert tuple(model.observation_space.shape) == RL.ONE_NIGHT_OBSERVATION_SHAPE
+    assert saved_observation_shape(MODEL_PATH) == RL.ONE_NIGHT_OBSERVATION_SHAPE
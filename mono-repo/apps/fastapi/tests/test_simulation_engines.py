@@ -0,0 +1,60 @@
+"""
+The columnar day engine must reproduce the row-wise simulate_single_day exactly:
+same seed, same fleet, same frame on every simulated day.
+"""
+
+import pandas as pd
+import pytest
+
+from app.api.simulation.fleet_state import FleetState
+from app.api.simulation.models import SimulationConfig
+from app.api.simulation.service import TrainSimulationService
+
+SEED = 42
+
+
+def simulator(days: int) -> TrainSimulationService:
+    service = TrainSimulationService(SimulationConfig(days_to_simulate=days, seed=SEED))
+    service.verbose = False
+    return service
+
+
+def run_row_wise(df: pd.DataFrame, days: int):
+    """Day frames of the row-wise engine, driven one simulate_single_day call per day"""
+    service = simulator(days)
+    service.initialize_tracking_from_data(df)
+    frames = []
+    current_df = df
+    for day in range(days):
+        service.current_day = day
+        current_df = service.simulate_single_day(current_df)
+        frames.append((day + 1, current_df))
+    return frames
+
+
+def run_columnar(df: pd.DataFrame, days: int):
+    """Day frames of the columnar engine, as simulate_multiple_days runs it"""
+    assert FleetState.supports(df)
+    return simulator(days).simulate_multiple_days(df, days)
+
+
+@pytest.mark.parametrize("fleet, days", [("sample_fleet", 60), ("synthetic_fleet", 30)])
+def test_columnar_engine_matches_row_wise(request, fleet, days):
+    df = request.getfixturevalue(fleet)
+
+    row_wise = run_row_wise(df.copy(), days)
+    columnar = run_columnar(df.copy(), days)
+
+    assert [day for day, _ in columnar] == [day for day, _ in row_wise]
+    for (day, expected), (_, actual) in zip(row_wise, columnar):
+        pd.testing.assert_frame_equal(actual, expected, check_exact=True, obj=f"day {day}")
+        assert actual.to_csv(index=False) == expected.to_csv(index=False), f"day {day}"
+
+
+def test_kept_days_match_full_run(sample_fleet):
+    full = dict(run_columnar(sample_fleet.copy(), 20))
+    kept = simulator(20).simulate_multiple_days(sample_fleet.copy(), 20, keep_days=[5, 20])
+
+    assert [day for day, _ in kept] == [5, 20]
+    for day, frame in kept:
+        pd.testing.assert_frame_equal(frame, full[day], check_exact=True)